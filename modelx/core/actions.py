@@ -0,0 +1,108 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent form of actions for memory-optimized runs
+
+Actions generated by :meth:`~modelx.core.model.Model.generate_actions`
+are encoded into a plan, a :obj:`dict` of plain objects,
+in which the Cells of the nodes are replaced with integer ids
+and each id is mapped to the tuple id of the Cells
+without the model name.
+"""
+
+import pickle
+from modelx.core.cells import Cells
+from modelx.core.node import ItemNode, OBJ, KEY
+
+PLAN_VERSION = 1
+ACTION_TYPES = ("calc", "paste", "clear")
+
+
+def encode_actions(actions):
+    """Return a plan from ``actions``"""
+    ids = {}    # CellsImpl -> id
+    objects = []
+    steps = []
+
+    for action, nodes in actions:
+        if action not in ACTION_TYPES:
+            raise ValueError("invalid action: %s" % action)
+        items = []
+        for n in nodes:
+            obj = n._impl[OBJ]
+            i = ids.get(obj)
+            if i is None:
+                i = ids[obj] = len(objects)
+                cells = obj.interface
+                objects.append(
+                    (cells._idtuple[1:], tuple(cells.parameters)))
+            items.append((i, n._impl[KEY]))
+        steps.append((action, items))
+
+    return {"version": PLAN_VERSION, "objects": objects, "actions": steps}
+
+
+def decode_actions(model, plan):
+    """Return actions from ``plan`` after validating it against ``model``"""
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError("unsupported plan version: %s" % plan.get("version"))
+
+    system = model._impl.system
+    objects = []
+    errors = []
+    for idtuple, params in plan["objects"]:
+        name = ".".join(str(elm) for elm in idtuple)
+        try:
+            obj = system.get_object_from_idtuple(
+                (model.name,) + tuple(idtuple))
+        except (AttributeError, KeyError, ValueError, TypeError):
+            obj = None
+        if not isinstance(obj, Cells):
+            errors.append("%s not found" % name)
+        elif tuple(obj.parameters) != tuple(params):
+            errors.append("parameters of %s changed from (%s) to (%s)" % (
+                name, ", ".join(params), ", ".join(obj.parameters)))
+        objects.append(obj)
+
+    if errors:
+        raise ValueError(
+            "plan not compatible with %s:\n" % model.name + "\n".join(errors))
+
+    return [[action, [ItemNode((objects[i]._impl, key)) for i, key in items]]
+            for action, items in plan["actions"]]
+
+
+def retarget_plan(plan, source, target):
+    """Return a copy of ``plan`` with ``source`` replaced with ``target``
+
+    ``source`` and ``target`` are the tuple ids of ItemSpaces
+    without the model name.
+    """
+    size = len(source)
+    objects = [
+        (target + idtuple[size:] if idtuple[:size] == source else idtuple,
+         params)
+        for idtuple, params in plan["objects"]]
+
+    return dict(plan, objects=objects)
+
+
+def write_plan(plan, path):
+    with open(path, "wb") as f:
+        pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_plan(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
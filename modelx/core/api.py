@@ -87,6 +87,46 @@ def get_recursion():
     return _system.callstack.maxdepth
 
 
+def use_iterative_eval(use=None):
+    """Specifies whether to evaluate formulas iteratively
+
+    By default, modelx evaluates formulas recursively, i.e.
+    when a formula calls a cells whose value is not calculated yet,
+    the formula of the cells is called on top of the calling formula,
+    so the length of formula chains is limited by the Python stack.
+
+    If :obj:`True` is given to ``use``, modelx switches to
+    the iterative evaluation, in which formulas nested more than
+    a fixed number of levels are suspended and the called formula is
+    evaluated in a loop. The suspended formulas are executed
+    again from the beginnings after the values of the called formulas
+    are calculated, so formulas must not have side effects.
+    The iterative evaluation records the same dependency as
+    the recursive evaluation, and its default recursion limit is
+    ``10**7``.
+
+    If :obj:`False` is given, modelx switches back to the recursive
+    evaluation.
+    If no ``use`` is given, i.e. ``use`` is :obj:`None`,
+    just returns the current setting.
+
+    This function cannot be called during formula execution
+    or while the call stack is being traced.
+
+    Args:
+        use(:obj:`bool`, optional): Whether to use the iterative evaluation
+
+    .. versionadded:: 0.22.0
+
+    See Also:
+        :func:`set_recursion`
+    """
+    if use is not None:
+        _system.set_iterative(use)
+
+    return _system.is_iterative()
+
+
 def new_model(name=None):
     """Create and return a new model.
 
@@ -530,6 +570,40 @@ def trace_stack(maxlen=10000):
         stop_stacktrace()
 
 
+def untracked():
+    """Context manager to calculate formulas without dependency tracking
+
+    By default, modelx records the dependency of calculated values
+    in order to clear the dependent values when a value is changed.
+    The recording takes time and memory.
+    In the ``with`` block of this context manager, modelx does not record
+    the dependency, so formulas are calculated faster
+    with less memory.
+    This is useful for batch runs in which input values are not
+    changed after the calculation.
+
+    As the dependents of the values calculated in the block are not known,
+    when any value in a model is cleared or changed after the run,
+    such as by assigning an input value, changing a formula or
+    changing a reference, all the values calculated
+    in the model without dependency tracking are cleared
+    with a warning.
+
+    This function cannot be called during formula execution
+    or while the call stack is being traced.
+
+    Example:
+
+        .. code-block:: python
+
+            >>> with mx.untracked():
+            ...     result = [Projection[i].pv_net_cf() for i in range(1000)]
+
+    .. versionadded:: 0.22.0
+    """
+    return _system.untracked()
+
+
 def write_model(model, model_path, backup=True, log_input=False, version=None):
     """Write model to files.
 
@@ -640,7 +714,7 @@ def zip_model(model, model_path, backup=True, log_input=False,
         version=version)
 
 
-def read_model(model_path, name=None):
+def read_model(model_path, name=None, cache_dir=None, max_workers=None):
     """Read model from files.
 
     Read model form a folder(directory) tree or a zip file ``model_path``.
@@ -649,17 +723,32 @@ def read_model(model_path, name=None):
     :py:func:`~write_model`
     or :py:meth:`Model.zip<modelx.core.model.Model.zip>`.
 
+    The source files of the model are parsed in parallel processes
+    when there are many of them, and the parsed results are cached
+    by the hash of the source texts. The cache is kept in memory,
+    and also saved in ``cache_dir``, so reading an unchanged model again
+    skips parsing the source files, in the same session or later ones.
+
     .. versionadded:: 0.0.22
 
+    .. versionchanged:: 0.22.0 ``cache_dir`` and ``max_workers`` are added.
+
     Args:
         model_path(str): Path to a model folder or a zipped model file.
         name(str, optional): Model name to overwrite the saved name.
+        cache_dir(str, optional): Path to a directory to save
+            the parsed source files in. Defaults to ``modelx/parse``
+            in the user cache directory, such as ``~/.cache/modelx/parse``.
+            If :obj:`False`, the parsed results are cached only in memory.
+        max_workers(int, optional): Maximum number of processes to
+            parse the source files. Defaults to the number of CPUs.
 
     Returns:
         A Model object constructed from the files.
 
     """
-    return _serialize.read_model(_system, model_path, name=name)
+    return _serialize.read_model(_system, model_path, name=name,
+                                 cache_dir=cache_dir, max_workers=max_workers)
 
 
 def get_recalc():
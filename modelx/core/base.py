@@ -571,9 +571,9 @@ class Interface:
         where x is a Model/Space/Cells object.
         """
         if name in self.properties:
-            getattr(Interface, name).fset(self, value)
+            getattr(type(self), name).fset(self, value)
         else:
-            raise ValueError("property %s not defined")
+            raise ValueError("property %s not defined" % name)
 
     @property
     def allow_none(self):
@@ -699,23 +699,26 @@ class LazyEval:
 
     def __init__(self, observers):
         self.is_fresh = True  # must be read only
-        self.observers = []
-        self.observing = []
+        # Keyed by id as LazyEval dicts and maps are not hashable
+        self.observers = {}
+        self.observing = {}
         for observer in observers:
             self.append_observer(observer)
 
     def set_refresh(self, skip_self=False):
 
-        if not skip_self:
-            self.is_fresh = False
-        for observer in self.observers:
-            if observer.is_fresh:
-                observer.set_refresh()
+        # The observers of a stale object were flagged when it got stale
+        # and stay so until it is refreshed, so repeated edits flag them
+        # only once.
+        if self.is_fresh:
+            if not skip_self:
+                self.is_fresh = False
+            _propagate_refresh([self])
 
     @property
     def fresh(self):
         if not self.is_fresh:
-            for other in self.observing:
+            for other in self.observing.values():
                 other.fresh
             self._refresh_data()
             self.is_fresh = True
@@ -725,25 +728,26 @@ class LazyEval:
         raise NotImplementedError  # To be overwritten in derived classes
 
     def append_observer(self, observer):
-        # Speed deteriorates by a lot if below
-        # if observer not in self.observers:
-        if all(observer is not other for other in self.observers):
-            self.observers.append(observer)
-            observer.observing.append(self)
+        if id(observer) not in self.observers:
+            self.observers[id(observer)] = observer
+            observer.observing[id(self)] = self
             observer.set_refresh()
 
     def observe(self, other):
         other.append_observer(self)
 
     def remove_observer(self, observer):
-        self.observers.remove(observer)
-        observer.observing.remove(self)
+        del self.observers[id(observer)]
+        del observer.observing[id(self)]
 
     def unobserve(self, other):
         other.remove_observer(self)
 
     def __setstate(self, state):
         self.is_fresh = False
+        # Object ids change by unpickling
+        self.observers = {id(v): v for v in self.observers.values()}
+        self.observing = {id(v): v for v in self.observing.values()}
 
     def on_update(self, method, args=()):
         is_fresh = self.is_fresh
@@ -751,11 +755,25 @@ class LazyEval:
             self.fresh
         args = self.update_methods[method](self, *args)
         if is_fresh:    # if not fresh, all observers are not fresh too
-            for observer in self.observers:
+            for observer in list(self.observers.values()):
                 if observer.is_fresh:
                     observer.on_update(method, args)
 
 
+def _propagate_refresh(objs):
+    """Flag the observers of ``objs`` iteratively not to recurse deeply"""
+    stack = list(objs)
+    while stack:
+        # Observers can be removed by their set_refresh
+        for observer in list(stack.pop().observers.values()):
+            if observer.is_fresh:
+                if type(observer).set_refresh is LazyEval.set_refresh:
+                    observer.is_fresh = False
+                    stack.append(observer)
+                else:
+                    observer.set_refresh()
+
+
 def _rename_item(self, old_name, new_name):
     """Rename a key without changing its position.
     """
@@ -828,6 +846,7 @@ def _sort_partial(self, sorted_keys):
         i += 1
 
 
+@add_statemethod
 class LazyEvalDict(LazyEval, dict):
 
     __slots__ = ("name", "_repr") + get_mixin_slots(LazyEval, dict)
@@ -876,8 +895,8 @@ class LazyEvalDict(LazyEval, dict):
         dict.__setitem__(self, name, value)
         if self.is_fresh:
             self._update_item(name)
-            for observer in self.observers:
-                if observer.is_fresh:
+            for observer in list(self.observers.values()):
+                if observer.is_fresh and id(observer) in self.observers:
                     observer.on_add_item(self, name, value)
 
     def delete_item(self, name):
@@ -887,8 +906,8 @@ class LazyEvalDict(LazyEval, dict):
         dict.__delitem__(self, name)
         if self.is_fresh:
             self._update_item(name)
-            for observer in self.observers:
-                if observer.is_fresh:
+            for observer in list(self.observers.values()):
+                if observer.is_fresh and id(observer) in self.observers:
                     observer.on_delete_item(self, name)
 
     def rename_item(self, old_name, new_name):
@@ -929,16 +948,16 @@ class LazyEvalChainMap(LazyEval, CustomChainMap):
             self._update_item(name)
             map_ = next((m for m in self.maps if name in m), None)
             if map_ is sender:
-                for observer in self.observers:
-                    if observer.is_fresh:
+                for observer in list(self.observers.values()):
+                    if observer.is_fresh and id(observer) in self.observers:
                         observer.on_add_item(self, name, value)
 
     def on_delete_item(self, sender, name):
         if self.is_fresh:
             self._update_item(name)
             # map_ = next((m for m in self.maps if name in m), None)
-            for observer in self.observers:
-                if observer.is_fresh:
+            for observer in list(self.observers.values()):
+                if observer.is_fresh and id(observer) in self.observers:
                     observer.on_delete_item(self, name)
 
     def __setitem__(self, name, value):
@@ -12,20 +12,24 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
+import gc
 from collections import namedtuple
 from collections.abc import Mapping, Callable, Sequence
-from itertools import combinations
+from itertools import combinations, repeat
+from operator import is_
+from types import MappingProxyType
 
 from modelx.core.base import (
-    add_statemethod, Impl, Derivable, Interface, get_mixin_slots,
+    add_statemethod, add_stateattrs, Impl, Derivable, Interface,
+    get_mixin_slots,
 )
 from modelx.core.node import (
     OBJ, KEY, get_node, get_node_repr, tuplize_key, key_to_node,
     ObjectNode
 )
 from modelx.core.formula import (
-    Formula, NullFormula, NULL_FORMULA, BoundFunction, replace_docstring,
-    HasFormula
+    Formula, NullFormula, NULL_FORMULA, BoundFunction, DynamicBoundFunction,
+    replace_docstring, HasFormula
 )
 from modelx.core.util import is_valid_name
 from modelx.core.errors import NoneReturnedError
@@ -45,6 +49,9 @@ class CellsMaker:
 
 ArgsValuePair = namedtuple("ArgsValuePair", ["args", "value"])
 
+NO_INPUTS = frozenset()     # input_keys shared by cells without inputs
+NO_DATA = MappingProxyType({})  # data of dynamic cells without values
+
 
 class Cells(Interface, Mapping, Callable, ItemFactory):
     """Data container with a formula to calculate its own values.
@@ -121,6 +128,123 @@ class Cells(Interface, Mapping, Callable, ItemFactory):
         """Set value of a particular cell"""
         self._impl.set_value(tuplize_key(self, key), value)
 
+    def set_values(self, data):
+        """Set input values in bulk from a mapping or a Series
+
+        Set the values of ``data`` as input values
+        for the arguments of its keys.
+        ``data`` is a :obj:`dict`
+        or other mapping, or a pandas `Series`_.
+        The keys of ``data``, or the index of the Series, are
+        interpreted in the same way as
+        the keys in assignments by the subscription operator,
+        such as ``cells[key] = value``.
+        For a Cells with more than one parameter,
+        the keys must be tuples, and for a Series,
+        the index must be a MultiIndex.
+
+        The values calculated from the values overwritten
+        are cleared at once after all the values are set,
+        and recalculated if :func:`~modelx.set_recalc`
+        is set to :obj:`True`.
+        Setting many values by this method is much faster than
+        setting them one by one.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> Cells1.set_values({1: 10, 2: 20, 3: 30})
+
+                >>> Cells1[2]
+                20
+
+        Args:
+            data: a mapping or a pandas Series of arguments to values
+
+        .. seealso::
+            * :meth:`set_array`
+            * :meth:`~modelx.core.model.Model.batch_update`
+
+        .. versionadded:: 0.22.0
+
+        .. _Series:
+           https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.Series.html
+        """
+        self._impl.set_values(data)
+
+    def set_array(self, index, values):
+        """Set input values in bulk from arrays of arguments and values
+
+        Set the elements of ``values`` as input values for the
+        corresponding elements of ``index``.
+        ``index`` and ``values`` are NumPy arrays
+        or sequences of the same length.
+        For a Cells with one parameter, ``index`` is a 1-dimensional
+        array of the arguments.
+        For a Cells with more than one parameter, ``index`` is a
+        2-dimensional array, whose rows are the arguments.
+        NumPy scalars in the arrays are converted to
+        the corresponding Python scalars.
+        If ``values`` has more than one dimension,
+        the values are its sub-arrays along the first axis.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> Cells2.set_array(np.array([[1, 2], [3, 4]]), np.array([10, 20]))
+
+                >>> Cells2(3, 4)
+                20
+
+        Args:
+            index: An array of arguments
+            values: An array of values
+
+        .. seealso::
+            * :meth:`set_values`
+            * :meth:`~modelx.core.model.Model.batch_update`
+
+        .. versionadded:: 0.22.0
+        """
+        self._impl.set_array(index, values)
+
+    def compute_range(self, args):
+        """Calculate the values for the arguments in order
+
+        Calculates the values of this cells for the arguments in ``args``
+        one by one in the order of ``args``.
+        The cells must have one parameter.
+
+        For a cells referring to itself for the previous argument,
+        such as ``pols_if(t)`` referring to ``pols_if(t-1)``,
+        calling ``pols_if(1199)`` directly calculates the values
+        recursively down to ``pols_if(0)``,
+        which deepens the call stack and is slow.
+        By passing arguments in ascending order,
+        such as ``range(1200)``, the value for the previous argument
+        is already calculated when each value is calculated,
+        so the call stack stays shallow.
+        The values of other cells referred to by this cells are
+        calculated in the same order.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> pols_if.compute_range(range(1200))
+
+                >>> pols_if(1199)
+                36.82372930142734
+
+        Args:
+            args: Iterable of the arguments
+
+        .. versionadded:: 0.22.0
+        """
+        self._impl.compute_range(args)
+
     def __iter__(self):
         def inner():  # For single parameter
             for key in self._impl.data.keys():
@@ -459,14 +583,39 @@ class Cells(Interface, Mapping, Callable, ItemFactory):
         self._impl.set_doc(doc, insert_indents=insert_indents)
 
 
+# Names by which formulas can look up names not known from their code
+_dynamic_lookup_names = frozenset(
+    ("_self", "_space", "globals", "locals", "vars", "eval", "exec"))
+
+
 class CellsNamespaceReferrer(BaseNamespaceReferrer):
 
     __slots__ = ()
     __mixin_slots = ()
 
     def on_namespace_change(self, is_all, names):
+        if not self.data:
+            return
+        elif not is_all:
+            global_names = self.get_referred_names()
+            if global_names is not None and all(
+                    n.__class__ is str and n not in global_names
+                    for n in names):
+                return  # No names referred to by the formula changed
+
         self.clear_all_values(clear_input=False)
 
+    def get_referred_names(self):
+        global_names = self.altfunc.global_names
+        if global_names is None:
+            global_names = self.altfunc.global_names = (
+                self.altfunc._init_names())
+
+        if _dynamic_lookup_names.isdisjoint(global_names):
+            return global_names
+        else:
+            return None
+
 
 _cells_impl_base = (CellsNamespaceReferrer, Derivable, ItemFactoryImpl,
                     HasFormula, Impl)
@@ -478,69 +627,9 @@ class CellsImpl(*_cells_impl_base):
     interface_cls = Cells
 
     __slots__ = (
-        "formula",
-        "data",
-        "_namespace",
         "altfunc",
-        "source",
-        "input_keys"
     ) + get_mixin_slots(*_cells_impl_base)
 
-    def __init__(
-        self, *, space, name=None, formula=None, data=None, base=None,
-        source=None, is_derived=False, add_to_space=True
-    ):
-        # Determine name
-        if base:
-            name = base.name
-        elif is_valid_name(name):
-            pass
-        elif formula:
-            name = Formula(formula).name
-            if is_valid_name(name):
-                pass
-            else:
-                name = space.cellsnamer.get_next(space.namespace)
-        else:
-            name = space.cellsnamer.get_next(space.namespace)
-
-        Impl.__init__(
-            self,
-            system=space.system,
-            parent=space,
-            name=name
-        )
-        self.spmgr = space.spmgr
-        Derivable.__init__(self, is_derived)
-        self.source = source
-
-        if add_to_space:
-            space._cells.set_item(name, self)
-
-        # Set formula
-        if base:
-            self.formula = base.formula
-        elif formula is None:
-            self.formula = NullFormula(NULL_FORMULA, name=name)
-        elif isinstance(formula, Formula):
-            self.formula = formula.__class__(formula, name=name)
-        else:
-            self.formula = Formula(formula, name=name)
-
-        # Set data
-        self.data = {}
-        if data is None:
-            data = {}
-        self.data.update(data)
-        self.input_keys = set(data.keys())
-
-        CellsNamespaceReferrer.__init__(self, space)
-        self._namespace = self.parent._namespace
-        if base:
-            self.altfunc = BoundFunction(self, base.altfunc.fresh)
-        else:
-            self.altfunc = BoundFunction(self)
-
     # ----------------------------------------------------------------------
     # repr methods
 
@@ -570,7 +659,9 @@ class CellsImpl(*_cells_impl_base):
 
             self.model.clear_obj(self)
             self.formula = bases[0].formula
+            self.altfunc.global_names = bases[0].altfunc.global_names
             self.altfunc.set_refresh()
+            self.parent.update_referrer(self)
 
     @property
     def namespace(self):
@@ -596,7 +687,16 @@ class CellsImpl(*_cells_impl_base):
 
     def on_eval_formula(self, key):
 
-        value = self.altfunc.fresh.altfunc(*key)
+        spiller = self.model.spiller
+        if spiller is not None and key_to_node(self, key) in spiller:
+            # Value saved by Model.execute_actions
+            return self._store_value(key, spiller.load(key_to_node(self, key)))
+
+        # The bound function is kept fresh while the model is frozen
+        altfunc = self.altfunc
+        if not self.model.is_frozen or altfunc.altfunc is None:
+            altfunc = altfunc.fresh
+        value = altfunc.altfunc(*key)
 
         if self.has_node(key):
             # Assignment took place inside the cell.
@@ -606,6 +706,8 @@ class CellsImpl(*_cells_impl_base):
                 value = self.data[key]
         else:
             value = self._store_value(key, value)
+            if self.model.memory_budget is not None:
+                self.model.memory_budget.add(key_to_node(self, key), value)
 
         return value
 
@@ -616,6 +718,16 @@ class CellsImpl(*_cells_impl_base):
     def get_value_from_key(self, key):
         return self.system.executor.eval_node(key_to_node(self, key))
 
+    def compute_range(self, args):
+        if len(self.formula.parameters) != 1:
+            raise ValueError("%s must have one parameter" % self.evalrepr)
+
+        eval_node = self.system.executor.eval_node
+        for arg in args:
+            key = (arg,)
+            if key not in self.data:
+                eval_node(key_to_node(self, key))
+
     def find_match(self, args, kwargs):
 
         node = get_node(self, args, kwargs)
@@ -650,23 +762,139 @@ class CellsImpl(*_cells_impl_base):
                 self._store_value(key, value)
             else:
                 raise KeyError("Assignment in cells other than %s" % key)
+        elif self.model.batch_inputs is not None:
+            # Dependents cleared in Model.batch_update
+            self._store_value(key, value)
+            self.model.tracegraph.add_node(node)
+            self.get_input_keys().add(key)
+            self.model.batch_inputs[node] = None
         else:
             if self.system._recalc_dependents:
                 targets = self.model.tracegraph.get_startnodes_from(node)
             self.clear_value_at(key)
             self._store_value(key, value)
             self.model.tracegraph.add_node(node)
-            self.input_keys.add(key)
+            self.get_input_keys().add(key)
             if self.system._recalc_dependents:
                 for trg in targets:
                     trg[OBJ].get_value_from_key(trg[KEY])
 
+    def set_values(self, data):
+        gc_status = gc.isenabled()
+        gc.disable()    # Not to collect garbage while creating many keys
+        try:
+            if isinstance(data, Mapping):
+                keys, values = data.keys(), list(data.values())
+            elif hasattr(data, "index") and hasattr(data, "tolist"):  # Series
+                keys, values = data.index.tolist(), data.tolist()
+            else:
+                raise TypeError(
+                    "%s is not a mapping or a Series" % repr(data))
+
+            self.set_values_from_keys(self.tuplize_keys(keys), values)
+        finally:
+            if gc_status:
+                gc.enable()
+
+    def set_array(self, index, values):
+        gc_status = gc.isenabled()
+        gc.disable()    # Not to collect garbage while creating many keys
+        try:
+            keylen = None
+            if getattr(index, "ndim", 1) > 1:
+                keys = list(map(tuple, index.tolist()))
+                keylen = index.shape[1]
+            elif hasattr(index, "tolist"):
+                keys = list(zip(index.tolist()))
+                keylen = 1
+            else:
+                keys = [k if k.__class__ is tuple else (k,) for k in index]
+
+            # Arrays of numbers cannot have None
+            check_none = getattr(
+                getattr(values, "dtype", None), "hasobject", True)
+            if getattr(values, "ndim", 1) == 1 and hasattr(values, "tolist"):
+                values = values.tolist()
+            else:
+                values = list(values)
+
+            if len(keys) != len(values):
+                raise ValueError(
+                    "index and values must be of the same length")
+
+            self.set_values_from_keys(
+                self.tuplize_keys(keys, is_tuple=True, keylen=keylen),
+                values, check_none=check_none)
+        finally:
+            if gc_status:
+                gc.enable()
+
+    def tuplize_keys(self, keys, is_tuple=False, keylen=None):
+        """Convert ``keys`` to a list of keys with defaults applied
+
+        If ``is_tuple`` is true, ``keys`` are already tuples.
+        If ``keylen`` is given, ``keys`` are tuples of the length.
+        """
+        if not is_tuple:
+            if tuple in set(map(type, keys)):
+                keys = [k if k.__class__ is tuple else (k,) for k in keys]
+            else:
+                keys, keylen = list(zip(keys)), 1
+        paramlen = len(self.formula.parameters)
+        if keylen != paramlen and set(map(len, keys)) - {paramlen}:
+            keys = [k if len(k) == paramlen else get_node(self, k, {})[KEY]
+                    for k in keys]
+        return keys
+
+    def set_values_from_keys(self, keys, values, check_none=True):
+        """Set input values in one pass
+
+        Values calculated from the existing values of ``keys`` are
+        cleared in one pass as in ``Model.batch_update``.
+        If ``check_none`` is false, ``values`` must not contain None.
+        Called with GC disabled.
+        """
+        if self.system.callstack:
+            raise KeyError("Assignment in cells other than %s" % self.name)
+
+        if (check_none and not self.get_property("allow_none")
+                and any(map(is_, values, repeat(None)))):
+            key = keys[list(map(is_, values, repeat(None))).index(True)]
+            raise NoneReturnedError(get_node_repr((self, key, None)))
+
+        model = self.model
+        data = self.get_data()
+        keyset = set(keys)  # Also checks keys are hashable before update
+        existing = data.keys() & keyset if data else ()
+        started = model.start_batch_update()
+        try:
+            batch = model.batch_inputs
+            for key in existing:
+                batch[key_to_node(self, key)] = None
+            data.update(zip(keys, values))
+            self.add_input_keys(keyset)
+
+            if existing or len(keyset) != len(keys):
+                newkeys = [k for k in dict.fromkeys(keys)
+                           if k not in existing]
+            else:
+                newkeys = keys
+            model.tracegraph.add_inputs(self, newkeys)
+        finally:
+            if started:
+                targets = model.end_batch_update(
+                    self.system._recalc_dependents)
+
+        if started:
+            for trg in targets:
+                trg[OBJ].get_value_from_key(trg[KEY])
+
     def _store_value(self, key, value):
 
         if value is not None:
-            self.data[key] = value
+            self.get_data()[key] = value
         elif self.get_property("allow_none"):
-            self.data[key] = value
+            self.get_data()[key] = value
         else:
             raise NoneReturnedError(get_node_repr((self, key, None)))
 
@@ -679,6 +907,8 @@ class CellsImpl(*_cells_impl_base):
         del self.data[key]
         if key in self.input_keys:
             self.input_keys.remove(key)
+            if not self.input_keys:
+                self.model.tracegraph.discard_inputs(self)
 
     def clear_all_values(self, clear_input):
         for key in list(self.data):
@@ -728,19 +958,90 @@ class CellsImpl(*_cells_impl_base):
         return True
 
 
+@add_stateattrs
 class UserCellsImpl(CellsImpl):
 
-    __slots__ = ()
+    __slots__ = (
+        "formula",
+        "data",
+        "_namespace",
+        "source",
+        "input_keys",
+        "_dynamic_store"
+    )
 
     def __init__(
         self, space, name=None, formula=None, data=None, base=None,
         source=None, is_derived=False, add_to_space=True
     ):
-        CellsImpl.__init__(
-            self, space=space, name=name, formula=formula, data=data,
-            base=base,
-            source=source, is_derived=is_derived, add_to_space=add_to_space
+        # Determine name
+        if base:
+            name = base.name
+        elif is_valid_name(name):
+            pass
+        elif formula:
+            name = Formula(formula).name
+            if is_valid_name(name):
+                pass
+            else:
+                name = space.cellsnamer.get_next(space.namespace)
+        else:
+            name = space.cellsnamer.get_next(space.namespace)
+
+        Impl.__init__(
+            self,
+            system=space.system,
+            parent=space,
+            name=name
         )
+        self.spmgr = space.spmgr
+        Derivable.__init__(self, is_derived)
+        self.source = source
+
+        if add_to_space:
+            space._cells.add_item(name, self)
+
+        # Set formula
+        if base:
+            self.formula = base.formula
+        elif formula is None:
+            self.formula = NullFormula(NULL_FORMULA, name=name)
+        elif isinstance(formula, Formula):
+            self.formula = formula.__class__(formula, name=name)
+        else:
+            self.formula = Formula(formula, name=name)
+
+        # Set data
+        self.data = {}
+        if data is None:
+            data = {}
+        self.data.update(data)
+        self.input_keys = set(data.keys()) if data else NO_INPUTS
+
+        self._namespace = self.parent._namespace
+        if base:
+            self.altfunc = BoundFunction(self, base.altfunc.fresh)
+        else:
+            self.altfunc = BoundFunction(self)
+        self._dynamic_store = DynamicCellsStore(self)
+        CellsNamespaceReferrer.__init__(self, space)
+
+    def get_data(self):
+        """Return ``data`` to add values to"""
+        return self.data
+
+    def get_input_keys(self):
+        """Return ``input_keys`` to add keys to"""
+        if self.input_keys.__class__ is frozenset:     # NO_INPUTS
+            self.input_keys = set()
+        return self.input_keys
+
+    def add_input_keys(self, keys):
+        """Add the set ``keys`` to ``input_keys``, taking it if none"""
+        if self.input_keys:
+            self.input_keys.update(keys)
+        else:
+            self.input_keys = keys
 
     # ----------------------------------------------------------------------
     # Formula operations
@@ -750,6 +1051,9 @@ class UserCellsImpl(CellsImpl):
         newsrc = self.formula._reload(module).source
         if oldsrc != newsrc:
             self.model.clear_obj(self)
+            self.altfunc.global_names = None
+            self.altfunc.set_refresh()
+            self.parent.update_referrer(self)
 
     def set_doc(self, doc, insert_indents=False):
 
@@ -787,6 +1091,7 @@ class UserCellsImpl(CellsImpl):
                 self.formula = Formula(self.formula, name=name)
 
             self.altfunc = BoundFunction(self)
+            self.parent.update_referrer(self)
 
         self.parent.cells.rename_item(old_name, name)
 
@@ -807,10 +1112,107 @@ class UserCellsImpl(CellsImpl):
             self.formula = cls(func, name=self.name)
 
         self.altfunc = BoundFunction(self)
+        self.parent.update_referrer(self)
 
 
+class DynamicCellsStore:
+    """Values of the dynamic cells derived from a cells
+
+    The base :class:`UserCellsImpl` owns the store, and the values and
+    input keys of its dynamic cells are held in it keyed by
+    the dynamic space of each dynamic cells and the key of each value.
+    They are grouped by space, so that the values of a dynamic space
+    are removed without looking at those of the other spaces.
+    """
+    __slots__ = ("cells", "data", "input_keys")
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.data = {}          # space -> {key: value}
+        self.input_keys = {}    # space -> {key}
+
+
+@add_stateattrs
 class DynamicCellsImpl(CellsImpl):
-    __slots__ = ()
+    """Thin view of the store of the base cells
+
+    The formula is the base's, and the values and input keys
+    are held in the store of the base. ``data`` refers to the values
+    of the cells in the store, or to the shared ``NO_DATA`` if none.
+    The cells is not registered as a referrer of its space,
+    which notifies all its cells directly.
+    """
+    __slots__ = ("_store", "data")
+
+    source = None
+
+    def __init__(self, *, space, base):
+        Impl.__init__(
+            self,
+            system=space.system,
+            parent=space,
+            name=base.name
+        )
+        self.spmgr = space.spmgr
+        Derivable.__init__(self, True)
+        self._store = base._dynamic_store
+        self.data = NO_DATA
+        self.altfunc = DynamicBoundFunction(self, base.altfunc.fresh)
+
+    @property
+    def formula(self):
+        return self._store.cells.formula
+
+    @property
+    def _namespace(self):
+        return self.parent._namespace
+
+    @property
+    def namespace(self):
+        return self.parent._namespace.fresh
+
+    @property
+    def input_keys(self):
+        return self._store.input_keys.get(self.parent, NO_INPUTS)
+
+    def get_data(self):
+        """Return ``data`` to add values to"""
+        if self.data is NO_DATA:
+            self.data = self._store.data[self.parent] = {}
+        return self.data
+
+    def get_input_keys(self):
+        """Return ``input_keys`` to add keys to"""
+        keys = self._store.input_keys.get(self.parent)
+        if keys is None:
+            keys = self._store.input_keys[self.parent] = set()
+        return keys
+
+    def add_input_keys(self, keys):
+        """Add the set ``keys`` to ``input_keys``, taking it if none"""
+        if self.input_keys:
+            self.input_keys.update(keys)
+        else:
+            self._store.input_keys[self.parent] = keys
+
+    def on_clear_trace(self, key):
+        store, space = self._store, self.parent
+        del self.data[key]
+        if not self.data:
+            del store.data[space]
+            self.data = NO_DATA
+        if key in self.input_keys:
+            keys = store.input_keys[space]
+            keys.remove(key)
+            if not keys:
+                del store.input_keys[space]
+                self.model.tracegraph.discard_inputs(self)
+
+    def on_delete(self):
+        self._store.data.pop(self.parent, None)
+        self.data = NO_DATA
+        self._store.input_keys.pop(self.parent, None)
+        CellsImpl.on_delete(self)
 
 
 def shareable_parameters(cells):
@@ -16,7 +16,8 @@ import token
 import ast
 import warnings
 from types import FunctionType, CodeType
-from inspect import signature, getsource, getsourcefile, findsource
+from inspect import (
+    signature, getsource, getsourcefile, findsource, Parameter)
 from textwrap import dedent, indent
 import tokenize
 import io
@@ -369,6 +370,18 @@ def is_func_lambda(func: FunctionType):
 
 def extract_lambda_from_source(source: str):
 
+    # Tokenizing is slow, so return ``source`` as it is
+    # if it is just a lambda expression.
+    stripped = source.strip()
+    if stripped.startswith("lambda") and "#" not in stripped:
+        try:
+            node = ast.parse(stripped, mode="eval").body
+        except SyntaxError:
+            pass
+        else:
+            if isinstance(node, ast.Lambda):
+                return stripped
+
     atok = asttokens.ASTTokens(source, parse=True)
 
     for node in ast.walk(atok.tree):
@@ -403,10 +416,45 @@ def extract_lambda_from_func(func: FunctionType):
         raise ValueError("no lambda expression found")
 
 
+def make_key_builder(sig):
+    """Return a function to build a key from arguments for ``sig``
+
+    The returned function takes a tuple of positional arguments
+    and a dict of keyword arguments, and returns
+    the tuple of all the arguments bound to the parameters of ``sig``
+    with default values applied.
+    If ``sig`` has only positional-or-keyword parameters,
+    the returned function returns the positional arguments as they are
+    if they match the parameters exactly,
+    without binding them by ``sig``.
+    """
+    paramlen = len(sig.parameters)
+
+    def bind(args, kwargs):
+        boundargs = sig.bind(*args, **kwargs)
+        boundargs.apply_defaults()
+        return tuple(boundargs.arguments.values())
+
+    if any(param.kind not in (Parameter.POSITIONAL_ONLY,
+                              Parameter.POSITIONAL_OR_KEYWORD)
+           for param in sig.parameters.values()):
+        return bind
+
+    def get_key(args, kwargs):
+        if (args.__class__ is tuple and len(args) == paramlen
+                and not kwargs):
+            return args
+        else:
+            return bind(args, kwargs)
+
+    return get_key
+
+
 class Formula:
 
     __slots__ = (
-        "func", "signature", "source", "module", "srcnames", "_is_lambda")
+        "func", "signature", "source", "module", "srcnames", "_is_lambda",
+        "get_key")
 
     def __init__(self, func, name=None, module=None):
 
@@ -430,7 +478,7 @@ class Formula:
                     "%s.source set to None." % (func.__name__, func.__name__)
                 )
                 self.func = func
-                self.signature = signature(func)
+                self._init_signature()
                 self.source = None
                 self.srcnames = []
 
@@ -474,7 +522,7 @@ class Formula:
         exec(code, namespace)
 
         self.func = namespace[funcname]
-        self.signature = signature(self.func)
+        self._init_signature()
         self.source = src
 
     def _init_from_lambda(self, src: str, name: str):
@@ -491,9 +539,13 @@ class Formula:
         if name:
             self.func.__name__ = name
 
-        self.signature = signature(self.func)
+        self._init_signature()
         self.source = src
 
+    def _init_signature(self):
+        self.signature = signature(self.func)
+        self.get_key = make_key_builder(self.signature)
+
     def _copy_other(self, other):
         for attr in self.__slots__:
             setattr(self, attr, getattr(other, attr))
@@ -658,20 +710,63 @@ class BoundFunction(LazyEval):
 
         return result
 
+    # The global names are extracted from the code of the formula,
+    # so they do not change when the namespace is updated.
+
     def on_add_item(self, namespace, name, value):
-        self.global_names = self._init_names()
+        pass
 
     def on_delete_item(self, namespace, name):
-        self.global_names = self._init_names()
+        pass
 
     def on_update(self, operation, args=()):
-        self.global_names = self._init_names()
+        pass
 
     def __setstate(self, state):
         self.global_names = None
         self.altfunc = None
 
 
+class DynamicBoundFunction:
+    """Lightweight BoundFunction of cells in dynamic spaces
+
+    The interfaces of the namespace of a space are updated in place,
+    so the altered function does not need to be created again
+    when the namespace is updated. Unlike BoundFunction, this class does not
+    observe the namespace, and shares ``global_names`` with the base.
+    """
+
+    __slots__ = ("owner", "global_names", "altfunc")
+
+    def __init__(self, owner, base):
+        self.owner = owner
+        self.global_names = base.global_names
+        self.altfunc = None
+
+    @property
+    def fresh(self):
+        namespace = self.owner.namespace    # Refresh the namespace
+        if (self.altfunc is None
+                or self.altfunc.__globals__ is not namespace.interfaces):
+            BoundFunction._refresh_data(self)
+        return self
+
+    def set_refresh(self):
+        self.altfunc = None
+
+    _init_names = BoundFunction._init_names
+    _extract_globals = BoundFunction._extract_globals
+    get_referents = BoundFunction.get_referents
+
+    def __getstate__(self):
+        return {"owner": self.owner, "global_names": self.global_names}
+
+    def __setstate__(self, state):
+        self.owner = state["owner"]
+        self.global_names = state["global_names"]
+        self.altfunc = None
+
+
 class BoundFormula:     # Not Used
     """Hold function with updated namespace"""
 
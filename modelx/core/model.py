@@ -12,10 +12,17 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
 import builtins
 import itertools
+import warnings
 import zipfile
 import gc
+import pickle
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
 from types import ModuleType
 
 import networkx as nx
@@ -39,6 +46,7 @@ from modelx.core.parent import (
     EditableParent,
 )
 from modelx.core.space import (
+    ItemSpace,
     UserSpaceImpl,
     SpaceDict,
     SpaceView,
@@ -47,6 +55,9 @@ from modelx.core.space import (
 from modelx.core.formula import NULL_FORMULA
 from modelx.core.util import is_valid_name, AutoNamer
 from modelx.core.chainmap import CustomChainMap
+from modelx.core.tracegraph import CompactTraceGraph, CompactReferenceGraph
+from modelx.core.actions import (
+    encode_actions, decode_actions, retarget_plan, write_plan, read_plan)
 
 try:
     _nxver = tuple(int(n) for n in nx.__version__.split(".")[:2])
@@ -106,6 +117,43 @@ class TraceGraph(nx.DiGraph):
         """Overriding Graph.fresh_copy"""
         return TraceGraph()
 
+    def topological_sort(self):
+        return list(nx.topological_sort(self))
+
+    def descendants(self, node):
+        return nx.descendants(self, node)
+
+    def add_inputs(self, obj, keys):
+        self.add_nodes_from((obj, key) for key in keys)
+
+    def discard_inputs(self, obj):
+        pass
+
+    def descendants_from(self, sources):
+        """Return the union of the descendants of `sources` in one pass"""
+        visited = set()
+        stack = [n for n in sources if n in self]
+        while stack:
+            for n in self.successors(stack.pop()):
+                if n not in visited:
+                    visited.add(n)
+                    stack.append(n)
+        return visited
+
+    def ancestors_from(self, sources):
+        """Return the union of the ancestors of `sources` in one pass"""
+        visited = set()
+        stack = [n for n in sources if n in self]
+        while stack:
+            for n in self.predecessors(stack.pop()):
+                if n not in visited:
+                    visited.add(n)
+                    stack.append(n)
+        return visited
+
+    def relabel(self, mapping):
+        return nx.relabel_nodes(self, mapping)
+
     def add_path(self, nodes, **attr):
         """(Not used anymore) In replacement for Deprecated add_path method"""
         if nx.__version__[0] == "1":
@@ -454,7 +502,17 @@ class Model(IOSpecOperation, EditableParent):
 
     @property
     def tracegraph(self):
-        """A directed graph of cells."""
+        """A directed graph of cells.
+
+        By default, the graph is a compact graph supporting a subset of
+        the ``networkx.DiGraph`` interface.
+        To create models with ``networkx.DiGraph`` graphs as before,
+        set ``"networkx"`` to
+        ``modelx.core.model.TraceManager.graph_backend``
+        before creating the models.
+
+        .. versionchanged:: 0.22.0 The compact graph is used by default.
+        """
         return self._impl.tracegraph
 
     @property
@@ -511,22 +569,37 @@ class Model(IOSpecOperation, EditableParent):
         return result
 
     # ----------------------------------------------------------------------
-    def generate_actions(self, targets, step_size=1000):
+    def generate_actions(self, targets, step_size=1000, max_memory=None):
         """Generates actions for memory-optimized run
 
         Returns a list of *actions* for :meth:`execute_actions`
         to perform a memory-optimized calculation.
         See :meth:`execute_actions` for details.
 
+        If ``max_memory`` is given, the sizes of the calculated values
+        are measured in the run by this method, and
+        steps are split so that the estimated total size of the values
+        held in memory during each step does not exceed ``max_memory``
+        bytes. As the sizes are measured with the data set used for
+        this method, ``max_memory`` should be scaled by the ratio of
+        the data sizes.
+        The sizes are measured in the same way as
+        :meth:`set_memory_budget`.
+
         Args:
             targets: :obj:`list` of :class:`~modelx.core.node.ItemNode`.
             step_size(:obj:`int`, optional): Number of calculations in a step.
+                :obj:`None` for no limit on the number.
+            max_memory(:obj:`int`, optional): Target peak memory
+                in bytes of the values in a step.
 
         Returns:
             :obj:`list` of *actions*.
 
         .. seealso::
             * :meth:`execute_actions`
+
+        .. versionchanged:: 0.22.0 ``max_memory`` parameter is added.
         """
 
         calc_targets = []
@@ -544,8 +617,14 @@ class Model(IOSpecOperation, EditableParent):
 
                     calc_targets.append(n._impl)
 
+            if max_memory is not None:
+                sizes = {n: get_value_size(n[OBJ].data.get(n[KEY]))
+                         for n in calculated}
+            else:
+                sizes = None
+
             result = self._impl.get_calcsteps(
-                calc_targets, calculated, step_size)
+                calc_targets, calculated, step_size, sizes, max_memory)
 
         finally:
             for n in calculated:
@@ -553,7 +632,7 @@ class Model(IOSpecOperation, EditableParent):
 
         return result
 
-    def execute_actions(self, actions):
+    def execute_actions(self, actions, spill=False, spill_dir=None):
         """Performs memory-optimized run
 
         Performs a memory-optimized run.
@@ -590,7 +669,9 @@ class Model(IOSpecOperation, EditableParent):
         sort the nodes in a topological order.
         Then the ordered nodes are split into groups so that
         each group has at most the number of nodes specified by
-        ``step_size`` (1000 by default).
+        ``step_size`` (1000 by default), and if ``max_memory`` is given,
+        so that the values of each group and the values kept from
+        the earlier groups are estimated to fit in ``max_memory`` bytes.
         Then :meth:`generate_actions` generates actions
         to process each group.
         For each group, *calc*, *paste*, and *clear* actions are generated in this order.
@@ -638,18 +719,48 @@ class Model(IOSpecOperation, EditableParent):
         or :meth:`Space.clear_all<modelx.core.space.UserSpace.clear_all>`
         or :meth:`Model.clear_all<modelx.core.model.Model.clear_all>`.
 
+        If ``spill`` is :obj:`True`, the values to paste other than
+        the values of the targets are saved in files in a temporary
+        directory and removed from memory, instead of being kept in memory
+        until they are cleared.
+        Each saved value is loaded when it is referred to
+        in a later *calc* action, and removed from memory again by the
+        *clear* action that follows, so only the values used in
+        the current *calc* action are loaded at a time.
+        The file of the value is deleted by the *clear* action of the node.
+        NumPy arrays are saved in ``.npy`` files and loaded as
+        memory-mapped arrays in copy-on-write mode,
+        and the other values are pickled.
+        The temporary directory is created in ``spill_dir`` if given,
+        or in the default location of :mod:`tempfile` otherwise,
+        and is removed when the method exits.
+
         Args:
             actions(:obj:`list`): The *actions* list
+            spill(:obj:`bool`, optional): Whether to save values to paste
+                in files. Defaults to :obj:`False`.
+            spill_dir(:obj:`str`, optional): Directory to create
+                the temporary directory in.
 
         .. seealso::
             * :meth:`generate_actions`
             * `Running a heavy model while saving memory <https://modelx.io/blog/2022/03/26/running-model-while-saving-memory/>`_,
               a blog post on https://modelx.io
 
+        .. versionchanged:: 0.22.0 ``spill`` and ``spill_dir`` parameters
+           are added.
+
         """
+        if spill:
+            spiller = ValueSpiller(spill_dir)
+            spilled = set(n._impl for action, nodes in actions
+                          if action == "clear" for n in nodes)
+        else:
+            spiller = None
 
         gc_status = gc.isenabled()
         gc.disable()
+        self._impl.spiller = spiller
         try:
             for step in actions:
                 action, nodes = step
@@ -666,119 +777,799 @@ class Model(IOSpecOperation, EditableParent):
                         node_value_pairs.append(
                             [node, node[OBJ].get_value_from_key(node[KEY])]
                         )
+                    spilled_nodes = []
                     for node, value in node_value_pairs:
-                        node[OBJ].set_value_from_key(node[KEY], value)
+                        if spiller is not None and node in spilled:
+                            spiller.dump(node, value)
+                            spilled_nodes.append(node)
+                        else:
+                            node[OBJ].set_value_from_key(node[KEY], value)
+                    # Release the references to the pasted values
+                    node_value_pairs = value = None
+                    for node in spilled_nodes:
+                        node[OBJ].clear_value_at(node[KEY])
 
                 elif action == "clear":
                     for n in nodes:
                         node = n._impl
                         node[OBJ].clear_value_at(node[KEY])
 
+                    if spiller is not None:
+                        # Loaded again if used in later blocks
+                        for node in spiller.pop_loaded():
+                            node[OBJ].clear_value_at(node[KEY])
+
                     gc.collect()
+
+                    if spiller is not None:
+                        for n in nodes:     # No more reads
+                            spiller.discard(n._impl)
                 else:
                     raise RuntimeError("must not happen")
         finally:
+            self._impl.spiller = None
+            if spiller is not None:
+                spiller.close()
             if gc_status:
                 gc.enable()
 
+    @contextmanager
+    def batch_update(self):
+        """Context manager to update input values in a batch
+
+        Input values assigned to cells in the ``with`` block
+        are stored immediately, but
+        the values calculated from the inputs are not cleared
+        until the block exits.
+        On exiting the block, all the values depending on
+        any of the inputs are cleared at once,
+        and if :func:`~modelx.set_recalc` is set to :obj:`True`,
+        the cleared values at the ends of the dependency chains
+        are recalculated once.
+        This is faster than assigning many inputs one by one,
+        as each assignment searches and clears the dependent values
+        and recalculates them if recalc is on.
+
+        Values calculated from the inputs should not be used
+        in the block, as they are not updated until the block exits.
+        If the block is nested in another ``with batch_update()`` block,
+        the values are cleared when the outermost block exits.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> with model.batch_update():
+                ...     for i, value in enumerate(values):
+                ...         model.Space1.Cells1[i] = value
+
+        .. versionadded:: 0.22.0
+        """
+        impl = self._impl
+        if not impl.start_batch_update():
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            targets = impl.end_batch_update(impl.system._recalc_dependents)
+
+        for trg in targets:
+            trg[OBJ].get_value_from_key(trg[KEY])
+
+    @contextmanager
+    def bulk_edit(self):
+        """Context manager to build or edit the model in bulk
+
+        Cells and references created in the ``with`` block
+        are added to their spaces immediately, but
+        they are not inherited by the sub spaces of the spaces
+        until the block exits.
+        On exiting the block, each of the sub spaces
+        inherits all the members added to its base spaces at once.
+        This is faster than creating many members in spaces
+        that have sub spaces one by one,
+        as each creation updates all the sub spaces and
+        rebuilds their namespaces.
+
+        Editing operations other than creating cells, references
+        and spaces, such as deleting or renaming members or
+        changing formulas, update the sub spaces
+        before they are performed.
+        Formulas should not be evaluated in the block,
+        as the sub spaces may not have all their members.
+        If the block is nested in another ``with bulk_edit()`` block,
+        the sub spaces are updated when the outermost block exits.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> with model.bulk_edit():
+                ...     for i in range(100):
+                ...         model.Base.new_cells("Cells%d" % i)
+
+        .. versionadded:: 0.22.0
+        """
+        spmgr = self._impl.spmgr
+        if not spmgr.start_bulk_edit():
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            spmgr.end_bulk_edit()
+
+    def freeze(self):
+        """Freeze the model to make its structure read-only
+
+        While the model is frozen, the model structure cannot be changed.
+        Creating, deleting or renaming spaces, cells and references,
+        changing formulas, changing the values of references and
+        changing the bases of spaces raise an error.
+        Input values of cells can be set and cleared, and
+        :class:`~modelx.core.space.ItemSpace` objects are created and
+        deleted as usual.
+
+        Freezing the model brings the functions of
+        all the formulas and the namespaces up to date,
+        and the formulas are evaluated with the functions
+        without checking if they are up to date.
+        This is faster when the model is run many times
+        without being edited.
+
+        .. seealso::
+
+            * :meth:`unfreeze`
+            * :attr:`frozen`
+
+        .. versionadded:: 0.22.0
+        """
+        self._impl.freeze()
+
+    def unfreeze(self):
+        """Unfreeze the model frozen by :meth:`freeze`
+
+        .. versionadded:: 0.22.0
+        """
+        self._impl.unfreeze()
+
+    @property
+    def frozen(self):
+        """:obj:`True` if the model is frozen by :meth:`freeze`
+
+        .. versionadded:: 0.22.0
+        """
+        return self._impl.is_frozen
+
+    def write_actions(self, actions, path):
+        """Writes actions to a file
+
+        Writes *actions* generated by :meth:`generate_actions`
+        to a file, so that the actions can be read
+        by :meth:`read_actions` later, possibly in another session.
+        In the file, the Cells of the nodes are identified by
+        their names and the names of their parents relative to the model,
+        so the actions can be read into a model with a different name.
+
+        Args:
+            actions(:obj:`list`): The *actions* list
+            path: Path to the file to write
+
+        .. seealso::
+            * :meth:`read_actions`
+            * :meth:`retarget_actions`
+
+        .. versionadded:: 0.22.0
+        """
+        write_plan(encode_actions(actions), path)
+
+    def read_actions(self, path):
+        """Reads actions from a file
+
+        Reads *actions* written by :meth:`write_actions`
+        and returns them for :meth:`execute_actions`.
+        Before returning the actions, this method checks that
+        all the Cells in the actions exist in this model and
+        have the same parameters as when the actions were written.
+        ItemSpaces in the actions are created if they do not exist.
+
+        Args:
+            path: Path to the file to read
+
+        Returns:
+            :obj:`list` of *actions*.
+
+        Raises:
+            ValueError: If the actions do not match this model.
+
+        .. seealso::
+            * :meth:`write_actions`
+
+        .. versionadded:: 0.22.0
+        """
+        return decode_actions(self, read_plan(path))
+
+    def retarget_actions(self, actions, source, target):
+        """Returns actions for another ItemSpace
+
+        Returns a copy of *actions* in which nodes of the cells
+        in the ItemSpace ``source`` or in its child spaces are replaced
+        with the nodes of the cells of the same names
+        in the ItemSpace ``target``.
+        ``source`` and ``target`` must be the ItemSpaces
+        of the same parametric space.
+        Nodes not in ``source`` are not replaced.
+
+        This method is useful to run many ItemSpaces of a parametric space
+        whose dependency structures are the same,
+        such as ItemSpaces for model points, by generating actions once
+        for one of them.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> actions = model.generate_actions([s[1].Result.node()])
+
+                >>> for i in range(2, 100001):
+                ...     model.execute_actions(
+                ...         model.retarget_actions(actions, s[1], s[i]))
+
+        Args:
+            actions(:obj:`list`): The *actions* list
+            source(:class:`~modelx.core.space.ItemSpace`): ItemSpace
+                the actions are generated for
+            target(:class:`~modelx.core.space.ItemSpace`): ItemSpace
+                to generate actions for
+
+        Returns:
+            :obj:`list` of *actions*.
+
+        .. seealso::
+            * :meth:`generate_actions`
+            * :meth:`write_actions`
+
+        .. versionadded:: 0.22.0
+        """
+        for space in (source, target):
+            if not isinstance(space, ItemSpace) or space.model is not self:
+                raise ValueError("%s not an ItemSpace in %s" % (
+                    repr(space), self.name))
+
+        if source.parent is not target.parent:
+            raise ValueError(
+                "%s and %s not of the same parametric space" % (
+                    repr(source), repr(target)))
+
+        plan = retarget_plan(
+            encode_actions(actions), source._idtuple[1:], target._idtuple[1:])
+
+        return decode_actions(self, plan)
+
+    def set_memory_budget(self, maxbytes):
+        """Sets the memory budget for calculated values
+
+        Sets the maximum total size in bytes of the values calculated
+        by the formulas of the cells in this model.
+        When the total size exceeds ``maxbytes``,
+        the least recently used calculated values are cleared
+        together with the values depending on them,
+        until the total size gets under ``maxbytes``.
+        Values used by formulas being calculated are not cleared,
+        so the total size can exceed ``maxbytes`` during a calculation,
+        and the values are cleared when the outermost formula finishes.
+        Cleared values are calculated again when they are accessed.
+        Input values are not cleared, and not counted in the total size.
+
+        The sizes of NumPy arrays and pandas objects are the sizes of
+        their data, and the sizes of the other values are
+        the sizes measured by :func:`sys.getsizeof`.
+        Only the values calculated after the budget is set are counted.
+
+        :meth:`get_memory_stats` returns the total size and the number of
+        cleared values, which is useful to size the budget.
+
+        Args:
+            maxbytes(:obj:`int`): The budget in bytes. :obj:`None` to remove
+                the budget.
+
+        .. seealso:: :meth:`get_memory_stats`
+
+        .. versionadded:: 0.22.0
+        """
+        self._impl.set_memory_budget(maxbytes)
+
+    def get_memory_stats(self):
+        """Returns the statistics of the memory budget
+
+        Returns a :obj:`dict` of the statistics of the memory budget
+        set by :meth:`set_memory_budget`, or :obj:`None` if no budget is set.
+        The keys of the :obj:`dict` are:
+
+        * ``"maxbytes"``: The budget in bytes
+        * ``"used"``: The total size of the values in the budget in bytes
+        * ``"values"``: The number of the values in the budget
+        * ``"evicted"``: The number of the values cleared
+          to keep the budget
+        * ``"evicted_bytes"``: The total size of the values cleared
+          to keep the budget
+
+        .. seealso:: :meth:`set_memory_budget`
+
+        .. versionadded:: 0.22.0
+        """
+        if self._impl.memory_budget is None:
+            return None
+        else:
+            return self._impl.memory_budget.get_stats()
+
+    def export(self, path):
+        """Exports this model as a Python package independent of modelx
+
+        Writes a Python package to the folder ``path``, which
+        is created if it does not exist. The name of the folder becomes
+        the package name, so it must be a valid Python identifier.
+        The package does not import modelx, and does not
+        trace dependencies between values, so
+        it is suitable to run the model without modelx, or where
+        the overhead of the tracing is not desirable.
+
+        In the package, each space is translated into a class, and
+        each cells in the space is translated into
+        a method of the class. The method memoizes the values
+        it calculates in a :obj:`dict`.
+        The formulas of the cells are executed in the namespaces
+        of the spaces, which are created from the references
+        in the same way as in modelx.
+        Input values of the cells are exported together.
+        The package has ``mx_model`` as its attribute, and
+        the spaces are accessible as attributes of ``mx_model``.
+        Spaces in ``mx_model`` are accessible with the same names as
+        in this model, so the exported values can be verified against
+        the values of this model.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> model.export("path/to/mymodel")
+
+                >>> import sys
+                >>> sys.path.insert(0, "path/to")
+                >>> from mymodel import mx_model
+
+                >>> mx_model.Space1.foo(10) == model.Space1.foo(10)
+                True
+
+        The exported package has the following limitations:
+
+        * Values assigned to References must be picklable modules,
+          objects in this model, or picklable objects.
+        * Formulas of parametric spaces must not return
+          ``bases``.
+        * Formulas must not call methods of modelx objects,
+          such as :meth:`~modelx.core.cells.Cells.node`.
+        * Formulas are executed as normal Python functions, so
+          deep recursion can exceed the recursion limit of Python.
+
+        Python 3.9 or newer is required to export models.
+
+        Args:
+            path: Path to the folder to write the package in
+
+        .. versionadded:: 0.22.0
+        """
+        from modelx.export.exporter import export_model
+        export_model(self, path)
+
+
+def get_value_size(value):
+    """Return the size of ``value`` in bytes
+
+    The sizes of NumPy arrays and pandas objects are the sizes of their data.
+    The sizes of other objects are measured by ``sys.getsizeof``,
+    so the sizes of the objects they refer to are not included.
+    """
+    nbytes = getattr(type(value), "nbytes", None)
+    if nbytes is not None:
+        return int(value.nbytes)    # NumPy arrays, pandas Series and Index
+    elif hasattr(type(value), "memory_usage"):
+        return int(value.memory_usage(index=True).sum())    # DataFrame
+    else:
+        return sys.getsizeof(value)
+
+
+class MemoryBudget:
+    """LRU record of calculated values under a memory budget
+
+    Calculated values are recorded in order from least recently used.
+    When the total size exceeds ``maxbytes``, the least recently used
+    values are cleared together with their dependents by
+    :meth:`TraceManager.evict_with_descs`, except for values whose
+    dependents are being calculated.
+
+    Values calculated during a formula execution are all used by
+    the formulas in the call stack until the outermost formula finishes.
+    So once values cannot be evicted enough during an execution,
+    eviction is blocked until the executor calls :meth:`release`
+    at the end of the execution.
+    """
+
+    def __init__(self, model, maxbytes):
+        self.model = model
+        self.maxbytes = maxbytes
+        self.sizes = OrderedDict()  # node -> size, least recent first
+        self.used = 0
+        self.evicted = 0
+        self.evicted_bytes = 0
+        self.is_evicting = False
+        self.is_blocked = False
+
+    def add(self, node, value):
+        size = get_value_size(value)
+        self.sizes[node] = size
+        self.used += size
+        if (self.used > self.maxbytes
+                and not self.is_evicting and not self.is_blocked):
+            self.evict()
+
+    def touch(self, node):
+        if node in self.sizes:
+            self.sizes.move_to_end(node)
+
+    def discard(self, node):
+        size = self.sizes.pop(node, None)
+        if size is not None:
+            self.used -= size
+            if self.is_evicting:
+                self.evicted += 1
+                self.evicted_bytes += size
+
+    def evict(self):
+        graph = self.model.tracegraph
+        executor = self.model.system.executor
+        pending = set(executor.callstack)
+        inuse = graph.ancestors_from(pending) | pending if pending else ()
+        self.is_evicting = True
+        try:
+            for _ in range(len(self.sizes)):
+                if self.used <= self.maxbytes or not self.sizes:
+                    break
+                node = next(iter(self.sizes))
+                if node in inuse or node not in graph:
+                    self.sizes.move_to_end(node)    # In use
+                else:
+                    self.model.evict_with_descs(node)
+        finally:
+            self.is_evicting = False
+
+        if self.used > self.maxbytes and pending:
+            self.is_blocked = True
+            executor.deferred_calls[self.release] = None
+
+    def release(self):
+        """Evict values blocked during the last execution"""
+        self.is_blocked = False
+        if self.used > self.maxbytes and self.model.memory_budget is self:
+            self.evict()
+
+    def get_stats(self):
+        return {
+            "maxbytes": self.maxbytes,
+            "used": self.used,
+            "values": len(self.sizes),
+            "evicted": self.evicted,
+            "evicted_bytes": self.evicted_bytes
+        }
+
+
+class ValueSpiller:
+    """Values saved in files in a temporary directory
+
+    NumPy arrays are saved by ``numpy.save`` and loaded as
+    memory-mapped arrays. Other values are pickled.
+    The loaded nodes are recorded until :meth:`pop_loaded` is called.
+    """
+
+    def __init__(self, dir=None):
+        self.tempdir = tempfile.TemporaryDirectory(dir=dir)
+        self.paths = {}     # node -> file path
+        self.loaded = {}
+        self.counter = itertools.count()
+
+    def __contains__(self, node):
+        return node in self.paths
+
+    def dump(self, node, value):
+        np = sys.modules.get("numpy")
+        filename = os.path.join(self.tempdir.name, str(next(self.counter)))
+        if (np is not None and type(value) is np.ndarray
+                and not value.dtype.hasobject):
+            filename += ".npy"
+            np.save(filename, value, allow_pickle=False)
+        else:
+            filename += ".pickle"
+            with open(filename, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.paths[node] = filename
+
+    def load(self, node):
+        filename = self.paths[node]
+        self.loaded[node] = None
+        if filename.endswith(".npy"):
+            return sys.modules["numpy"].load(filename, mmap_mode="c")
+        else:
+            with open(filename, "rb") as f:
+                return pickle.load(f)
+
+    def pop_loaded(self):
+        loaded, self.loaded = self.loaded, {}
+        return list(loaded)
+
+    def discard(self, node):
+        filename = self.paths.pop(node, None)
+        self.loaded.pop(node, None)
+        if filename is not None:
+            try:
+                os.remove(filename)
+            except OSError:     # Still mapped on Windows. Removed on close
+                pass
+
+    def close(self):
+        self.paths.clear()
+        self.loaded.clear()
+        try:
+            self.tempdir.cleanup()
+        except OSError:     # Files still mapped on Windows
+            pass
+
 
 class TraceManager:
 
     __slots__ = ()
     __mixin_slots = (
         "tracegraph",
-        "refgraph"
+        "refgraph",
+        "untracked_nodes",
+        "memory_budget",
+        "spiller",
+        "batch_inputs"
     )
+    __no_state = ("memory_budget", "spiller", "batch_inputs")
+
+    graph_backends = {
+        "compact": (CompactTraceGraph, CompactReferenceGraph),
+        "networkx": (TraceGraph, ReferenceGraph)
+    }
+    graph_backend = "compact"   # Backend of graphs for new models
 
     def __init__(self):
-        self.tracegraph = TraceGraph()
-        self.refgraph = ReferenceGraph()
+        tracegraph, refgraph = self.graph_backends[self.graph_backend]
+        self.tracegraph = tracegraph()
+        self.refgraph = refgraph()
+        self.untracked_nodes = set()
+        self.memory_budget = None
+        self.spiller = None
+        self.batch_inputs = None
+
+    def set_memory_budget(self, maxbytes):
+        if maxbytes is None:
+            self.memory_budget = None
+        elif self.memory_budget is None:
+            self.memory_budget = MemoryBudget(self, maxbytes)
+        else:
+            self.memory_budget.maxbytes = maxbytes
+            if self.memory_budget.used > maxbytes:
+                self.memory_budget.evict()
+
+    def clear_untracked(self):
+        """Clear values calculated without dependency tracking.
+
+        As the dependents of the untracked nodes are not known,
+        all the untracked nodes are cleared whenever any node is cleared.
+        """
+        nodes, self.untracked_nodes = self.untracked_nodes, set()
+        warnings.warn(
+            "%s values calculated without dependency tracking cleared"
+            % len(nodes))
+        for node in nodes:
+            self.clear_with_descs(node)
 
     def clear_with_descs(self, node):
         """Clear values and nodes calculated from `source`."""
+        if self.untracked_nodes:
+            self.clear_untracked()
         removed = self.tracegraph.remove_with_descs(node)
         self.refgraph.remove_nodes_from(removed)
-        for node in removed:
-            node[OBJ].on_clear_trace(node[KEY])
+        self._on_clear_nodes(removed)
+
+    def evict_with_descs(self, node):
+        """Clear `node` and its dependents to free memory.
+
+        Unlike :meth:`clear_with_descs`, the untracked nodes are not
+        cleared, as no input is changed. An untracked node has no
+        known dependents, so it is cleared alone.
+        """
+        removed = self.tracegraph.remove_with_descs(node)
+        self.refgraph.remove_nodes_from(removed)
+        self.untracked_nodes.difference_update(removed)
+        self._on_clear_nodes(removed)
 
     def clear_obj(self, obj):
         """Clear values and nodes of `obj` and their dependants."""
+        if self.untracked_nodes:
+            self.clear_untracked()
         removed = self.tracegraph.clear_obj(obj)
         self.refgraph.remove_nodes_from(removed)
-        for node in removed:
-            node[OBJ].on_clear_trace(node[KEY])
+        self._on_clear_nodes(removed)
 
     def clear_attr_referrers(self, ref):
+        if self.untracked_nodes:
+            self.clear_untracked()
         removed = self.refgraph.remove_with_descs(ref)
         for node in removed:
             descs = self.tracegraph.remove_with_descs(node)
-            for desc in descs:
-                desc[OBJ].on_clear_trace(desc[KEY])
+            self._on_clear_nodes(descs)
+
+    def start_batch_update(self):
+        if self.batch_inputs is None:
+            self.batch_inputs = {}
+            return True
+        else:
+            return False    # Nested
+
+    def end_batch_update(self, recalc):
+        """Clear values calculated from the inputs set in the batch
+
+        The descendants of all the inputs are found in one traversal
+        and cleared. The edges to the inputs from the nodes they were
+        calculated from are removed.
+
+        Returns:
+            list: The nodes to recalculate if ``recalc`` is true.
+        """
+        nodes, self.batch_inputs = self.batch_inputs, None
+        if self.untracked_nodes:
+            self.clear_untracked()
+
+        graph = self.tracegraph
+        nodes = [n for n in nodes if n in graph]    # Not cleared in batch
+        descs = graph.descendants_from(nodes)
+        descs.difference_update(nodes)
 
-    def get_calcsteps(self, targets, nodes, step_size):
+        if recalc:
+            targets = [n for n in descs if not graph.out_degree(n)]
+        else:
+            targets = []
+
+        graph.remove_nodes_from(descs)
+        self.refgraph.remove_nodes_from(descs)
+        self._on_clear_nodes(descs)
+
+        graph.remove_nodes_from(nodes)
+        self.refgraph.remove_nodes_from(nodes)
+        for node in nodes:
+            graph.add_node(node)
+            if self.memory_budget is not None:
+                self.memory_budget.discard(node)
+
+        return targets
+
+    def _on_clear_nodes(self, nodes):
+        if self.memory_budget is not None:
+            for node in nodes:
+                self.memory_budget.discard(node)
+        for node in nodes:
+            node[OBJ].on_clear_trace(node[KEY])
+
+    def get_calcsteps(self, targets, nodes, step_size, sizes=None,
+                      max_memory=None):
         """ Get calculation steps
-        Calculate a new block
-        Find nodes to paste in the block
-        Find nodes to clear from the earlier blocks
-        Push the paste node in the earlier blocks
+
+        Sort ``nodes`` topologically and find the position of the last
+        node using each node (liveness) in one pass.
+        Then split the sorted nodes into blocks and for each block,
+        find nodes to paste in the block and
+        nodes to clear from the block and the earlier blocks.
+
+        A block has at most ``step_size`` nodes. If ``max_memory`` is given,
+        a block is also closed before the total of ``sizes`` of the values
+        in the block and the values pasted in the earlier blocks
+        and still used exceeds ``max_memory``.
         """
         subgraph = self.tracegraph.subgraph(nodes)
 
-        ordered = list(nx.topological_sort(subgraph))
+        if sizes is None or max_memory is None:
+            sizes, max_memory = {}, None
+            ordered = subgraph.topological_sort()
+        else:
+            ordered = self._get_depth_first_order(subgraph, targets)
         node_len = len(ordered)
-
-        pasted = []         # in reverse order
-        step = 0
+        targets = set(targets)
+        if step_size is None:
+            step_size = node_len or 1
+
+        INF = node_len      # Used after the last node
+        pos = {n: i for i, n in enumerate(ordered)}
+        lastuse = [INF if n in targets else
+                   max((pos[s] for s in subgraph.successors(n)), default=-1)
+                   for n in ordered]
+
+        expiring = {}   # position of last use -> pasted nodes
+        pastenum = {}   # pasted node -> order of paste
+        live_size = 0   # Total size of pasted nodes still used
+        start = 0
         result = []
-        while step * step_size < node_len:
-
-            start = step * step_size
-            stop = min(node_len, (step + 1) * step_size)
+        while start < node_len:
+
+            stop = start + 1
+            block_size = sizes.get(ordered[start], 0)
+            while stop < node_len and stop - start < step_size:
+                size = sizes.get(ordered[stop], 0)
+                if (max_memory is not None
+                        and live_size + block_size + size > max_memory):
+                    break
+                block_size += size
+                stop += 1
 
             cur_block = ordered[start:stop]
             cur_paste = []
             cur_clear = []
-            cur_targets = []    # also included in cur_paste
-            for n in cur_block:
-
-                paste = False
-                if n in targets:
-                    cur_targets.append(n)
-                    paste = True
-                else:
-                    for suc in subgraph.successors(n):
-                        if suc not in cur_block:
-                            paste = True
-                            break
-                if paste:
+            for i in range(start, stop):
+                n = ordered[i]
+                if lastuse[i] >= stop:
                     cur_paste.append(n)
+                    if n not in targets:
+                        pastenum[n] = len(pastenum)
+                        expiring.setdefault(lastuse[i], []).append(n)
+                        live_size += sizes.get(n, 0)
                 else:
                     cur_clear.append(n)
 
-            accum_nodes = set(ordered[:stop])
-            for n in pasted.copy():
-
-                paste = False
-                for suc in subgraph.successors(n):
-                    if suc not in accum_nodes:
-                        paste = True
-                        break
-
-                if not paste:
-                    cur_clear.append(n)
-                    pasted.remove(n)
-
-            for n in cur_paste:
-                if n not in cur_targets:
-                    pasted.append(n)
+            expired = []
+            for i in range(start, stop):
+                expired.extend(expiring.pop(i, ()))
+            expired.sort(key=pastenum.get)
+            for n in expired:
+                live_size -= sizes.get(n, 0)
+            cur_clear.extend(expired)
 
             result.append(['calc', [ItemNode(n) for n in cur_block]])
             result.append(['paste', [ItemNode(n) for n in reversed(cur_paste)]])
             result.append(['clear', [ItemNode(n) for n in cur_clear]])
 
-            step += 1
+            start = stop
 
-        assert not pasted
+        assert not expiring
+        return result
+
+    @staticmethod
+    def _get_depth_first_order(graph, targets):
+        """Sort nodes in the order of evaluation from ``targets``
+
+        Each node is placed right after its precedents, so that
+        values are used soon after they are calculated.
+        """
+        result = []
+        visited = set()
+        for root in itertools.chain(targets, graph.nodes()):
+            if root in visited or root not in graph:
+                continue
+            visited.add(root)
+            stack = [(root, iter(graph.predecessors(root)))]
+            while stack:
+                node, preds = stack[-1]
+                for pred in preds:
+                    if pred not in visited:
+                        visited.add(pred)
+                        stack.append((pred, iter(graph.predecessors(pred))))
+                        break
+                else:
+                    stack.pop()
+                    result.append(node)
         return result
 
 
@@ -801,8 +1592,10 @@ class ModelImpl(*_model_impl_base):
         "_dynamic_bases_inverse",
         "_dynamic_base_namer",
         "currentspace",
-        "refmgr"
+        "refmgr",
+        "is_frozen"
     ) + get_mixin_slots(*_model_impl_base)
+    __no_state = ("is_frozen",)
 
     def __init__(self, *, system, name):
 
@@ -832,6 +1625,7 @@ class ModelImpl(*_model_impl_base):
         self.allow_none = False
         self.lazy_evals = self._namespace
         self.refmgr = ReferenceManager(self, system.iomanager)
+        self.is_frozen = False
 
     def rename(self, name):
         """Rename self. Must be called only by its system."""
@@ -887,7 +1681,7 @@ class ModelImpl(*_model_impl_base):
         graphs = {
             name: graph
             for name, graph in state.items()
-            if isinstance(graph, TraceGraph)
+            if isinstance(graph, (TraceGraph, CompactTraceGraph))
         }
 
         for gname, graph in graphs.items():
@@ -898,7 +1692,10 @@ class ModelImpl(*_model_impl_base):
                     mapping[node] = (name, node[KEY])
                 else:
                     mapping[node] = name
-            state[gname] = nx.relabel_nodes(graph, mapping)
+            state[gname] = graph.relabel(mapping)
+            if gname == "tracegraph":
+                state["untracked_nodes"] = set(
+                    mapping[node] for node in self.untracked_nodes)
 
         state["ios"] = list(spec.io for spec in self.refmgr.specs)
         return state
@@ -922,7 +1719,13 @@ class ModelImpl(*_model_impl_base):
             cells = self.get_impl_from_name(name)
             mapping[node] = get_node(cells, key, None)
 
-        self.tracegraph = nx.relabel_nodes(self.tracegraph, mapping)
+        self.tracegraph = self.tracegraph.relabel(mapping)
+        self.untracked_nodes = set(     # Not in backups before 0.22.0
+            mapping[node] for node in getattr(self, "untracked_nodes", ()))
+        self.memory_budget = None
+        self.spiller = None
+        self.batch_inputs = None
+        self.is_frozen = False
 
         self._global_refs.restore_state()
 
@@ -939,6 +1742,31 @@ class ModelImpl(*_model_impl_base):
     def updater(self):
         return SpaceUpdater(self.spmgr)
 
+    # ----------------------------------------------------------------------
+    # Freeze
+
+    def freeze(self):
+        """Update all the bound functions and namespaces and freeze self"""
+        self.spmgr.update_pending_subs()
+        spaces = list(self.named_spaces.values())
+        while spaces:
+            space = spaces.pop()
+            space.update_lazyevals()
+            if space.formula is not None:
+                space.altfunc.fresh
+            for cells in space.cells.values():
+                cells.altfunc.fresh
+            spaces.extend(space.named_spaces.values())
+
+        self.is_frozen = True
+
+    def unfreeze(self):
+        self.is_frozen = False
+
+    def check_not_frozen(self):
+        if self.is_frozen:
+            raise RuntimeError("model '%s' is frozen" % self.name)
+
     def del_ref(self, name):
         ref = self.global_refs[name]
         self.model.clear_attr_referrers(ref)
@@ -1342,13 +2170,16 @@ class SpaceGraph(nx.DiGraph):
         return next((n for n in parents if self._is_endpoint(n, edge)), node)
 
     def _visit_treenodes_levels(self, node, include_self=True):
+        # Scan all the nodes only once to find the descendants
+        prefix = node + "."
+        descs = [n for n in self.nodes if n.startswith(prefix)]
         que = [node]
         level = 0
         while que:
             n = que.pop(0)
             if n != node or include_self:
                 yield level, n
-            childs = [ch for ch in self.nodes
+            childs = [ch for ch in descs
                       if ch[:len(n) + 1] == (n + ".")
                       and len_node(n) + 1 == len_node(ch)]
             que += childs
@@ -1609,8 +2440,111 @@ class SharedSpaceOperations:
 
 class SpaceManager(SharedSpaceOperations):
 
+    def __init__(self, model):
+        super().__init__(model)
+        self._init_bulk_edit()
+
+    def _init_bulk_edit(self):
+        self._pending = None    # idstr -> space, None if not in bulk edit
+        self._pending_names = set()
+        self._subs_cache = {}
+        self._subs_graph = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attr in ("_pending", "_pending_names",
+                     "_subs_cache", "_subs_graph"):
+            del state[attr]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_bulk_edit()
+
+    # ----------------------------------------------------------------------
+    # Bulk edit
+
+    def start_bulk_edit(self):
+        if self._pending is None:
+            self._pending = {}
+            return True
+        else:
+            return False    # Nested
+
+    def end_bulk_edit(self):
+        try:
+            self.update_pending_subs()
+        finally:
+            self._init_bulk_edit()
+
+    def _add_pending(self, space, name):
+        """Defer updating the sub spaces of ``space`` in bulk edit
+
+        Returns True if the update is deferred.
+        """
+        if self._pending is None or not self._get_subs(space):
+            return False
+        self._pending[space.idstr] = space
+        self._pending_names.add(name)
+        return True
+
+    def update_pending_subs(self):
+        """Update the sub spaces of the spaces edited in bulk edit
+
+        Each sub space inherits the members added to its base spaces
+        at once, in the order of the inheritance.
+        """
+        if not self._pending:
+            return
+
+        spaces = list(self._pending.values())
+        self._pending.clear()
+        self._pending_names.clear()
+
+        subs = {}
+        for space in spaces:
+            for sub in self._get_subs(space):
+                subs[sub.idstr] = sub
+
+        subs = [subs[n] for n in nx.topological_sort(self._graph)
+                if n in subs]
+
+        for sub in subs:
+            sub.clear_subs_rootitems()
+
+        for attr in ("cells", "own_refs"):
+            for sub in subs:
+                sub.on_inherit(self, self._get_space_bases(sub), attr)
+
+    def _find_name_in_subs(self, parent, name):
+        if name in self._pending_names:
+            self.update_pending_subs()
+        return super()._find_name_in_subs(parent, name)
+
+    def _get_subs(self, space, skip_self=True):
+        if self._pending is None:
+            return super()._get_subs(space, skip_self)
+
+        # Cache subs while the graph is unchanged in bulk edit
+        if self._subs_graph is not self._graph:
+            self._subs_cache.clear()
+            self._subs_graph = self._graph
+
+        subs = self._subs_cache.get(space.idstr)
+        if subs is None:
+            subs = self._subs_cache[space.idstr] = super()._get_subs(
+                space, skip_self=False)
+
+        return subs[1:] if skip_self else list(subs)
+
+    # ----------------------------------------------------------------------
+    # Editing operations
+
     def rename_space(self, space, name):
 
+        self.model.check_not_frozen()
+        self.update_pending_subs()
+
         # Check name does not exit already
         parent = space.parent
         if not self._can_add(
@@ -1654,8 +2588,11 @@ class SpaceManager(SharedSpaceOperations):
         # Rename nodes
         nx.relabel_nodes(self._inheritance, mapping, copy=False)
         nx.relabel_nodes(self._graph, mapping, copy=False)
+        self._subs_cache.clear()
 
     def del_cells(self, space, name):
+        self.model.check_not_frozen()
+        self.update_pending_subs()
         cells = space.cells[name]
         if cells.is_derived():
             raise ValueError("cannot delete derived")
@@ -1663,6 +2600,7 @@ class SpaceManager(SharedSpaceOperations):
         self.update_subs(space, skip_self=False)
 
     def del_ref(self, space, name):
+        self.update_pending_subs()
         space.on_del_ref(name)
         self.update_subs(space, skip_self=False)
 
@@ -1671,6 +2609,7 @@ class SpaceManager(SharedSpaceOperations):
 
         # FIX: Creating a Cells of the same name in ``space``
 
+        self.model.check_not_frozen()
         if not self._can_add(space, name, CellsImpl, overwrite=overwrite):
             raise ValueError("Cannot create cells '%s'" % name)
 
@@ -1685,6 +2624,9 @@ class SpaceManager(SharedSpaceOperations):
 
         name = cells.name   # If name is none, auto-named in __init__
 
+        if self._add_pending(space, name):
+            return cells
+
         for subspace in self._get_subs(space):
             if name in subspace.cells:
                 break
@@ -1700,12 +2642,16 @@ class SpaceManager(SharedSpaceOperations):
 
                 idx = list(base_cells).index(name)
                 cells_after = list(subspace.cells)[idx:]
+                if not cells_after:
+                    # Appended without refreshing the whole namespace
+                    subspace._cells.add_item(name, derived)
+                    continue
+
                 subspace._cells.set_item(name, derived)
 
                 for k in cells_after:
                     subspace._cells[k] = subspace._cells.pop(k)
 
-
         return cells
 
     def copy_cells(self, space: UserSpaceImpl,
@@ -1736,6 +2682,8 @@ class SpaceManager(SharedSpaceOperations):
                 cells.bases[0].get_repr(fullname=True, add_params=False)))
 
         old_name = cells.name
+        self.model.check_not_frozen()
+        self.update_pending_subs()
 
         for space in self._get_subs(cells.parent, skip_self=False):
             space.clear_subs_rootitems()
@@ -1749,10 +2697,14 @@ class SpaceManager(SharedSpaceOperations):
           are sorted and placed before the derived/overridden cells.
         - Derived/overridden cells in the sub spaces are also sorted.
         """
+        self.model.check_not_frozen()
+        self.update_pending_subs()
         for subspace in self._get_subs(space, skip_self=False):
             subspace.on_sort_cells(space=space)
 
     def change_cells_formula(self, cells, func):
+        self.model.check_not_frozen()
+        self.update_pending_subs()
         define = True
         for space in self._get_subs(cells.parent, skip_self=False):
             c = space.cells[cells.name]
@@ -1798,6 +2750,9 @@ class SpaceManager(SharedSpaceOperations):
         result = space.on_create_ref(name, value, is_derived=False,
                             refmode=refmode)
 
+        if self._add_pending(space, name):
+            return result
+
         for subspace in self._get_subs(space):
             is_relative = False
             if name in subspace.own_refs:
@@ -1815,6 +2770,7 @@ class SpaceManager(SharedSpaceOperations):
     def change_ref(self, space, name, value, refmode):
         """Assigns a new value to an existing name."""
 
+        self.update_pending_subs()
         self._check_subs_relrefs(space, name, value, refmode)
         self._set_defined(space.idstr)
         space.set_defined()
@@ -1999,6 +2955,9 @@ class SpaceUpdater(SharedSpaceOperations):
             source: A source module from which cell definitions are read.
             prefix: Prefix to the autogenerated name when name is None.
         """
+        if container is None:   # Dynamic bases are created in calculation
+            self.model.check_not_frozen()
+
         if name is None:
             while True:
                 name = parent.spacenamer.get_next(parent.namespace, prefix)
@@ -2094,6 +3053,8 @@ class SpaceUpdater(SharedSpaceOperations):
     def add_bases(self, space, bases):
         """Add bases to space in graph
         """
+        self.model.check_not_frozen()
+        self.manager.update_pending_subs()
         node = space.idstr
         basenodes = [base.idstr for base in bases]
 
@@ -2152,6 +3113,8 @@ class SpaceUpdater(SharedSpaceOperations):
 
     def remove_bases(self, space, bases):
 
+        self.model.check_not_frozen()
+        self.manager.update_pending_subs()
         node = space.idstr
         basenodes = [base.idstr for base in bases]
 
@@ -2206,6 +3169,8 @@ class SpaceUpdater(SharedSpaceOperations):
 
     def del_defined_space(self, space):
 
+        self.model.check_not_frozen()
+        self.manager.update_pending_subs()
         if space.is_derived():
             raise ValueError(
                 "%s has derived spaces" % repr(space.interface)
@@ -2260,6 +3225,8 @@ class SpaceUpdater(SharedSpaceOperations):
         if name is None:
             name = source.name
 
+        self.model.check_not_frozen()
+        self.manager.update_pending_subs()
         if self.manager._can_add(
             parent, name, EditableParentImpl, overwrite=False):
             return self._copy_space_recursively(
@@ -2338,6 +3305,7 @@ class ReferenceManager:
 
     def new_ref(self, impl, name, value, refmode):
 
+        self._model.check_not_frozen()
         if isinstance(impl, ModelImpl):
             ref = impl.new_ref(name, value)
         elif isinstance(impl, UserSpaceImpl):
@@ -2356,6 +3324,7 @@ class ReferenceManager:
 
     def del_ref(self, impl, name):
 
+        self._model.check_not_frozen()
         refdict = impl.own_refs
         ref = refdict[name]
         valid = id(ref.interface)
@@ -2382,6 +3351,7 @@ class ReferenceManager:
 
     def change_ref(self, impl, name, value, refmode=None):
 
+        self._model.check_not_frozen()
         refdict = impl.own_refs
         prev_ref = refdict[name]
         prev_valid = id(prev_ref.interface)
@@ -22,30 +22,90 @@ class NamespaceServer:
         "_namespace",
         "observing",
         "is_fresh",
-        "_referrers"
+        "_referrers",
+        "_name_index",
+        "_indexed_names"
     )
+    __no_state = ("_name_index", "_indexed_names")
 
     def __init__(self, namespace: ImplChainMap):
         self._namespace = namespace
         self.is_fresh = True   # dummy
-        self.observing = []         # dummy
-        self._referrers = []
+        self.observing = {}         # dummy
+        self._referrers = {}    # Keyed by id
+        self._name_index = None     # name -> referrers, None for all names
+        self._indexed_names = None  # id -> names
         self._namespace.append_observer(self)
 
     def set_refresh(self):
         self.notify_referrers(is_all=True)
 
     def add_referrer(self, referrer: "BaseNamespaceReferrer"):
-        if all(referrer is not other for other in self._referrers):
-            self._referrers.append(referrer)
+        if id(referrer) not in self._referrers:
+            self._referrers[id(referrer)] = referrer
+            if self._name_index is not None:
+                self._index_referrer(referrer)
 
     def remove_referrer(self, referrer: "BaseNamespaceReferrer"):
-        self._referrers.remove(referrer)
+        del self._referrers[id(referrer)]
+        if self._name_index is not None:
+            self._unindex_referrer(referrer)
+
+    def update_referrer(self, referrer: "BaseNamespaceReferrer"):
+        """Update the index after the names referred to by referrer change"""
+        if self._name_index is not None and id(referrer) in self._referrers:
+            self._unindex_referrer(referrer)
+            self._index_referrer(referrer)
+
+    def _index_referrer(self, referrer):
+        names = referrer.get_referred_names()
+        self._indexed_names[id(referrer)] = names
+        for name in ((None,) if names is None else names):
+            self._name_index.setdefault(name, {})[id(referrer)] = referrer
+
+    def _unindex_referrer(self, referrer):
+        names = self._indexed_names.pop(id(referrer))
+        for name in ((None,) if names is None else names):
+            referrers = self._name_index[name]
+            del referrers[id(referrer)]
+            if not referrers:
+                del self._name_index[name]
+
+    def _get_referrers(self, names):
+        """Get referrers referring to any of names
+
+        The index is created at the first call, so that
+        namespace servers never notified of names do not index referrers.
+        """
+        if self._name_index is None:
+            self._name_index = {}
+            self._indexed_names = {}
+            for referrer in self._referrers.values():
+                self._index_referrer(referrer)
+
+        result = dict(self._name_index.get(None, {}))
+        for name in names:
+            if name.__class__ is not str:
+                return list(self._referrers.values())
+            result.update(self._name_index.get(name, {}))
+
+        return list(result.values())
 
     def notify_referrers(self, is_all=True, names=None):
-        for referrer in self._referrers:
+        if is_all:
+            referrers = list(self._referrers.values())
+        else:
+            referrers = self._get_referrers(names)
+
+        for referrer in referrers:
             referrer.on_namespace_change(is_all, names)
 
+    def __setstate(self, state):
+        # Object ids change by unpickling
+        self._referrers = {id(v): v for v in self._referrers.values()}
+        self._name_index = None
+        self._indexed_names = None
+
     def on_add_item(self, sender, name, value):
         self.notify_referrers(is_all=False, names=[name])
 
@@ -75,5 +135,9 @@ class BaseNamespaceReferrer:
     def on_namespace_change(self, is_all, names):
         raise NotImplementedError
 
+    def get_referred_names(self):
+        """Return names to be notified of, or None for all names"""
+        return None
+
 
 
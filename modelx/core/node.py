@@ -12,6 +12,7 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library.  If not, see <http://www.gnu.org/licenses/>.
 
+import sys
 from collections.abc import Sequence
 
 OBJ = 0
@@ -85,9 +86,60 @@ def tuplize_key(obj, key, remove_extra=False):
 
 
 def _bind_args(obj, args, kwargs):
-    boundargs = obj.formula.signature.bind(*args, **kwargs)
-    boundargs.apply_defaults()
-    return tuple(boundargs.arguments.values())
+    return obj.formula.get_key(args, kwargs)
+
+
+class ArrayArg:
+    """Hashable argument wrapping a NumPy array
+
+    Used in the keys of ItemSpaces whose arguments are arrays.
+    Wrapped arrays are made read-only, and compared by their contents.
+    """
+    __slots__ = ("value", "_hash")
+
+    def __init__(self, value):
+        if value.flags.writeable:
+            value = value.copy()
+            value.flags.writeable = False
+        self.value = value
+        self._hash = hash(
+            (value.shape, value.dtype.str, value.tobytes()))
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, ArrayArg):
+            return self is other or (
+                self._hash == other._hash
+                and self.value.shape == other.value.shape
+                and self.value.dtype == other.value.dtype
+                and self.value.tobytes() == other.value.tobytes())
+        else:
+            return NotImplemented
+
+    def __reduce__(self):
+        return ArrayArg, (self.value,)
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+def wrap_array(value):
+    """Wrap ``value`` by ArrayArg if it is a NumPy array"""
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray):
+        return ArrayArg(value)
+    else:
+        return value
+
+
+def unwrap_array(value):
+    """Return the array if ``value`` is an ArrayArg"""
+    if value.__class__ is ArrayArg:
+        return value.value
+    else:
+        return value
 
 
 def get_node_repr(node):
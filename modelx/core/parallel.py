@@ -0,0 +1,132 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Evaluation of ItemSpaces in worker processes
+
+Each worker process holds its own copy of the model.
+The copy is inherited from the parent process if the ``fork``
+start method is used, otherwise it is read by
+:func:`~modelx.read_model` from the model written to a temporary folder.
+See :func:`~modelx.core.util.get_mp_context` for the start method.
+"""
+
+import os.path
+import tempfile
+import traceback
+from modelx.core.errors import FormulaError
+from modelx.core.util import get_mp_context
+from modelx.core.node import get_node, tuplize_key, KEY
+
+_space = None       # The parametric space in the worker process
+_targets = None     # List of (cells name, cells args) tuples
+
+
+def _init_worker(fullname, targets, model_path=None):
+    global _space, _targets
+
+    from modelx.core.system import mxsys
+
+    if model_path is not None:
+        from modelx.core.api import read_model
+        read_model(model_path, name=fullname.split(".")[0])
+
+    _space = mxsys.get_object(fullname)._impl
+    _targets = targets
+
+
+def _eval_chunk(chunk):
+    """Evaluate the targets in the ItemSpaces of the keys in ``chunk``
+
+    The ItemSpaces are deleted after evaluation to free memory.
+    Returns a list of tuples of index, values and error message.
+    """
+    result = []
+    for i, key in chunk:
+        node = get_node(_space, key, None)
+        try:
+            space = _space.system.executor.eval_node(node)
+            values = [space.get_impl_from_name(name).interface(*args)
+                      for name, args in _targets]
+        except Exception as err:
+            errmsg = "".join(traceback.format_exception_only(type(err), err))
+            result.append((i, None, errmsg))
+        else:
+            result.append((i, values, None))
+        finally:
+            _space.clear_itemspace_at(node[KEY])
+
+    return result
+
+
+def _normalize_target(target):
+    if isinstance(target, str):
+        return target, ()
+    else:
+        name, args = target
+        return name, tuple(args)
+
+
+def eval_itemspaces(space, argslist, targets, processes=None, chunksize=1):
+    """Evaluate ``targets`` in the ItemSpaces of ``space`` in parallel"""
+
+    if space.system.callstack:
+        raise RuntimeError("cannot be called during formula execution")
+
+    if not space.formula:
+        raise ValueError("%s does not have formula" % space.evalrepr)
+
+    keys = [tuplize_key(space, args) for args in argslist]
+    targets = [_normalize_target(t) for t in targets]
+    fullname = space.get_fullname()
+
+    indexed = list(enumerate(keys))
+    chunks = [
+        indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)
+    ]
+
+    context = get_mp_context()
+    if context.get_start_method() == "fork":
+        return _run_pool(context, chunks, keys, processes,
+                         (fullname, targets))
+    else:
+        from modelx.core.api import write_model
+        with tempfile.TemporaryDirectory() as tempdir:
+            model_path = os.path.join(tempdir, space.model.name)
+            write_model(space.model.interface, model_path)
+            return _run_pool(context, chunks, keys, processes,
+                             (fullname, targets, model_path))
+
+
+def _run_pool(context, chunks, keys, processes, initargs):
+
+    results = [None] * len(keys)
+    errors = []
+
+    with context.Pool(processes, initializer=_init_worker,
+                      initargs=initargs) as pool:
+        for chunk in pool.imap(_eval_chunk, chunks):
+            for i, values, errmsg in chunk:
+                if errmsg is None:
+                    results[i] = values
+                else:
+                    errors.append((keys[i], errmsg))
+
+    if errors:
+        errmsg = "Error raised in %s of %s ItemSpaces\n" % (
+            len(errors), len(keys))
+        for key, msg in errors:
+            errmsg += "\nItemSpace with args %s:\n%s" % (key, msg)
+        raise FormulaError(errmsg)
+
+    return results
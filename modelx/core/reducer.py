@@ -0,0 +1,143 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Reduction of values in ItemSpaces created and deleted chunk by chunk
+
+The ItemSpaces of a chunk are deleted after their values are
+added to the reduced results, so only the reduced results are kept
+regardless of the number of the ItemSpaces.
+"""
+
+import time
+import operator
+import itertools
+from modelx.core.node import get_node, tuplize_key, KEY
+from modelx.core.parallel import _normalize_target
+
+
+class ConcatReducer:
+    """Concatenate values into a NumPy array if NumPy is available"""
+
+    def __init__(self):
+        self.chunks = []
+        try:
+            import numpy
+            self.np = numpy
+        except ImportError:
+            self.np = None
+
+    def add(self, values):
+        if self.np is not None:
+            self.chunks.append(self.np.asarray(values))
+        else:
+            self.chunks.append(values)
+
+    def get_result(self):
+        if self.np is not None:
+            if self.chunks:
+                return self.np.concatenate(self.chunks)
+            else:
+                return self.np.array([])
+        else:
+            return list(itertools.chain.from_iterable(self.chunks))
+
+
+class FuncReducer:
+    """Reduce values by a function taking two values like ``sum``"""
+
+    def __init__(self, func):
+        self.func = func
+        self.result = None
+        self.is_empty = True
+
+    def add(self, values):
+        for value in values:
+            if self.is_empty:
+                self.result = value
+                self.is_empty = False
+            else:
+                self.result = self.func(self.result, value)
+
+    def get_result(self):
+        return self.result
+
+
+def _new_reducer(reducer):
+    if reducer == "sum":
+        return FuncReducer(operator.add)
+    elif reducer == "concat":
+        return ConcatReducer()
+    elif callable(reducer):
+        return FuncReducer(reducer)
+    else:
+        raise ValueError("invalid reducer: %s" % repr(reducer))
+
+
+def reduce_itemspaces(
+        space, argslist, targets, reducer="sum", chunksize=1000, stats=None):
+    """Reduce ``targets`` in the ItemSpaces of ``space`` chunk by chunk"""
+
+    if space.system.callstack:
+        raise RuntimeError("cannot be called during formula execution")
+
+    if not space.formula:
+        raise ValueError("%s does not have formula" % space.evalrepr)
+
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+
+    targets = [_normalize_target(t) for t in targets]
+
+    if isinstance(reducer, (list, tuple)):
+        if len(reducer) != len(targets):
+            raise ValueError(
+                "reducer and targets must be of the same length")
+        reducers = [_new_reducer(r) for r in reducer]
+    else:
+        reducers = [_new_reducer(reducer) for _ in targets]
+
+    argsiter = iter(argslist)
+    for index in itertools.count():
+        chunk = list(itertools.islice(argsiter, chunksize))
+        if not chunk:
+            break
+
+        start = time.perf_counter()
+        keys = []
+        values = [[] for _ in targets]
+        try:
+            for args in chunk:
+                node = get_node(space, tuplize_key(space, args), None)
+                keys.append(node[KEY])
+                item = space.system.executor.eval_node(node)
+                for vals, (name, cargs) in zip(values, targets):
+                    # Not to create all the members of the ItemSpace
+                    cells = item.get_impl_from_name(name).interface
+                    vals.append(cells(*cargs))
+        finally:
+            for key in keys:
+                space.clear_itemspace_at(key)
+
+        for r, vals in zip(reducers, values):
+            r.add(vals)
+
+        if stats is not None:
+            elapsed = time.perf_counter() - start
+            stats.append({
+                "chunk": index,
+                "itemspaces": len(chunk),
+                "seconds": elapsed
+            })
+
+    return [r.get_result() for r in reducers]
@@ -52,7 +52,9 @@ from modelx.core.node import (
     OBJ,
     KEY,
     ItemFactory,
-    ItemFactoryImpl
+    ItemFactoryImpl,
+    wrap_array,
+    unwrap_array
 )
 from modelx.core.parent import (
     BaseParent,
@@ -66,6 +68,7 @@ from modelx.core.cells import (
     DynamicCellsImpl,
     UserCellsImpl,
     shareable_parameters,
+    _dynamic_lookup_names,
 )
 from modelx.core.util import AutoNamer, is_valid_name, get_module
 
@@ -301,12 +304,13 @@ class BaseSpace(BaseParent, ItemFactory):
 
     def __getattr__(self, name):
 
-        if name in self._impl.namespace:
+        if name in self._impl.namespace or self._impl.load_member(name):
             return self._impl.get_attr(name)
         else:
             raise AttributeError  # Must return AttributeError for hasattr
 
     def __dir__(self):
+        self._impl.load_members()
         return self._impl.namespace.interfaces
 
     def _get_object(self, name, as_proxy=False):
@@ -460,8 +464,8 @@ class BaseSpace(BaseParent, ItemFactory):
     def __delitem__(self, key):
         """Delete a child :class:`ItemSpace` object"""
 
-        key = tuplize_key(self, key)
-        if key in list(self._impl.param_spaces):
+        key = tuple(map(wrap_array, tuplize_key(self, key)))
+        if key in self._impl.param_spaces:
             self._impl.clear_itemspace_at(key)
         else:
             raise KeyError(key)
@@ -469,8 +473,8 @@ class BaseSpace(BaseParent, ItemFactory):
     def clear_at(self, *args, **kwargs):
         """Delete a child :class:`ItemSpace` object"""
 
-        key = get_node(self, args, kwargs)[KEY]
-        if key in list(self._impl.param_spaces):
+        key = tuple(map(wrap_array, get_node(self, args, kwargs)[KEY]))
+        if key in self._impl.param_spaces:
             self._impl.clear_itemspace_at(key)
         else:
             raise KeyError(key)
@@ -633,6 +637,8 @@ class UserSpace(BaseSpace, EditableParent):
     """
 
     __slots__ = ()
+    properties = Interface.properties + ["max_itemspaces"]
+
     # ----------------------------------------------------------------------
     # Manipulating cells
 
@@ -1154,6 +1160,216 @@ class UserSpace(BaseSpace, EditableParent):
         """Delete formula"""
         self._impl.del_formula()
 
+    @property
+    def max_itemspaces(self):
+        """Maximum number of the :class:`ItemSpace` objects to keep
+
+        If an integer is set, the :class:`ItemSpace` objects of this space
+        are kept up to the number.
+        When a new :class:`ItemSpace` is created over the number,
+        the least recently used :class:`ItemSpace` objects are deleted
+        together with the values depending on them,
+        in the same way as :meth:`clear_at`.
+        :class:`ItemSpace` objects used by formulas being calculated
+        are not deleted until the outermost formula finishes.
+        This is useful to limit memory usage when many
+        :class:`ItemSpace` objects are used one by one,
+        such as when calculating model points one by one.
+
+        :obj:`None` by default, which means no limit.
+        This property can also be set by :meth:`~UserSpace.set_property`::
+
+            >>> space.set_property("max_itemspaces", 100)
+
+        .. versionadded:: 0.22.0
+        """
+        return self._impl.max_itemspaces
+
+    @max_itemspaces.setter
+    def max_itemspaces(self, value):
+        if value is not None:
+            if not isinstance(value, int) or value < 1:
+                raise ValueError("max_itemspaces must be a positive integer")
+        self._impl.set_max_itemspaces(value)
+
+    def eval_itemspaces(self, argslist, targets, processes=None, chunksize=1):
+        """Evaluate cells in ItemSpaces in parallel processes
+
+        Evaluates ``targets`` in the :class:`ItemSpace` objects of this
+        space created with the arguments in ``argslist``,
+        using a pool of worker processes.
+        Each worker process has its own copy of this model.
+        On platforms supporting the ``fork`` start method,
+        the worker processes are forked from the current process.
+        Otherwise, this model is written to a temporary folder
+        and read by the worker processes, so the model must be
+        able to be written by :func:`~modelx.write_model`.
+
+        The :class:`ItemSpace` objects are created and deleted in the worker
+        processes, and no values are calculated in this process.
+
+        Returns a list of the lists of the values of ``targets``.
+        The order of the returned list is the same as
+        the order of ``argslist`` regardless of the order in which
+        the worker processes finish.
+        If errors are raised in any worker process,
+        :class:`~modelx.core.errors.FormulaError` is raised
+        after all the :class:`ItemSpace` objects are evaluated,
+        with the arguments and error messages of the failed
+        :class:`ItemSpace` objects.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> Projection.parameters
+                ('policy_id',)
+
+                >>> Projection.eval_itemspaces(
+                ...     [1, 2, 3], ["pv_premiums", ("cashflow", (0,))])
+                [[1000.0, 100.0], [2000.0, 200.0], [3000.0, 300.0]]
+
+        Args:
+            argslist: Sequence of the arguments of the :class:`ItemSpace`
+                objects. An element can be a tuple
+                for multiple parameters.
+            targets: Sequence of targets. A target is either the name of
+                a cells without parameters, or a tuple of a
+                cells name and a tuple of arguments to the cells.
+            processes(:obj:`int`, optional): The number of worker processes.
+                Defaults to the number of CPUs.
+            chunksize(:obj:`int`, optional): The number of ItemSpaces
+                sent to a worker process at a time. Defaults to 1.
+
+        .. versionadded:: 0.22.0
+        """
+        from modelx.core.parallel import eval_itemspaces
+        return eval_itemspaces(
+            self._impl, argslist, targets, processes, chunksize)
+
+    def reduce_itemspaces(
+            self, argslist, targets, reducer="sum", chunksize=1000,
+            stats=None):
+        """Reduce values of cells in ItemSpaces created chunk by chunk
+
+        Evaluates ``targets`` in the :class:`ItemSpace` objects of this
+        space created with the arguments in ``argslist``, and reduces
+        the values of each target into one result.
+        ``argslist`` is processed by ``chunksize`` arguments at a time,
+        and the :class:`ItemSpace` objects of each chunk are deleted
+        after their values are reduced.
+        Only the reduced results are kept, so memory usage does not grow
+        with the number of the arguments, and ``argslist`` can be
+        any iterable such as a generator reading model points from a file.
+
+        ``reducer`` is either ``"sum"``, ``"concat"`` or a function.
+
+        * ``"sum"``: The values are added by ``+``. The values can be
+          NumPy arrays or pandas Series as well as numbers.
+        * ``"concat"``: The values are concatenated into a NumPy array
+          in the order of ``argslist``.
+          If NumPy is not available, a list is returned.
+        * A function taking two arguments: The function is applied
+          cumulatively to the values like :func:`functools.reduce`.
+
+        A list of reducers can be given to use a different reducer
+        for each target.
+
+        Returns a list of the reduced results of ``targets``.
+        The arguments in ``argslist`` must not be of
+        existing :class:`ItemSpace` objects,
+        as the :class:`ItemSpace` objects are deleted.
+        If an error is raised, the :class:`ItemSpace` objects
+        of the chunk are deleted and the error is propagated.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> Projection.parameters
+                ('policy_id',)
+
+                >>> stats = []
+                >>> Projection.reduce_itemspaces(
+                ...     range(1, 100001), ["pv_premiums", ("cashflow", (0,))],
+                ...     reducer="sum", chunksize=1000, stats=stats)
+                [100005000000.0, 500025000.0]
+
+                >>> stats[0]
+                {'chunk': 0, 'itemspaces': 1000, 'seconds': 0.52}
+
+        Args:
+            argslist: Iterable of the arguments of the :class:`ItemSpace`
+                objects. An element can be a tuple
+                for multiple parameters.
+            targets: Sequence of targets. A target is either the name of
+                a cells without parameters, or a tuple of a
+                cells name and a tuple of arguments to the cells.
+            reducer(optional): ``"sum"``, ``"concat"``,
+                a function, or a list of them for each target.
+                Defaults to ``"sum"``.
+            chunksize(:obj:`int`, optional): The number of
+                :class:`ItemSpace` objects created before they are deleted.
+                Defaults to 1000.
+            stats(:obj:`list`, optional): If given, a :obj:`dict` of
+                statistics is appended to the list for each chunk.
+                The keys are ``"chunk"`` for the index of the chunk,
+                ``"itemspaces"`` for the number of the
+                :class:`ItemSpace` objects in the chunk,
+                and ``"seconds"`` for the elapsed time of the chunk.
+
+        .. seealso:: :meth:`eval_itemspaces`
+
+        .. versionadded:: 0.22.0
+        """
+        from modelx.core.reducer import reduce_itemspaces
+        return reduce_itemspaces(
+            self._impl, argslist, targets, reducer, chunksize, stats)
+
+    def arrayspace(self, *args, **kwargs):
+        """Get an :class:`ItemSpace` whose arguments are arrays
+
+        Returns an :class:`ItemSpace` of this space
+        like ``space(*args, **kwargs)``, but the arguments
+        can be NumPy arrays or sequences, such as lists and pandas Series,
+        which are converted to NumPy arrays.
+        The parameters of this space are bound to the arrays
+        in the returned :class:`ItemSpace`, so the formulas in it
+        are calculated with the arrays at once, instead of
+        with each element in the arrays one by one.
+        The formulas need to be written for arrays,
+        such as using :func:`numpy.where` instead of ``if`` statements.
+
+        The values of the cells in the returned :class:`ItemSpace`
+        are arrays whose elements are
+        in the same order as the elements in the arguments,
+        so the ``i``-th element of a value is the value
+        for the ``i``-th elements of the arguments.
+
+        The returned :class:`ItemSpace` is kept in the same way
+        as other :class:`ItemSpace` objects,
+        and returned again for arrays of the same contents.
+        The arrays are copied and made read-only.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> Projection.parameters
+                ('policy_id',)
+
+                >>> ids = np.array([1, 2, 3])
+
+                >>> Projection.arrayspace(ids).cashflow(0)
+                array([100., 200., 300.])
+
+                >>> Projection.arrayspace(policy_id=ids).cashflow(0)[1]
+                200.0
+
+        .. versionadded:: 0.22.0
+        """
+        return self._impl.get_arrayspace(args, kwargs).interface
+
     @Interface.doc.setter
     def doc(self, value):
         self._impl.doc = value
@@ -1166,6 +1382,7 @@ class ItemSpaceParent(ItemFactoryImpl, BaseNamespaceReferrer, HasFormula):
         "_named_itemspaces",
         "itemspacenamer",
         "param_spaces",
+        "max_itemspaces",
         "formula",
         "altfunc"
     )
@@ -1178,7 +1395,8 @@ class ItemSpaceParent(ItemFactoryImpl, BaseNamespaceReferrer, HasFormula):
         # ------------------------------------------------------------------
         # Construct altfunc after space members are crated
 
-        self.param_spaces = {}
+        self.param_spaces = {}  # Ordered from least recently used
+        self.max_itemspaces = None
         self.altfunc = self.formula = None
         if formula is not None:
             self.set_formula(formula)
@@ -1280,11 +1498,10 @@ class ItemSpaceParent(ItemFactoryImpl, BaseNamespaceReferrer, HasFormula):
         self._del_itemspace(key)
 
     def _del_itemspace(self, key):
-        if key in list(self.param_spaces):
-            space = self.param_spaces[key]
+        space = self.param_spaces.pop(key, None)
+        if space is not None:
             space.on_delete()
-            self.named_itemspaces.del_item(space.name)
-            del self.param_spaces[key]
+            self._named_itemspaces.delete_item(space.name)
 
     def get_itemspace(self, args, kwargs=None):
         """Create a dynamic root space
@@ -1292,10 +1509,68 @@ class ItemSpaceParent(ItemFactoryImpl, BaseNamespaceReferrer, HasFormula):
         Called from interface methods
         """
         node = get_node(self, args, kwargs)
-        return self.system.executor.eval_node(node)
+        space = self.system.executor.eval_node(node)
+        if self.max_itemspaces is not None:
+            key = node[KEY]
+            self.param_spaces[key] = self.param_spaces.pop(key)
+            if len(self.param_spaces) > self.max_itemspaces:
+                self.evict_itemspaces()
+        return space
+
+    def get_arrayspace(self, args, kwargs):
+        """Get an ItemSpace whose arguments can be NumPy arrays
+
+        Arguments other than scalars are converted to NumPy arrays.
+        """
+        import numpy as np
+        args = tuple(
+            wrap_array(np.asarray(arg) if np.ndim(arg) else arg)
+            for arg in args)
+        kwargs = {
+            k: wrap_array(np.asarray(v) if np.ndim(v) else v)
+            for k, v in kwargs.items()}
+        return self.get_itemspace(args, kwargs)
+
+    def set_max_itemspaces(self, maxsize):
+        self.max_itemspaces = maxsize
+        if maxsize is not None and len(self.param_spaces) > maxsize:
+            self.evict_itemspaces()
+
+    def evict_itemspaces(self):
+        """Delete least recently used ItemSpaces over max_itemspaces
+
+        ItemSpaces used by formulas being calculated are not deleted.
+        If ItemSpaces are left over max_itemspaces for that reason,
+        this method is called again when the outermost formula finishes.
+        """
+        if self.max_itemspaces is None:
+            return
+
+        graph = self.model.tracegraph
+        executor = self.system.executor
+        pending = set(executor.callstack)
+        in_use = graph.ancestors_from(pending) | pending if pending else set()
+        for node in pending:
+            obj = node[OBJ]
+            while obj is not None:
+                in_use.add(obj)
+                obj = obj.parent
+
+        for key, space in list(self.param_spaces.items()):
+            if len(self.param_spaces) <= self.max_itemspaces:
+                break
+            if space in in_use or key_to_node(self, key) in in_use:
+                continue
+            self.clear_itemspace_at(key)
+
+        if len(self.param_spaces) > self.max_itemspaces and pending:
+            executor.deferred_calls[self.evict_itemspaces] = None
 
     def on_eval_formula(self, key):
-        params = self.altfunc.fresh.altfunc(*key)
+        altfunc = self.altfunc
+        if not self.model.is_frozen or altfunc.altfunc is None:
+            altfunc = altfunc.fresh
+        params = altfunc.altfunc(*map(unwrap_array, key))
 
         if params is None:
             params = {"bases": [self]}  # Default
@@ -1311,7 +1586,9 @@ class ItemSpaceParent(ItemFactoryImpl, BaseNamespaceReferrer, HasFormula):
             else:
                 params["bases"] = [self]
 
-        params["arguments"] = node_get_args(key_to_node(self, key))
+        params["arguments"] = {
+            k: unwrap_array(v) for k, v in
+            node_get_args(key_to_node(self, key)).items()}
         space = self._new_itemspace(**params)
         self.param_spaces[key] = space
         return space
@@ -1397,7 +1674,8 @@ class BaseSpaceImpl(*_base_space_impl_base):
         self._all_spaces = ImplChainMap("all_spaces",
             self, SpaceView, [self._named_spaces, self._named_itemspaces]
         )
-        container.set_item(name, self)
+        if container is not None:
+            container.set_item(name, self)
 
         # ------------------------------------------------------------------
         # Add initial refs members
@@ -1466,12 +1744,12 @@ class BaseSpaceImpl(*_base_space_impl_base):
 
     def clear_all_cells(
             self, clear_input=False, recursive=False, del_items=False):
-        for cells in self.cells.values():
+        for cells in self._cells.fresh.values():
             cells.clear_all_values(clear_input=clear_input)
         if del_items:
             self.del_all_itemspaces()
         if recursive:
-            for space in self.named_spaces.values():
+            for space in self._named_spaces.fresh.values():
                 space.clear_all_cells(
                     clear_input=clear_input,
                     recursive=recursive,
@@ -1481,6 +1759,13 @@ class BaseSpaceImpl(*_base_space_impl_base):
     # ----------------------------------------------------------------------
     # Component properties
 
+    def load_member(self, name):
+        """Return True if ``name`` is a cells or a child space"""
+        return name in self._cells or name in self._named_spaces
+
+    def load_members(self):
+        pass
+
     def get_impl_from_name(self, name):
         """Retrieve an object by a dotted name relative to the space."""
         return self.get_impl_from_namelist(name.split("."))
@@ -1524,7 +1809,7 @@ class BaseSpaceImpl(*_base_space_impl_base):
         return _to_frame_inner(self.cells, args)
 
     def on_delete(self):
-        for cells in self.cells.values():
+        for cells in self._cells.fresh.values():
             cells.clear_all_values(clear_input=True)
             cells.on_delete()
         super().on_delete()
@@ -1535,21 +1820,22 @@ class DynamicBase(BaseSpaceImpl):
     __slots__ = ("_dynamic_subs",) + get_mixin_slots(BaseSpaceImpl)
 
     def __init__(self):
-        self._dynamic_subs = []
+        self._dynamic_subs = {}     # Used as an ordered set
 
     def on_namespace_change(self, is_all, names):
         ItemSpaceParent.on_namespace_change(self, is_all, names)
-        for dyns in self._dynamic_subs:
-            dyns.notify_referrers(is_all, names)
+        for dyns in list(self._dynamic_subs):
+            if dyns in self._dynamic_subs:  # Not deleted by notification
+                dyns.notify_referrers(is_all, names)
 
     def change_dynsub_refs(self, name):
 
-        for dynsub in self._dynamic_subs:
+        for dynsub in list(self._dynamic_subs):
             baseref = self.own_refs[name]
             dynsub._dynbase_refs.set_item(name, baseref)
 
     def clear_subs_rootitems(self):
-        for dynsub in self._dynamic_subs.copy():
+        for dynsub in list(self._dynamic_subs):
             root = dynsub.rootspace
             root.parent.clear_itemspace_at(root.argvalues_if)
 
@@ -1827,10 +2113,22 @@ class UserSpaceImpl(*_user_space_impl_base):
         else:
             raise KeyError("Ref '%s' does not exist" % name)
 
+    # ----------------------------------------------------------------------
+    # Formula
+
+    def set_formula(self, formula):
+        self.model.check_not_frozen()
+        ItemSpaceParent.set_formula(self, formula)
+
+    def del_formula(self):
+        self.model.check_not_frozen()
+        ItemSpaceParent.del_formula(self)
+
     # ----------------------------------------------------------------------
     # Reloading
 
     def reload(self):
+        self.model.check_not_frozen()
         if self.source is None:
             return
 
@@ -1871,6 +2169,8 @@ class UserSpaceImpl(*_user_space_impl_base):
         selfdict = getattr(self, attr)
         basedict = CustomChainMap(*[getattr(b, attr) for b in bases])
         selfkeys = list(selfdict)
+        prevkeys = list(selfkeys)
+        added = []
 
         for name in basedict: # ChainMap iterates from the last map
 
@@ -1883,6 +2183,7 @@ class UserSpaceImpl(*_user_space_impl_base):
                     selfdict[name] = UserCellsImpl(
                         space=self, name=name, formula=None,
                         is_derived=True)
+                    added.append(name)
 
                 elif attr == "own_refs":
                     selfdict[name] = ReferenceImpl(
@@ -1908,10 +2209,16 @@ class UserSpaceImpl(*_user_space_impl_base):
             else:   # defined
                 selfdict[name] = selfdict.pop(name)
 
+        # Items are reordered without notifying the observers
+        if list(selfdict) != [
+                k for k in prevkeys if k in selfdict] + added:
+            selfdict.set_refresh()
+
     def on_del_cells(self, name):
         cells = self.cells[name]
         self.model.clear_obj(cells)
         self.cells.del_item(name)
+        self.remove_referrer(cells)
         cells.on_delete()
 
     def on_sort_cells(self, space):
@@ -1952,7 +2259,6 @@ class UserSpaceImpl(*_user_space_impl_base):
         ref = self.own_refs[name]
         self.on_del_ref(name)
         self.on_create_ref(name, value, is_derived, refmode)
-        self.model.clear_attr_referrers(ref)
         self.change_dynsub_refs(name)
         return ref
 
@@ -1966,8 +2272,10 @@ class UserSpaceImpl(*_user_space_impl_base):
         return ref
 
     def on_del_ref(self, name):
-        self.own_refs[name].on_delete()
-        self.own_refs.del_item(name)
+        ref = self.own_refs[name]
+        self.model.clear_attr_referrers(ref)
+        ref.on_delete()
+        self.own_refs.delete_item(name)
 
     def on_rename(self, name):
         self.model.clear_obj(self)
@@ -2013,7 +2321,7 @@ class DynamicSpaceImpl(BaseSpaceImpl):
         arguments=None,
     ):
         self._dynbase = base
-        base._dynamic_subs.append(self)
+        base._dynamic_subs[self] = None
         self._init_root(parent)
         BaseSpaceImpl.__init__(
             self,
@@ -2025,14 +2333,117 @@ class DynamicSpaceImpl(BaseSpaceImpl):
             arguments,
             base.doc
         )
-        self._init_cells()
+        if self.formula is not None:
+            names = self.altfunc.fresh.global_names
+            if _dynamic_lookup_names.isdisjoint(names):
+                for name in names:
+                    self.load_member(name)
+            else:
+                self.load_members()
 
     def _init_root(self, parent):
         self.rootspace = parent.rootspace
 
-    def _init_cells(self):
-        for base in self._dynbase.cells.values():
-            DynamicCellsImpl(space=self, base=base, is_derived=True)
+    # ----------------------------------------------------------------------
+    # Lazy construction of members
+
+    def load_member(self, name):
+        """Create the cells or child space ``name`` if not created yet
+
+        Cells and child spaces of dynamic spaces are created
+        when they are first accessed, together with the members
+        referred to by the formulas of the created cells.
+        If any of the formulas can look up names dynamically,
+        such as by ``eval`` or ``globals()``, all the members are created.
+        The members are added without notifying the observers of
+        the namespace, as they are not new to the namespace
+        but only to the underlying dicts.
+
+        Returns True if ``name`` is a cells or a child space.
+        """
+        if self._load_from([name]):
+            self.load_members()
+
+        return name in self._cells or name in self._named_spaces
+
+    def load_members(self):
+        """Create all the cells and child spaces in the order of the base"""
+        base = self._dynbase
+        for members, basemembers in ((self._cells, base.cells),
+                                     (self._named_spaces, base.named_spaces)):
+            if len(members) == len(basemembers):
+                continue
+            self._load_from(list(basemembers))
+            if list(members) != list(basemembers):
+                for name in basemembers:
+                    dict.__setitem__(members, name, dict.pop(members, name))
+                members._update_interfaces()
+
+    def _load_from(self, pending):
+        """Create the members in ``pending`` and the names they refer to
+
+        Returns True if a created cells looks up names dynamically.
+        """
+        base = self._dynbase
+        is_dynamic = False
+        while pending:
+            n = pending.pop()
+            if n in self._cells or n in self._named_spaces:
+                continue
+            elif n in base.cells:
+                cells = DynamicCellsImpl(space=self, base=base.cells[n])
+                self._add_member(self._cells, n, cells)
+                names = cells.altfunc.global_names
+                if _dynamic_lookup_names.isdisjoint(names):
+                    pending.extend(names)
+                else:
+                    is_dynamic = True
+            elif n in base.named_spaces:
+                space = DynamicSpaceImpl(
+                    self, n, None, base.named_spaces[n])
+                self._add_member(self._named_spaces, n, space)
+                self._add_member(self._all_spaces, n, None)
+                space._init_dynbaserefs()
+
+        return is_dynamic
+
+    def notify_referrers(self, is_all=True, names=None):
+        # Cells are not registered as referrers, to keep them thin
+        BaseSpaceImpl.notify_referrers(self, is_all, names)
+        for cells in list(self._cells.values()):
+            cells.on_namespace_change(is_all, names)
+
+    def _add_member(self, container, name, impl):
+        if impl is not None:
+            dict.__setitem__(container, name, impl)
+        if container.is_fresh:
+            container._update_item(name)
+        if self._namespace.is_fresh:
+            self._namespace._update_item(name)
+
+    @property
+    def cells(self):
+        self.load_members()
+        return self._cells.fresh
+
+    @property
+    def spaces(self):
+        self.load_members()
+        return self._named_spaces.fresh
+
+    @property
+    def named_spaces(self):
+        self.load_members()
+        return self._named_spaces.fresh
+
+    @property
+    def all_spaces(self):
+        self.load_members()
+        return self._all_spaces.fresh
+
+    def get_impl_from_namelist(self, parts: list):
+        self.load_member(parts[0])
+        return BaseSpaceImpl.get_impl_from_namelist(self, parts)
 
     def _init_own_refs(self):
         return RefDict("own_refs", self)
@@ -2069,7 +2480,7 @@ class DynamicSpaceImpl(BaseSpaceImpl):
         for name, ref in self._dynbase.own_refs.items():
             self._dynbase_refs.set_item(name, ref)
 
-        for space in self.named_spaces.values():
+        for space in self._named_spaces.values():
             space._init_dynbaserefs()
 
     def _init_allargs(self):
@@ -2083,11 +2494,16 @@ class DynamicSpaceImpl(BaseSpaceImpl):
         return ImplChainMap("allargs", self, None, allargs)
 
     def on_delete(self):
-        for space in list(self.named_spaces.values()):
+        for space in list(self._named_spaces.fresh.values()):
             space.on_delete()
-            self.named_spaces.del_item(space.name)
+            self._named_spaces.del_item(space.name)
         self.del_all_itemspaces()
-        self._dynbase._dynamic_subs.remove(self)
+        del self._dynbase._dynamic_subs[self]
+        # Stop observing objects outliving this space, such as
+        # the global refs and the refs of the base space.
+        for obj in (self._refs, self._allargs, self._dynbase_refs):
+            for other in list(obj.observing.values()):
+                obj.unobserve(other)
         super().on_delete()
 
     @property
@@ -2163,6 +2579,7 @@ class ItemSpaceImpl(DynamicSpaceImpl):
         if name is None:
             name = parent.itemspacenamer.get_next(base.named_itemspaces)
         elif (is_valid_name(name)
+              and not parent.load_member(name)
               and name not in parent.namespace
               and name not in parent.named_itemspaces):
             pass
@@ -2170,20 +2587,15 @@ class ItemSpaceImpl(DynamicSpaceImpl):
             raise ValueError("invalid name")
 
         DynamicSpaceImpl.__init__(
-            self, parent, name, parent._named_itemspaces, base, refs, arguments
+            self, parent, name, None, base, refs, arguments
         )
+        parent._named_itemspaces.add_item(name, self)
         self._bind_args(self.arguments)
-        self._init_child_spaces(self)
         self._init_dynbaserefs()
 
     def _init_root(self, parent):
         self.rootspace = self
 
-    def _init_child_spaces(self, space):
-        for name, base in space._dynbase.named_spaces.items():
-            child = DynamicSpaceImpl(space, name, space._named_spaces, base)
-            self._init_child_spaces(child)
-
     def _init_refs(self, arguments=None):
         self._arguments = RefDict("arguments", self, data=arguments)
         refs = DynamicSpaceImpl._init_refs(self)
@@ -2192,7 +2604,8 @@ class ItemSpaceImpl(DynamicSpaceImpl):
 
     def _bind_args(self, args):
         self.boundargs = self.parent.formula.signature.bind(**args)
-        self.argvalues = tuple(self.boundargs.arguments.values())
+        self.argvalues = tuple(
+            wrap_array(v) for v in self.boundargs.arguments.values())
         self.argvalues_if = tuple(get_interfaces(self.argvalues))
 
     def restore_state(self):
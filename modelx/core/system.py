@@ -41,10 +41,13 @@ class NonThreadedExecutor:
         self.refstack = deque()
         self.errorstack = None
         self.rolledback = deque()
+        self.suspended = deque()
         self.callstack = CallStack(self, maxdepth)
         self.is_executing = False
+        self.is_tracking = True
         self.is_formula_error_used = True
         self.is_formula_error_handled = False
+        self.deferred_calls = {}    # Called when execution finishes
 
     def eval_node(self, node):
 
@@ -53,8 +56,11 @@ class NonThreadedExecutor:
 
         if cells.has_node(key):
             value = cells.data[key]
-            if self.callstack:
-                cells.model.tracegraph.add_edge(node, self.callstack[-1])
+            if self.callstack and self.is_tracking:
+                model = cells.model
+                model.tracegraph.add_edge(node, self.callstack[-1])
+                if model.memory_budget is not None:
+                    model.memory_budget.touch(node)
         else:
             if self.is_executing:
                 value = self._eval_formula(node)
@@ -95,12 +101,14 @@ class NonThreadedExecutor:
         assert not self.callstack
         assert not self.callstack.counter
         assert not self.refstack
+        self._run_deferred_calls()
 
         if self.excinfo:
 
             self.errorstack = ErrorStack(
                 self.excinfo,
-                self.rolledback
+                self.rolledback,
+                self.suspended
             )
             if self.is_formula_error_used:
                 errmsg = traceback.format_exception_only(
@@ -121,6 +129,12 @@ class NonThreadedExecutor:
         else:
             return self.buffer
 
+    def _run_deferred_calls(self):
+        calls = list(self.deferred_calls)
+        self.deferred_calls.clear()
+        for call in calls:
+            call()
+
 
 class ThreadedExecutor(NonThreadedExecutor):
 
@@ -175,12 +189,14 @@ class ThreadedExecutor(NonThreadedExecutor):
             assert not self.callstack
             assert not self.callstack.counter
             assert not self.refstack
+            self._run_deferred_calls()
 
             if self.excinfo:
 
                 self.errorstack = ErrorStack(
                     self.excinfo,
-                    self.rolledback
+                    self.rolledback,
+                    self.suspended
                 )
                 if self.is_formula_error_used:
                     errmsg = traceback.format_exception_only(
@@ -207,6 +223,138 @@ class ThreadedExecutor(NonThreadedExecutor):
             self.initnode = None
 
 
+class _SuspendFormula(BaseException):
+    """Raised to unwind formulas nested beyond the nesting limit
+
+    Derived from BaseException so that formulas catching Exception
+    do not intercept it.
+    """
+
+    def __init__(self, node):
+        BaseException.__init__(self)
+        self.node = node
+
+
+class IterativeExecutor(NonThreadedExecutor):
+    """Executor evaluating formula chains without deep recursion
+
+    Formulas are nested on the Python stack up to :attr:`maxnesting`
+    levels. When a formula at the deepest level calls a node that
+    has no value yet, the Python stack is unwound by
+    :class:`_SuspendFormula` back to the loop in :meth:`_eval_stack`,
+    leaving the unwound formulas on the call stack. The called node
+    is pushed on the call stack and evaluated, then the suspended
+    formulas are executed again from their beginnings, this time
+    finding the values of their precedents.
+
+    The call stack holds the same chain of nodes as in the recursive
+    evaluation, so the trace and reference graphs are recorded
+    in the same way by :class:`CallStack`. The length of the chain
+    is only bounded by :attr:`CallStack.maxdepth`.
+
+    As suspended formulas are executed more than once,
+    formulas must not have side effects.
+    """
+
+    default_maxdepth = 10**7
+    maxnesting = 100
+
+    def __init__(self, maxdepth=None):
+        NonThreadedExecutor.__init__(
+            self, maxdepth=maxdepth or self.default_maxdepth)
+        self.nestbase = 0       # Index of the node run by _eval_stack
+        self.pending = set()    # Nodes in the call stack
+
+    def eval_node(self, node):
+
+        cells = node[OBJ]
+        key = node[KEY]
+
+        if cells.has_node(key):
+            value = cells.data[key]
+            if self.callstack and self.is_tracking:
+                model = cells.model
+                model.tracegraph.add_edge(node, self.callstack[-1])
+                if model.memory_budget is not None:
+                    model.memory_budget.touch(node)
+        elif not self.is_executing:
+            value = self._start_exec(node)
+        elif node in self.pending:
+            raise DeepReferenceError(
+                "Circular reference detected at %s" % get_node_repr(node))
+        elif len(self.callstack) - self.nestbase < self.maxnesting:
+            value = self._eval_formula(node)
+        else:
+            raise _SuspendFormula(node)
+
+        return value
+
+    def _eval_formula(self, node):
+
+        if not self.callstack:
+            return self._eval_stack(node)
+
+        self.callstack.append(node)
+        self.pending.add(node)
+        cells, key = node[OBJ], node[KEY]
+
+        try:
+            value = cells.on_eval_formula(key)
+
+        except _SuspendFormula:
+            raise   # node stays in the call stack
+        except:
+            self.callstack.rollback()
+            self.pending.remove(node)
+            raise
+        else:
+            self.callstack.pop()
+            self.pending.remove(node)
+
+        return value
+
+    def _eval_stack(self, node):
+
+        callstack = self.callstack
+        pending = self.pending
+        is_running = False
+
+        while True:
+            try:
+                if node is not None:
+                    callstack.append(node)
+                    pending.add(node)
+
+                node = callstack[-1]
+                self.nestbase = len(callstack) - 1
+                is_running = True
+                value = node[OBJ].on_eval_formula(node[KEY])
+
+            except _SuspendFormula as sig:
+                node = sig.node
+                is_running = False
+
+            except:
+                if is_running:
+                    callstack.rollback()
+                while callstack:
+                    callstack.rollback()
+                    self.suspended.appendleft(self.rolledback.pop())
+                pending.clear()
+                self.nestbase = 0
+                raise
+
+            else:
+                callstack.pop()
+                pending.remove(node)
+                if callstack:
+                    node = None
+                    is_running = False
+                else:
+                    self.nestbase = 0
+                    return value
+
+
 class CallStack(deque):
 
     if sys.platform == "win32":
@@ -295,6 +443,30 @@ class CallStack(deque):
         return result
 
 
+class UntrackedCallStack(CallStack):
+    """CallStack not recording dependency
+
+    Calculated nodes are added to the trace graph without edges
+    and registered with their models as untracked nodes.
+    """
+
+    def pop(self):
+        node = deque.pop(self)
+        self.counter -= 1
+        model = node[OBJ].model
+
+        model.tracegraph.add_node(node)
+        model.untracked_nodes.add(node)
+
+        while self.refstack:
+            if self.refstack[-1][0] == self.counter:
+                self.refstack.pop()
+            else:
+                break
+
+        return node
+
+
 if sys.version_info < (3, 7, 0):
     _trace_time = time.time
 else:
@@ -340,8 +512,13 @@ class TraceableCallStack(CallStack):
 
 class ErrorStack(deque):
 
-    def __init__(self, execinfo, rolledback):
+    def __init__(self, execinfo, rolledback, suspended=()):
         deque.__init__(self)
+
+        # Formulas suspended by IterativeExecutor, outermost first
+        while suspended:
+            self.append((suspended.popleft(), 0, None))
+
         tbexc = traceback.TracebackException.from_exception(execinfo[1])
         tb = execinfo[2]
         self.on_eval_flag = False
@@ -491,6 +668,7 @@ class System:
             self.executor = NonThreadedExecutor(maxdepth=maxdepth)
         self.callstack = self.executor.callstack
         self.refstack = self.executor.refstack
+        self._spare_executor = None
         self._modelnamer = AutoNamer("Model")
         self._backupnamer = AutoNamer("_BAK")
         self.currentmodel = None
@@ -738,6 +916,46 @@ class System:
 
         return self.get_object_from_idtuple(idtuple, as_proxy)
 
+    # ----------------------------------------------------------------------
+    # Executor selection
+
+    def is_iterative(self):
+        return isinstance(self.executor, IterativeExecutor)
+
+    def set_iterative(self, iterative):
+        """Switch between the recursive and the iterative executors"""
+        if self.is_iterative() == bool(iterative):
+            return False
+
+        if not self.callstack.is_empty():
+            raise RuntimeError("callstack not empy")
+
+        if self._is_stacktrace_active():
+            raise RuntimeError("call stack trace active")
+
+        if self._is_untracked():
+            raise RuntimeError("dependency tracking disabled")
+
+        executor = self._spare_executor
+        if executor is None:
+            if iterative:
+                executor = IterativeExecutor()
+            elif sys.platform == "win32":
+                executor = ThreadedExecutor()
+            else:
+                executor = NonThreadedExecutor()
+
+        executor.is_formula_error_used = self.executor.is_formula_error_used
+        executor.is_formula_error_handled = (
+            self.executor.is_formula_error_handled)
+
+        self._spare_executor = self.executor
+        self.executor = executor
+        self.callstack = executor.callstack
+        self.refstack = executor.refstack
+
+        return True
+
     # ----------------------------------------------------------------------
     # Call stack tracing
 
@@ -748,6 +966,9 @@ class System:
         if self._is_stacktrace_active():
             return False
 
+        if self._is_untracked():
+            raise RuntimeError("dependency tracking disabled")
+
         if self.callstack.is_empty():
             self.callstack = self.executor.callstack = TraceableCallStack(
                 self.executor,
@@ -801,6 +1022,55 @@ class System:
             self.clear_stacktrace()
             self.stop_stacktrace()
 
+    # ----------------------------------------------------------------------
+    # Dependency tracking
+
+    def _is_untracked(self):
+        return isinstance(self.callstack, UntrackedCallStack)
+
+    def start_untracked(self):
+        if self._is_untracked():
+            return False
+
+        if self._is_stacktrace_active():
+            raise RuntimeError("call stack trace active")
+
+        if self.callstack.is_empty():
+            self.callstack = self.executor.callstack = UntrackedCallStack(
+                self.executor,
+                maxdepth=self.callstack.maxdepth
+            )
+            self.executor.is_tracking = False
+        else:
+            raise RuntimeError("callstack not empy")
+
+        return True
+
+    def stop_untracked(self):
+        if not self._is_untracked():
+            return False
+
+        if self.callstack.is_empty():
+            self.callstack = self.executor.callstack = CallStack(
+                self.executor,
+                maxdepth=self.callstack.maxdepth
+            )
+            self.executor.is_tracking = True
+        else:
+            raise RuntimeError("callstack not empy")
+
+        return True
+
+    @contextmanager
+    def untracked(self):
+        """Context manager to disable dependency tracking"""
+        started = self.start_untracked()
+        try:
+            yield None
+        finally:
+            if started:
+                self.stop_untracked()
+
     def _check_sanity(self, check_members=True):
         self.iomanager._check_sanity()
         if check_members:
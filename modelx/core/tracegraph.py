@@ -0,0 +1,578 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact dependency graphs
+
+The graphs in this module intern nodes to integer ids and
+keep adjacency as insertion-ordered dicts of ids,
+which are created only for nodes with edges.
+They provide the subset of the ``networkx.DiGraph`` interface used by
+modelx, in addition to the methods of
+:class:`~modelx.core.model.TraceGraph` and
+:class:`~modelx.core.model.ReferenceGraph`.
+"""
+
+from itertools import chain
+from operator import itemgetter
+from modelx.core.node import OBJ, KEY
+
+
+class CompactGraph:
+    """Directed graph of nodes interned to integer ids"""
+
+    __slots__ = ("_ids", "_nodes", "_succ", "_pred", "_free")
+
+    def __init__(self):
+        self._ids = {}      # node -> id
+        self._nodes = []    # id -> node, None if freed
+        self._succ = []     # id -> dict of successor ids or None
+        self._pred = []     # id -> dict of predecessor ids or None
+        self._free = []     # ids to reuse
+
+    def __getstate__(self):
+        return {name: getattr(self, name)
+                for cls in type(self).__mro__
+                for name in getattr(cls, "__slots__", ())}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _add(self, node):
+        if self._free:
+            i = self._free.pop()
+            self._nodes[i] = node
+        else:
+            i = len(self._nodes)
+            self._nodes.append(node)
+            self._succ.append(None)
+            self._pred.append(None)
+        self._ids[node] = i
+        return i
+
+    def _remove(self, i):
+        succ, pred = self._succ, self._pred
+        for j in succ[i] or ():
+            if j != i:
+                del pred[j][i]
+        for j in pred[i] or ():
+            if j != i:
+                del succ[j][i]
+        succ[i] = pred[i] = None
+        del self._ids[self._nodes[i]]
+        self._nodes[i] = None
+        self._free.append(i)
+
+    # ----------------------------------------------------------------------
+    # networkx compatible interface
+
+    def __contains__(self, node):
+        return node in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def has_node(self, node):
+        return node in self._ids
+
+    @property
+    def nodes(self):
+        return NodeView(self)
+
+    @property
+    def edges(self):
+        return EdgeView(self)
+
+    def number_of_nodes(self):
+        return len(self)
+
+    def number_of_edges(self):
+        return sum(len(succ) for succ in self._succ if succ)
+
+    def add_node(self, node):
+        if node not in self._ids:
+            self._add(node)
+
+    def add_nodes_from(self, nodes):
+        ids = self._ids
+        self._add_nodes([n for n in dict.fromkeys(nodes) if n not in ids])
+
+    def _add_nodes(self, new):
+        ids, allnodes, free = self._ids, self._nodes, self._free
+        reused = min(len(new), len(free))
+        newids = free[len(free) - reused:]
+        del free[len(free) - reused:]
+        for node, i in zip(new, newids):
+            allnodes[i] = node
+
+        extended = len(new) - reused
+        start = len(allnodes)
+        allnodes.extend(new[reused:])
+        self._succ.extend([None] * extended)
+        self._pred.extend([None] * extended)
+        newids.extend(range(start, start + extended))
+
+        ids.update(zip(new, newids))
+        return new, newids
+
+    def add_edge(self, u, v):
+        ids = self._ids
+        i = ids.get(u)
+        if i is None:
+            i = self._add(u)
+        j = ids.get(v)
+        if j is None:
+            j = self._add(v)
+
+        succ = self._succ[i]
+        if succ is None:
+            self._succ[i] = {j: None}
+        else:
+            succ[j] = None
+
+        pred = self._pred[j]
+        if pred is None:
+            self._pred[j] = {i: None}
+        else:
+            pred[i] = None
+
+    def has_edge(self, u, v):
+        i, j = self._ids.get(u), self._ids.get(v)
+        if i is None or j is None:
+            return False
+        return bool(self._succ[i]) and j in self._succ[i]
+
+    def remove_node(self, node):
+        self._remove(self._ids[node])
+
+    def remove_nodes_from(self, nodes):
+        ids = self._ids
+        for node in nodes:
+            i = ids.get(node)
+            if i is not None:
+                self._remove(i)
+
+    def successors(self, node):
+        nodes = self._nodes
+        return iter([nodes[j] for j in self._succ[self._ids[node]] or ()])
+
+    def predecessors(self, node):
+        nodes = self._nodes
+        return iter([nodes[j] for j in self._pred[self._ids[node]] or ()])
+
+    def out_degree(self, node):
+        return len(self._succ[self._ids[node]] or ())
+
+    def in_degree(self, node):
+        return len(self._pred[self._ids[node]] or ())
+
+    def subgraph(self, nodes):
+        """Return a new graph induced on ``nodes``
+
+        Nodes are added in the order of this graph.
+        """
+        ids, succ, allnodes = self._ids, self._succ, self._nodes
+        keep = set(ids[n] for n in nodes if n in ids)
+        ordered = [i for i in ids.values() if i in keep]
+        result = type(self)()
+        for i in ordered:
+            result.add_node(allnodes[i])
+        for i in ordered:
+            for j in succ[i] or ():
+                if j in keep:
+                    result.add_edge(allnodes[i], allnodes[j])
+        return result
+
+    def relabel(self, mapping):
+        """Return a copy of this graph with nodes replaced by ``mapping``"""
+        result = type(self)()
+        result._nodes = [
+            None if node is None else mapping[node] for node in self._nodes]
+        result._ids = {
+            result._nodes[i]: i for i in self._ids.values()}
+        result._succ = [None if d is None else d.copy() for d in self._succ]
+        result._pred = [None if d is None else d.copy() for d in self._pred]
+        result._free = self._free.copy()
+        result._reindex()
+        return result
+
+    def _reindex(self):
+        pass
+
+    def _descendant_ids(self, *ids):
+        succ = self._succ
+        visited = set()
+        stack = list(ids)
+        while stack:
+            for j in succ[stack.pop()] or ():
+                if j not in visited:
+                    visited.add(j)
+                    stack.append(j)
+        return visited
+
+    def _ancestor_ids(self, *ids):
+        pred = self._pred
+        visited = set()
+        stack = list(ids)
+        while stack:
+            for j in pred[stack.pop()] or ():
+                if j not in visited:
+                    visited.add(j)
+                    stack.append(j)
+        return visited
+
+    def descendants(self, node):
+        nodes = self._nodes
+        return set(nodes[j] for j in self._descendant_ids(self._ids[node]))
+
+    def descendants_from(self, sources):
+        """Return the union of the descendants of `sources` in one pass"""
+        ids, nodes = self._ids, self._nodes
+        return set(nodes[j] for j in self._descendant_ids(
+            *(ids[n] for n in sources if n in ids)))
+
+    def ancestors_from(self, sources):
+        """Return the union of the ancestors of `sources` in one pass"""
+        ids, nodes = self._ids, self._nodes
+        return set(nodes[j] for j in self._ancestor_ids(
+            *(ids[n] for n in sources if n in ids)))
+
+    def topological_sort(self):
+        """Return a list of nodes sorted topologically
+
+        Nodes are sorted generation by generation in the same way as
+        ``networkx.topological_sort``.
+        """
+        succ, pred, nodes = self._succ, self._pred, self._nodes
+        ids = list(self._ids.values())
+        indegree = {i: len(pred[i]) for i in ids if pred[i]}
+        generation = [i for i in ids if not pred[i]]
+        result = []
+
+        while generation:
+            result.extend(generation)
+            nextgen = []
+            for i in generation:
+                for j in succ[i] or ():
+                    indegree[j] -= 1
+                    if not indegree[j]:
+                        nextgen.append(j)
+                        del indegree[j]
+            generation = nextgen
+
+        if indegree:
+            raise ValueError("graph contains a cycle")
+
+        return [nodes[i] for i in result]
+
+
+class NodeView:
+    """Set-like view of the nodes of a :class:`CompactGraph`
+
+    Like ``networkx.DiGraph.nodes``, the view is also callable.
+    Nodes in compact graphs have no attributes,
+    so ``data`` is not supported.
+    """
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __call__(self):
+        return self
+
+    def __iter__(self):
+        return iter(self._graph)
+
+    def __len__(self):
+        return len(self._graph)
+
+    def __contains__(self, node):
+        return node in self._graph
+
+    def __getitem__(self, node):
+        if node not in self._graph:
+            raise KeyError(node)
+        return {}
+
+    def __repr__(self):
+        return "NodeView(%s)" % (tuple(self),)
+
+
+class EdgeView:
+    """Set-like view of the edges of a :class:`CompactGraph`
+
+    Like ``networkx.DiGraph.edges``, the view is also callable,
+    and calling it with ``nbunch`` returns a view of the edges
+    from the nodes in ``nbunch``.
+    """
+
+    __slots__ = ("_graph", "_nbunch")
+
+    def __init__(self, graph, nbunch=None):
+        self._graph = graph
+        self._nbunch = nbunch
+
+    def __call__(self, nbunch=None):
+        if nbunch is None:
+            return self
+        try:
+            if nbunch in self._graph:   # Single node
+                nbunch = [nbunch]
+        except TypeError:   # Unhashable container of nodes
+            pass
+        return EdgeView(self._graph, list(nbunch))
+
+    def _ids(self):
+        if self._nbunch is None:
+            return range(len(self._graph._nodes))
+        else:
+            ids = self._graph._ids
+            return [ids[n] for n in dict.fromkeys(self._nbunch) if n in ids]
+
+    def __iter__(self):
+        nodes, succ = self._graph._nodes, self._graph._succ
+        for i in self._ids():
+            for j in succ[i] or ():
+                yield nodes[i], nodes[j]
+
+    def __len__(self):
+        succ = self._graph._succ
+        return sum(len(succ[i] or ()) for i in self._ids())
+
+    def __contains__(self, edge):
+        u, v = edge
+        if self._nbunch is not None and u not in self._nbunch:
+            return False
+        return self._graph.has_edge(u, v)
+
+    def __repr__(self):
+        return "EdgeView(%s)" % list(self)
+
+
+class CompactTraceGraph(CompactGraph):
+    """Compact directed graph of calculated nodes
+
+    Ids of nodes are indexed by the objects of the nodes,
+    so that the nodes of an object are retrieved
+    without scanning the entire graph.
+
+    Input nodes added by :meth:`add_inputs` are not interned
+    until edges are added to them. Such a node is in this graph
+    while its key is in ``input_keys`` of its object,
+    so the input nodes are not registered twice.
+    """
+
+    __slots__ = ("_objids", "_inputobjs")
+
+    def __init__(self):
+        CompactGraph.__init__(self)
+        self._objids = {}   # obj -> dict of ids of nodes with obj
+        self._inputobjs = {}    # objs with input nodes not interned
+
+    def _is_input(self, node):
+        return (node[OBJ] in self._inputobjs
+                and node[KEY] in node[OBJ].input_keys)
+
+    def _iter_inputs(self):
+        ids = self._ids
+        for obj in self._inputobjs:
+            for key in obj.input_keys:
+                node = (obj, key)
+                if node not in ids:
+                    yield node
+
+    def add_inputs(self, obj, keys):
+        """Add the input nodes of ``obj`` for ``keys``
+
+        ``keys`` must be in ``input_keys`` of ``obj``.
+        """
+        self._inputobjs[obj] = None
+
+    def discard_inputs(self, obj):
+        """Called when ``input_keys`` of ``obj`` becomes empty"""
+        self._inputobjs.pop(obj, None)
+
+    def __contains__(self, node):
+        return node in self._ids or self._is_input(node)
+
+    def __iter__(self):
+        return chain(self._ids, self._iter_inputs())
+
+    def __len__(self):
+        return len(self._ids) + sum(1 for _ in self._iter_inputs())
+
+    def has_node(self, node):
+        return node in self
+
+    def add_node(self, node):
+        if node not in self:
+            self._add(node)
+
+    def remove_node(self, node):
+        if node in self._ids:
+            self._remove(self._ids[node])
+        elif not self._is_input(node):
+            raise KeyError(node)
+
+    def successors(self, node):
+        if node not in self._ids and self._is_input(node):
+            return iter([])
+        return CompactGraph.successors(self, node)
+
+    def predecessors(self, node):
+        if node not in self._ids and self._is_input(node):
+            return iter([])
+        return CompactGraph.predecessors(self, node)
+
+    def out_degree(self, node):
+        if node not in self._ids and self._is_input(node):
+            return 0
+        return CompactGraph.out_degree(self, node)
+
+    def in_degree(self, node):
+        if node not in self._ids and self._is_input(node):
+            return 0
+        return CompactGraph.in_degree(self, node)
+
+    def descendants(self, node):
+        if node not in self._ids and self._is_input(node):
+            return set()
+        return CompactGraph.descendants(self, node)
+
+    def subgraph(self, nodes):
+        nodes = list(nodes)
+        result = CompactGraph.subgraph(self, nodes)
+        for node in nodes:
+            if node not in self._ids and self._is_input(node):
+                result.add_node(node)
+        return result
+
+    def relabel(self, mapping):
+        """Return a copy of this graph with nodes replaced by ``mapping``
+
+        The input nodes not interned are interned in the copy.
+        """
+        result = CompactGraph.relabel(self, mapping)
+        inputs = [mapping[node] for node in self._iter_inputs()]
+        if inputs:
+            CompactGraph._add_nodes(result, inputs)
+            result._reindex()
+        return result
+
+    def topological_sort(self):
+        return list(self._iter_inputs()) + CompactGraph.topological_sort(self)
+
+    def _add(self, node):
+        i = CompactGraph._add(self, node)
+        objids = self._objids.get(node[OBJ])
+        if objids is None:
+            self._objids[node[OBJ]] = {i: None}
+        else:
+            objids[i] = None
+        return i
+
+    def _remove(self, i):
+        obj = self._nodes[i][OBJ]
+        objids = self._objids[obj]
+        del objids[i]
+        if not objids:
+            del self._objids[obj]
+        CompactGraph._remove(self, i)
+
+    def _add_nodes(self, nodes):
+        new, newids = CompactGraph._add_nodes(self, nodes)
+        objs = list(map(itemgetter(OBJ), new))
+        if len(set(objs)) == 1:     # Nodes of one object
+            if objs[0] in self._objids:
+                self._objids[objs[0]].update(dict.fromkeys(newids))
+            else:
+                self._objids[objs[0]] = dict.fromkeys(newids)
+        else:
+            for obj, i in zip(objs, newids):
+                self._objids.setdefault(obj, {})[i] = None
+        return new, newids
+
+    def _reindex(self):
+        self._objids = {}
+        for node, i in self._ids.items():
+            if isinstance(node, tuple):     # Not str relabeled for pickling
+                self._objids.setdefault(node[OBJ], {})[i] = None
+
+    def remove_with_descs(self, source):
+        """Remove all descendants of(reachable from) `source`.
+
+        Args:
+            source: Node descendants
+        Returns:
+            set: The removed nodes.
+        """
+        i = self._ids.get(source)
+        if i is None:
+            return {source} if self._is_input(source) else set()
+        desc = self._descendant_ids(i)
+        desc.add(i)
+        nodes = self._nodes
+        removed = set(nodes[j] for j in desc)
+        for j in desc:
+            self._remove(j)
+        return removed
+
+    def clear_obj(self, obj):
+        """Remove all nodes with `obj` and their descendants."""
+        removed = set()
+        for node in self.get_nodes_with(obj):
+            if node in self._ids:
+                removed.update(self.remove_with_descs(node))
+            elif self._is_input(node):
+                removed.add(node)
+        self._inputobjs.pop(obj, None)
+        return removed
+
+    def get_nodes_with(self, obj):
+        """Return nodes with `obj`."""
+        nodes = self._nodes
+        result = set(nodes[i] for i in self._objids.get(obj, ()))
+        if obj in self._inputobjs:
+            result.update((obj, key) for key in obj.input_keys)
+        return result
+
+    def get_startnodes_from(self, node):
+        i = self._ids.get(node)
+        if i is None:
+            return []
+        succ, nodes = self._succ, self._nodes
+        return [nodes[j] for j in self._descendant_ids(i) if not succ[j]]
+
+
+class CompactReferenceGraph(CompactGraph):
+    """Compact directed graph from references to nodes referring them"""
+
+    __slots__ = ()
+
+    def remove_with_descs(self, ref):
+        i = self._ids.get(ref)
+        if i is None:
+            return set()
+        desc = self._descendant_ids(i)
+        nodes = self._nodes
+        removed = set(nodes[j] for j in desc)
+        self._remove(i)
+        for j in desc:
+            self._remove(j)
+        return removed     # Not including ref
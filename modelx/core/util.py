@@ -17,6 +17,7 @@ import re
 import keyword
 import importlib
 import types
+import multiprocessing
 from inspect import getmro
 
 
@@ -28,15 +29,12 @@ class AutoNamer:
 
     def get_next(self, existing_names, prefix=""):
 
-        self.__last_postfix += 1
-        result = prefix + self.__basename + str(self.__last_postfix)
-
-        if result in existing_names:
-            # Increment postfix until no name
-            # exists with that postfix.
-            return self.get_next(existing_names, prefix)
-        else:
-            return result
+        # Increment postfix until no name exists with that postfix.
+        while True:
+            self.__last_postfix += 1
+            result = prefix + self.__basename + str(self.__last_postfix)
+            if result not in existing_names:
+                return result
 
     def revert(self):
         self.__last_postfix -= self.__last_postfix and 1
@@ -93,6 +91,20 @@ def get_module(module):
     return module
 
 
+def get_mp_context():
+    """Return the multiprocessing context to start worker processes
+
+    The ``fork`` start method is used only on Linux, where modelx
+    runs formulas in the main thread.
+    Forking is unsafe on macOS, and modelx runs formulas in its own thread
+    on Windows, so the ``spawn`` start method is used on the other platforms.
+    """
+    if sys.platform == "linux":
+        return multiprocessing.get_context("fork")
+    else:
+        return multiprocessing.get_context("spawn")
+
+
 def get_param_func(param_names):
 
     if param_names:
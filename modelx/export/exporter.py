@@ -0,0 +1,335 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Export of models as plain Python packages
+
+An exported package does not depend on modelx.
+Each space is translated into a class, and each cells in the space
+into a method of the class that memoizes its values in a dict.
+Formulas are translated into functions
+whose global namespaces are created for each space object at run time,
+in the same order of precedence as in modelx.
+"""
+
+import ast
+import os
+import pickle
+import shutil
+import sys
+import textwrap
+from types import ModuleType
+
+from modelx.core.base import Interface
+from modelx.core.cells import Cells
+from modelx.core.space import BaseSpace
+
+_RUNTIME = os.path.join(os.path.dirname(__file__), "runtime.py")
+
+_INIT_TEMPLATE = '''"""Model {name} exported from modelx
+
+This package does not depend on modelx.
+"""
+
+import os
+from . import _mx_runtime
+from ._mx_classes import _mx_Model
+
+mx_model = _mx_runtime.load_model(
+    _mx_Model, os.path.join(os.path.dirname(__file__), "_mx_data.pickle"))
+'''
+
+
+class _CellsCallTransformer(ast.NodeTransformer):
+    """Replace subscriptions of cells with calls
+
+    ``name[args]`` and ``space.name[args]`` are replaced with
+    ``name(args)`` and ``space.name(args)`` if ``name`` refers to
+    a cells in the namespace of the space of the formula,
+    or in the namespace of ``space``. Names in ``localnames`` are
+    local variables of the formula and left as they are.
+    Assignments to the subscriptions are replaced with
+    calls to ``_mx_set`` of the space of the cells.
+    """
+
+    def __init__(self, namespace, localnames):
+        self.namespace = namespace
+        self.localnames = localnames
+
+    def resolve(self, node):
+        """Return the object ``node`` refers to, or None if unknown"""
+        if isinstance(node, ast.Name):
+            if node.id not in self.localnames:
+                return self.namespace.get(node.id)
+
+        elif isinstance(node, ast.Attribute):
+            value = self.resolve(node.value)
+            if isinstance(value, BaseSpace):
+                return value._impl.namespace.interfaces.get(node.attr)
+
+        elif isinstance(node, (ast.Subscript, ast.Call)):
+            # ItemSpaces have the same members as their parent
+            value = self.resolve(
+                node.value if isinstance(node, ast.Subscript) else node.func)
+            if isinstance(value, BaseSpace) and value.formula is not None:
+                return value
+
+        return None
+
+    def is_cells(self, node):
+        return isinstance(self.resolve(node), Cells)
+
+    @staticmethod
+    def get_args(node):
+        key = node.slice
+        return key.elts if isinstance(key, ast.Tuple) else [key]
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        if isinstance(node.ctx, ast.Load) and self.is_cells(node.value):
+            return ast.copy_location(ast.Call(
+                func=node.value, args=self.get_args(node), keywords=[]), node)
+        return node
+
+    def visit_Assign(self, node):
+        self.generic_visit(node)
+        target = node.targets[0]
+        if (len(node.targets) == 1 and isinstance(target, ast.Subscript)
+                and self.is_cells(target.value)):
+            cells = target.value
+            name = cells.id if isinstance(cells, ast.Name) else cells.attr
+            cells.ctx = ast.Load()
+            func = ast.Attribute(
+                value=ast.Attribute(
+                    value=cells, attr="__self__", ctx=ast.Load()),
+                attr="_mx_set", ctx=ast.Load())
+            call = ast.Call(
+                func=func,
+                args=[ast.Constant(value=name),
+                      ast.Tuple(elts=self.get_args(target), ctx=ast.Load()),
+                      node.value],
+                keywords=[])
+            return ast.copy_location(ast.Expr(value=call), node)
+        return node
+
+
+def _get_localnames(funcdef):
+    """Return names assigned or bound as parameters in ``funcdef``"""
+    names = set()
+    for node in ast.walk(funcdef):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef,
+                               ast.ClassDef)) and node is not funcdef:
+            names.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split(".")[0]
+                         for alias in node.names)
+    return names
+
+
+def _get_funcdef(formula, funcname):
+    """Return the function definition node of ``formula``"""
+    if formula.source is None:
+        raise ValueError("source of %s not available" % formula.name)
+
+    source = textwrap.dedent(formula.source)
+    if formula._is_lambda:
+        lambdanode = ast.parse(source, mode="eval").body
+        funcdef = ast.FunctionDef(
+            name=funcname, args=lambdanode.args,
+            body=[ast.Return(value=lambdanode.body)],
+            decorator_list=[], returns=None, type_comment=None)
+        ast.fix_missing_locations(ast.copy_location(funcdef, lambdanode))
+    else:
+        funcdef = ast.parse(source).body[0]
+        funcdef.name = funcname
+        funcdef.decorator_list = []
+
+    return funcdef
+
+
+class ModelExporter:
+    """Translate a model into a plain Python package"""
+
+    def __init__(self, model):
+        self.model = model
+        self.funcdefs = []      # Module level function definitions
+        self.classdefs = []
+        self.spacedata = {}     # path -> dict of refs and inputs
+
+    def export(self, path):
+
+        name = os.path.basename(os.path.normpath(path))
+        if not name.isidentifier():
+            raise ValueError("%s is not a valid package name" % name)
+
+        spaces = {sname: self.translate_space(space, (sname,))
+                  for sname, space in self.model.spaces.items()}
+
+        lines = [
+            '"""Classes of spaces of %s"""\n\n' % self.model.name
+            + "from ._mx_runtime import BaseModel, BaseSpace, MISSING"
+        ]
+        lines.extend(self.funcdefs)
+        lines.extend(self.classdefs)
+        lines.append(self.define_class("_mx_Model", "BaseModel", spaces, []))
+
+        data = {
+            "refs": self.encode_refs(
+                (name, ref) for name, ref in
+                self.model._impl.global_refs.items()
+                if name != "__builtins__"),
+            "spaces": self.spacedata
+        }
+
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "__init__.py"), "w",
+                  encoding="utf-8") as f:
+            f.write(_INIT_TEMPLATE.format(name=self.model.name))
+
+        with open(os.path.join(path, "_mx_classes.py"), "w",
+                  encoding="utf-8") as f:
+            f.write("\n\n\n".join(lines) + "\n")
+
+        shutil.copyfile(_RUNTIME, os.path.join(path, "_mx_runtime.py"))
+
+        with open(os.path.join(path, "_mx_data.pickle"), "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def translate_space(self, space, path):
+        """Add the class definition of ``space`` and return its name"""
+
+        clsname = "_mx_Space_" + "__".join(path)
+        namespace = space._impl.namespace.interfaces
+        children = {name: self.translate_space(child, path + (name,))
+                    for name, child in space.spaces.items()}
+        body = ["_mx_path = %r" % (path,),
+                "_mx_cells = %r" % (tuple(space.cells),)]
+
+        formulas = {}
+        for name, cells in space.cells.items():
+            funcname = "_mx_formula_%s__%s" % ("__".join(path), name)
+            funcdef = _get_funcdef(cells.formula, funcname)
+            transformer = _CellsCallTransformer(
+                namespace, _get_localnames(funcdef))
+            self.funcdefs.append(
+                ast.unparse(transformer.visit(funcdef)))
+            formulas[name] = funcname
+            body.append(self.define_method(name, funcdef.args))
+
+        body.append("_mx_formulas = {%s}" % ", ".join(
+            "%r: %s" % item for item in formulas.items()))
+
+        if space.formula is not None:
+            funcname = "_mx_params_%s" % "__".join(path)
+            funcdef = _get_funcdef(space.formula, funcname)
+            transformer = _CellsCallTransformer(
+                namespace, _get_localnames(funcdef))
+            self.funcdefs.append(ast.unparse(transformer.visit(funcdef)))
+            body.append("_mx_param_formula = staticmethod(%s)" % funcname)
+
+        self.spacedata[path] = {
+            "refs": self.encode_refs(space._impl.own_refs.items()),
+            "inputs": {
+                name: {key: cells._impl.data[key]
+                       for key in cells._impl.input_keys}
+                for name, cells in space.cells.items()}
+        }
+        self.classdefs.append(
+            self.define_class(clsname, "BaseSpace", children, body))
+        return clsname
+
+    @staticmethod
+    def define_class(clsname, base, children, body):
+        body = body + ["_mx_spaces = {%s}" % ", ".join(
+            "%r: %s" % item for item in children.items())]
+        return "class %s(%s):\n\n" % (clsname, base) + "\n\n".join(
+            textwrap.indent(stmt, "    ") for stmt in body)
+
+    @staticmethod
+    def define_method(name, args):
+        """Return the source of the memoized method of a cells"""
+        if args.kwarg is not None:
+            raise ValueError("keyword arguments of %s not supported" % name)
+
+        names = [a.arg for a in args.posonlyargs + args.args]
+        callargs = names.copy()
+        if args.vararg is not None:
+            names.append("*" + args.vararg.arg)
+            callargs.append("*" + args.vararg.arg)
+        for a in args.kwonlyargs:
+            names.append(a.arg)
+            callargs.append("%s=%s" % (a.arg, a.arg))
+
+        selfarg = ast.arg(arg="self")
+        params = ast.unparse(ast.arguments(
+            posonlyargs=[], args=[selfarg] + args.posonlyargs + args.args,
+            vararg=args.vararg, kwonlyargs=args.kwonlyargs,
+            kw_defaults=args.kw_defaults, kwarg=None,
+            defaults=args.defaults))
+
+        if len(names) == 1:
+            key = "(%s,)" % names[0]
+        else:
+            key = "(%s)" % ", ".join(names)
+        return "\n".join([
+            "def %s(%s):" % (name, params),
+            "    key = %s" % key,
+            "    value = self._c_%s.get(key, MISSING)" % name,
+            "    if value is MISSING:",
+            "        value = self._f_%s(%s)" % (name, ", ".join(callargs)),
+            "        if value is None:   # Assigned in the formula",
+            "            value = self._c_%s.get(key)" % name,
+            "        self._c_%s[key] = value" % name,
+            "    return value"
+        ])
+
+    def encode_refs(self, refs):
+        return {name: self.encode_value(name, ref.interface, ref.is_relative)
+                for name, ref in refs}
+
+    def encode_value(self, name, value, is_relative):
+        if isinstance(value, ModuleType):
+            return ("module", value.__name__)
+
+        elif isinstance(value, (BaseSpace, Cells)):
+            path = value._idtuple[1:]
+            if (value.model is not self.model
+                    or not all(isinstance(elm, str) for elm in path)):
+                raise ValueError(
+                    "%s referred as %s cannot be exported" %
+                    (value.fullname, name))
+            return ("relative" if is_relative else "object", path)
+
+        elif isinstance(value, Interface):
+            raise ValueError(
+                "%s referred as %s cannot be exported" %
+                (value.fullname, name))
+        else:
+            try:
+                pickle.dumps(value)
+            except Exception as e:
+                raise ValueError(
+                    "value of %s cannot be exported" % name) from e
+            return ("value", value)
+
+
+def export_model(model, path):
+    if sys.version_info < (3, 9):
+        raise RuntimeError("Python 3.9 or newer is required")
+    ModelExporter(model).export(path)
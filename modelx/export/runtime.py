@@ -0,0 +1,181 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Runtime of packages exported by Model.export
+
+This module is copied into exported packages as ``_mx_runtime.py``,
+so it must not import modelx.
+"""
+
+import builtins
+import importlib
+import inspect
+import pickle
+from types import FunctionType
+
+MISSING = object()
+ITEMROOT = object()
+
+
+def decode_value(value, model, space):
+    kind, data = value
+    if kind == "value":
+        return data
+    elif kind == "module":
+        return importlib.import_module(data)
+    elif kind == "object":
+        return model._mx_get_object(data, None)
+    elif kind == "relative":
+        return model._mx_get_object(data, space)
+    else:
+        raise ValueError("invalid value: %s" % kind)
+
+
+class BaseModel:
+
+    _mx_spaces = {}     # name -> space class
+
+    def __init__(self, data):
+        self._mx_data = data
+        self._mx_refs = {}
+        for name, cls in self._mx_spaces.items():
+            setattr(self, name, cls(self, self, name))
+
+        for name, value in data["refs"].items():
+            self._mx_refs[name] = decode_value(value, self, None)
+
+    def _mx_get_object(self, path, space):
+        """Get a space or cells from its path in the model
+
+        If ``space`` is in an ItemSpace and ``path`` is in
+        the parametric space of the ItemSpace,
+        the object in the ItemSpace is returned.
+        """
+        root = space._mx_itemroot if space is not None else None
+        if root is not None and path[:len(root._mx_path)] == root._mx_path:
+            obj = root
+            path = path[len(root._mx_path):]
+        else:
+            obj = self
+
+        for name in path:
+            obj = getattr(obj, name)
+        return obj
+
+
+class BaseSpace:
+
+    _mx_path = ()
+    _mx_cells = ()      # names of cells
+    _mx_formulas = {}   # name -> formula function
+    _mx_spaces = {}     # name -> child space class
+    _mx_param_formula = None
+
+    def __init__(self, model, parent, name, arguments=None, refs=None,
+                 itemroot=None):
+        self._mx_model = model
+        self._mx_parent = parent
+        self._mx_name = name
+        self._mx_arguments = dict(arguments or {})
+        self._mx_item_refs = refs or {}
+        self._mx_itemroot = self if itemroot is ITEMROOT else itemroot
+        self._mx_items = {}
+        self._mx_namespace = None
+
+        if itemroot is None:
+            inputs = model._mx_data["spaces"][self._mx_path]["inputs"]
+        else:
+            inputs = {}
+
+        for cells in self._mx_cells:
+            setattr(self, "_c_" + cells, dict(inputs.get(cells, {})))
+
+        for child, cls in self._mx_spaces.items():
+            setattr(self, child, cls(model, self, child, self._mx_arguments,
+                                     None, self._mx_itemroot))
+
+    def __getattr__(self, name):
+        # Called only for missing attributes
+        if self._mx_namespace is None:
+            self._mx_init_namespace()
+            return getattr(self, name)
+        elif name in self._mx_namespace:
+            return self._mx_namespace[name]
+        else:
+            raise AttributeError(name)
+
+    def _mx_init_namespace(self):
+        model = self._mx_model
+        data = model._mx_data["spaces"][self._mx_path]
+
+        ns = {"__builtins__": builtins}
+        ns.update((name, getattr(self, name)) for name in self._mx_spaces)
+        ns.update(model._mx_refs)
+        ns.update((name, decode_value(value, model, self))
+                  for name, value in data["refs"].items())
+        ns["_self"] = ns["_space"] = self
+        ns.update(self._mx_item_refs)
+        ns.update(self._mx_arguments)
+        ns.update((name, getattr(self, name)) for name in self._mx_cells)
+        self._mx_namespace = ns
+
+        for name, func in self._mx_formulas.items():
+            setattr(self, "_f_" + name, FunctionType(
+                func.__code__, ns, name, func.__defaults__, func.__closure__))
+
+        if self._mx_param_formula is not None:
+            func = self._mx_param_formula
+            self._mx_param_func = FunctionType(
+                func.__code__, ns, func.__name__,
+                func.__defaults__, func.__closure__)
+
+    def _mx_set(self, name, key, value):
+        getattr(self, "_c_" + name)[key] = value
+
+    def __getitem__(self, key):
+        return self._mx_get_item(key if isinstance(key, tuple) else (key,))
+
+    def __call__(self, *args, **kwargs):
+        return self._mx_get_item(args, kwargs)
+
+    def _mx_get_item(self, args, kwargs=None):
+        if self._mx_param_formula is None:
+            raise TypeError("%s is not parametric" % self._mx_name)
+
+        bound = inspect.signature(self._mx_param_formula).bind(
+            *args, **(kwargs or {}))
+        bound.apply_defaults()
+        key = tuple(bound.arguments.values())
+
+        item = self._mx_items.get(key, MISSING)
+        if item is MISSING:
+            if self._mx_namespace is None:
+                self._mx_init_namespace()
+            params = self._mx_param_func(*key) or {}
+            if params.get("bases", None) not in (None, self):
+                raise NotImplementedError(
+                    "bases other than the parametric space not supported")
+            arguments = dict(self._mx_arguments)
+            arguments.update(bound.arguments)
+            item = self._mx_items[key] = type(self)(
+                self._mx_model, self, self._mx_name,
+                arguments, params.get("refs"), ITEMROOT)
+
+        return item
+
+
+def load_model(model_class, path):
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    return model_class(data)
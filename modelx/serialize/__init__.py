@@ -120,9 +120,14 @@ def write_model(system, model, model_path,
     return model
 
 
-def read_model(system, model_path, name=None):
+def read_model(system, model_path, name=None, cache_dir=None,
+               max_workers=None):
 
     kwargs = {"name": name} if name else {}
+    if cache_dir is not None:
+        kwargs["cache_dir"] = cache_dir
+    if max_workers:
+        kwargs["max_workers"] = max_workers
     path = pathlib.Path(model_path)
     params = _get_model_metadata(path)
 
@@ -0,0 +1,277 @@
+# Copyright (c) 2017-2022 Fumito Hamamura <fumito.ham@gmail.com>
+
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation version 3.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Parse source files of models in parallel and cache the results
+
+Tokenizing the source files is the most time-consuming part of
+reading a large model. :class:`SourceParser` parses the source files
+into :class:`asttokens.ASTTokens` objects, and keeps the
+parsed objects pickled in memory and in a cache directory,
+keyed by the hash of the source texts. The in-memory cache is bounded
+by the total size of the pickled data, :data:`MEMCACHE_MAXBYTES`.
+The source files that are not in the cache are parsed
+in worker processes if there are many of them.
+
+The cache directory defaults to a directory in the user cache directory,
+returned by :func:`get_default_cache_dir`. Each cache file starts with
+a header and an HMAC of its contents keyed by a secret saved
+in the cache directory, and files that fail the check are
+parsed again instead of being unpickled.
+"""
+
+import os
+import sys
+import pathlib
+import hashlib
+import hmac
+import pickle
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import asttokens
+from modelx.core.util import get_mp_context
+
+try:
+    from importlib.metadata import version as _get_version
+    _ASTTOKENS_VERSION = _get_version("asttokens")
+except Exception:   # Python 3.6, 3.7 or not installed by pip
+    _ASTTOKENS_VERSION = ""
+
+# Pickled ASTTokens depend on the Python and asttokens versions
+_KEY_PREFIX = "%s|%s|%s|" % (
+    sys.implementation.cache_tag, _ASTTOKENS_VERSION,
+    pickle.HIGHEST_PROTOCOL)
+
+MEMCACHE_MAXBYTES = 64 * 1024 * 1024
+PARALLEL_THRESHOLD = 32    # Minimum number of sources per worker process
+
+# Cache files are the header, the HMAC and the pickled data
+_FILE_HEADER = b"modelx-parsecache-1\n"
+_SECRET_FILE = "secret.key"
+
+
+class _MemCache:
+    """LRU cache of pickled data bounded by the total bytes"""
+
+    def __init__(self):
+        self.data = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, key):
+        if key in self.data:
+            self.data.move_to_end(key)
+            return self.data[key]
+        return None
+
+    def set(self, key, value):
+        if key in self.data:
+            self.nbytes -= len(self.data.pop(key))
+
+        if len(value) > MEMCACHE_MAXBYTES:
+            return
+
+        self.data[key] = value
+        self.nbytes += len(value)
+        while self.nbytes > MEMCACHE_MAXBYTES:
+            _, evicted = self.data.popitem(last=False)
+            self.nbytes -= len(evicted)
+
+    def clear(self):
+        self.data.clear()
+        self.nbytes = 0
+
+
+_memcache = _MemCache()
+
+
+def get_cache_key(src: str):
+    return hashlib.sha256((_KEY_PREFIX + src).encode("utf-8")).hexdigest()
+
+
+def parse_to_bytes(src: str):
+    return pickle.dumps(
+        asttokens.ASTTokens(src, parse=True),
+        protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def clear_memcache():
+    _memcache.clear()
+
+
+def get_default_cache_dir():
+    """Return the directory to cache parsed source files in by default
+
+    The directory is ``modelx/parse`` in the user cache directory, that is,
+    ``%LOCALAPPDATA%\\modelx\\Cache\\parse`` on Windows,
+    ``~/Library/Caches/modelx/parse`` on macOS and
+    ``$XDG_CACHE_HOME/modelx/parse`` or ``~/.cache/modelx/parse``
+    on the other platforms.
+    """
+    if sys.platform == "win32":
+        base = (os.environ.get("LOCALAPPDATA")
+                or pathlib.Path.home() / "AppData" / "Local")
+        return pathlib.Path(base) / "modelx" / "Cache" / "parse"
+    elif sys.platform == "darwin":
+        return pathlib.Path.home() / "Library" / "Caches" / "modelx" / "parse"
+    else:
+        base = (os.environ.get("XDG_CACHE_HOME")
+                or pathlib.Path.home() / ".cache")
+        return pathlib.Path(base) / "modelx" / "parse"
+
+
+def _get_secret(cache_dir: pathlib.Path):
+    """Return the secret to sign the cache files in ``cache_dir`` with
+
+    The secret is created at the first call and saved in a file
+    only the user can read. Returns None if the file cannot be
+    read or created.
+    """
+    path = cache_dir / _SECRET_FILE
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    else:
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(32))
+
+    try:
+        with open(path, "rb") as f:
+            secret = f.read()
+    except OSError:
+        return None
+
+    return secret if len(secret) == 32 else None
+
+
+def _sign(secret, key, data):
+    return hmac.new(secret, key.encode("ascii") + data, "sha256").digest()
+
+
+class SourceParser:
+    """Parse source texts into ASTTokens objects using the cache
+
+    Args:
+        cache_dir(path-like, optional): Directory to store the parsed
+            results. Defaults to :func:`get_default_cache_dir`.
+            If :obj:`False`, the results are cached only in memory.
+        max_workers(int, optional): Maximum number of processes to
+            parse sources in parallel. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, cache_dir=None, max_workers=None):
+        if cache_dir is None:
+            cache_dir = get_default_cache_dir()
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.hits = 0
+        self._secret = None
+
+    def parse(self, src: str):
+        return self.parse_all([src])[0]
+
+    def parse_all(self, srcs):
+        """Return a list of ASTTokens objects parsed from ``srcs``"""
+        keys = [get_cache_key(src) for src in srcs]
+        data = [self._get_cache(key) for key in keys]
+        missed = {}     # Parse the same sources only once
+        for i, d in enumerate(data):
+            if d is None:
+                missed.setdefault(keys[i], srcs[i])
+        self.hits += len(srcs) - len(missed)
+
+        parsed = dict(zip(missed, self._parse_bytes(list(missed.values()))))
+        for key, d in parsed.items():
+            self._set_cache(key, d)
+        data = [parsed[k] if d is None else d for k, d in zip(keys, data)]
+
+        result = []
+        for src, key, d in zip(srcs, keys, data):
+            try:
+                result.append(pickle.loads(d))
+            except Exception:   # Broken cache file
+                d = parse_to_bytes(src)
+                self._set_cache(key, d)
+                result.append(pickle.loads(d))
+
+        return result
+
+    def _parse_bytes(self, srcs):
+
+        workers = min(self.max_workers, len(srcs) // PARALLEL_THRESHOLD)
+
+        if workers > 1:
+            # Tokenizing is bound by the GIL, so processes are used.
+            with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=get_mp_context()
+            ) as executor:
+                return list(executor.map(
+                    parse_to_bytes, srcs,
+                    chunksize=-(-len(srcs) // (workers * 4))))
+        else:
+            return [parse_to_bytes(src) for src in srcs]
+
+    def _get_secret(self):
+        if self._secret is None:
+            self._secret = _get_secret(self.cache_dir)
+            if self._secret is None:    # Not to use the directory
+                self.cache_dir = None
+        return self._secret
+
+    def _get_cache(self, key):
+
+        data = _memcache.get(key)
+        if data is not None:
+            return data
+
+        if self.cache_dir:
+            try:
+                with open(self.cache_dir / (key + ".pickle"), "rb") as f:
+                    header = f.read(len(_FILE_HEADER))
+                    mac = f.read(32)
+                    data = f.read()
+            except OSError:
+                return None
+
+            secret = self._get_secret()
+            if (secret is None or header != _FILE_HEADER
+                    or not hmac.compare_digest(mac, _sign(secret, key, data))):
+                return None     # Not unpickled
+
+            _memcache.set(key, data)
+            return data
+
+        return None
+
+    def _set_cache(self, key, data):
+
+        _memcache.set(key, data)
+
+        if self.cache_dir and self._get_secret():
+            # Write to a temporary file and rename it not to leave
+            # incomplete cache files. The cache is not essential,
+            # so errors are ignored.
+            try:
+                with tempfile.NamedTemporaryFile(
+                        dir=self.cache_dir, delete=False) as f:
+                    f.write(_FILE_HEADER)
+                    f.write(_sign(self._secret, key, data))
+                    f.write(data)
+                os.replace(f.name, self.cache_dir / (key + ".pickle"))
+            except OSError:
+                pass
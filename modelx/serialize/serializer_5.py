@@ -27,8 +27,8 @@ from modelx.core.model import Model
 from modelx.core.base import Interface
 from modelx.core.util import (
     abs_to_rel, rel_to_abs, abs_to_rel_tuple, rel_to_abs_tuple)
-import asttokens
 from . import ziputil
+from .parsecache import SourceParser
 from .custom_pickle import (
     IOSpecUnpickler, ModelUnpickler,
     IOSpecPickler, ModelPickler)
@@ -572,6 +572,11 @@ class SpaceEncoder(BaseEncoder):
         # Output allow_none
         lines.append("_allow_none = " + str(self.space.allow_none))
 
+        # Output max_itemspaces
+        if self.space.max_itemspaces is not None:
+            lines.append(
+                "_max_itemspaces = " + str(self.space.max_itemspaces))
+
         # Output _spaces. Exclude spaces created from methods
         spaces = []
         for name, space in self.space.spaces.items():
@@ -1034,6 +1039,8 @@ class ModelReader:
         self.pickledata = None
         self.iospecs = None
         self.temproot = None
+        self.parser = None
+        self.prefetched = {}
 
     def read_model(self, **kwargs):
 
@@ -1041,6 +1048,9 @@ class ModelReader:
             self.system.serializing = self
             self.system.iomanager.serializing = True
             self.kwargs = kwargs
+            self.parser = SourceParser(
+                cache_dir=kwargs.get("cache_dir"),
+                max_workers=kwargs.get("max_workers"))
             if zipfile.is_zipfile(self.path):
                 with tempfile.TemporaryDirectory() as tempdir:
                     self.temproot = pathlib.Path(tempdir)
@@ -1094,6 +1104,8 @@ class ModelReader:
             self.parse_source(path_ / "__init__.py", self.model)
             spaces = self.result
 
+        self.prefetch_sources(
+            [path_ / name / "__init__.py" for name in spaces])
         for name in spaces:
             space = target.new_space(name=name)
             self.parse_source(path_ / name / "__init__.py", space)
@@ -1134,11 +1146,20 @@ class ModelReader:
         value = self.pickledata[valid]
         cells._impl.set_value(key, value)
 
+    def prefetch_sources(self, paths):
+        """Parse source files in advance to parse them in parallel"""
+        srcs = [ziputil.read_str_utf8(p) for p in paths]
+        self.prefetched.update(
+            zip(paths, zip(srcs, self.parser.parse_all(srcs))))
+
     def parse_source(self, path_, obj: Interface):
 
-        src = ziputil.read_str_utf8(path_)
+        if path_ in self.prefetched:
+            src, atok = self.prefetched.pop(path_)
+        else:
+            src = ziputil.read_str_utf8(path_)
+            atok = self.parser.parse(src)
         srcstructure = SourceStructure(src)
-        atok = asttokens.ASTTokens(src, parse=True)
 
         for i, stmt in enumerate(atok.tree.body):
             sec = srcstructure.get_section(stmt.lineno)
@@ -1441,6 +1462,13 @@ class AttrAssignParser(BaseAssignParser):
                 # by LambdaAssignParser and CellsFuncDefParser
                 return
 
+        elif self.target == "_max_itemspaces":
+            value = ast.literal_eval(self.atok.get_text(self.node.value))
+            return Instruction.from_method(
+                obj=self.obj,
+                method="set_property",
+                args=("max_itemspaces", value))
+
         else:
             raise RuntimeError("unknown attribute assignment")
 
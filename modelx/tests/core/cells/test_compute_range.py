@@ -0,0 +1,59 @@
+import modelx as mx
+from modelx.core.errors import FormulaError
+import pytest
+
+
+@pytest.fixture
+def rangemodel():
+
+    m = mx.new_model()
+    s = m.new_space("Projection")
+
+    @mx.defcells
+    def pols_if(t):
+        return 100 if t == 0 else pols_if(t - 1) - pols_death(t - 1)
+
+    @mx.defcells
+    def pols_death(t):
+        return pols_if(t) * 0.01
+
+    @mx.defcells
+    def scalar():
+        return 1
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_compute_range(rangemodel):
+
+    s = rangemodel.Projection
+    s.pols_if.compute_range(range(100))
+    assert len(s.pols_if) == 100
+    assert len(s.pols_death) == 99
+    expected = s.pols_if(99)
+
+    s.clear_all()
+    assert s.pols_if(99) == expected
+
+
+def test_compute_range_depth(rangemodel):
+
+    s = rangemodel.Projection
+    maxdepth = mx.get_recursion()
+    mx.set_recursion(50)
+    try:
+        with pytest.raises(FormulaError):
+            s.pols_if(100)
+
+        s.pols_if.compute_range(range(101))
+        assert s.pols_if(100) == pytest.approx(100 * 0.99 ** 100)
+    finally:
+        mx.set_recursion(maxdepth)
+
+
+def test_compute_range_error(rangemodel):
+
+    with pytest.raises(ValueError):
+        rangemodel.Projection.scalar.compute_range(range(3))
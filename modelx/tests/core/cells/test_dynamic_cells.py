@@ -0,0 +1,87 @@
+import modelx as mx
+from modelx.core.cells import NO_INPUTS, NO_DATA
+from modelx.core.formula import DynamicBoundFunction
+import pytest
+
+
+@pytest.fixture
+def dynmodel():
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda i: None)
+
+    @mx.defcells
+    def foo(t):
+        return t * rate + i
+
+    @mx.defcells
+    def bar(t):
+        return foo(t) * 2
+
+    s.rate = 2
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_dynamic_cells(dynmodel):
+
+    s = dynmodel.Projection
+    foo = s[1].foo._impl
+
+    assert isinstance(foo.altfunc, DynamicBoundFunction)
+    assert foo.altfunc.global_names is s.foo._impl.altfunc.global_names
+    assert foo.input_keys is NO_INPUTS
+    assert s[1].bar(3) == 14
+
+    s[1].foo[3] = 10
+    assert foo.input_keys == {(3,)}
+    assert s[1].bar(3) == 20
+    assert s[2]._impl.cells["foo"].input_keys is NO_INPUTS
+
+
+def test_dynamic_cells_ref_change(dynmodel):
+
+    s = dynmodel.Projection
+    assert s[1].bar(3) == 14
+
+    s.rate = 3
+    assert s[1].bar(3) == 20
+
+
+def test_dynamic_cells_store(dynmodel):
+
+    s = dynmodel.Projection
+    store = s.foo._impl._dynamic_store
+    item1, item2 = s[1]._impl, s[2]._impl
+    foo1, bar2 = item1.cells["foo"], item2.cells["bar"]
+
+    assert foo1._store is store and foo1.formula is s.foo._impl.formula
+    assert foo1.data is NO_DATA and not store.data
+
+    assert s[1].bar(3) == 14 and s[2].foo(3) == 8
+    assert store.data == {item1: {(3,): 7}, item2: {(3,): 8}}
+    assert foo1.data is store.data[item1]
+    assert bar2.data is NO_DATA
+
+    s[1].foo[4] = 10
+    assert store.input_keys == {item1: {(4,)}}
+
+    del s[1]
+    assert store.data == {item2: {(3,): 8}} and not store.input_keys
+
+    s.foo.formula = lambda t: t
+    assert not store.data
+
+
+def test_dynamic_cells_namespace(dynmodel):
+    """Dynamic cells are notified of their namespace changes"""
+    s = dynmodel.Projection
+    item = s[1]
+    assert item.bar(3) == 14
+    assert all(c._impl not in item._impl._referrers.values()
+               for c in item.cells.values())
+
+    s.rate = 3
+    assert s[1].bar(3) == 20
@@ -0,0 +1,174 @@
+import gc
+import time
+import modelx as mx
+from modelx.core.errors import NoneReturnedError
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def setvaluesmodel():
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def rate(t):
+        return 0
+
+    @mx.defcells
+    def table(x, y=1):
+        return x * y
+
+    @mx.defcells
+    def total():
+        return sum(rate(t) for t in range(5))
+
+    yield s
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_set_values(setvaluesmodel):
+
+    s = setvaluesmodel
+    assert s.total() == 0
+
+    s.rate.set_values({t: t for t in range(3)})
+    assert not len(s.total)
+    assert s.total() == 3
+    assert all(s.rate.is_input(t) for t in range(3))
+    assert not s.rate.is_input(3)
+
+    s.rate.set_values(pd.Series([10, 20], index=[3, 4]))
+    assert s.total() == 33
+    assert type(s.rate[3]) is int
+
+    s.table.set_values({(1, 2): 5, 3: 6})   # Default applied
+    assert s.table(1, 2) == 5
+    assert s.table(3) == 6
+    assert s.table.is_input(3, 1)
+
+
+def test_set_values_multiindex(setvaluesmodel):
+
+    s = setvaluesmodel
+    index = pd.MultiIndex.from_tuples([(1, 2), (3, 4)])
+    s.table.set_values(pd.Series([10, 20], index=index))
+
+    assert dict(s.table) == {(1, 2): 10, (3, 4): 20}
+
+
+def test_set_array(setvaluesmodel):
+
+    s = setvaluesmodel
+    s.total()
+
+    s.rate.set_array(np.arange(5), np.arange(5) * 2)
+    assert s.total() == 20
+    assert type(s.rate[1]) is int
+
+    s.table.set_array(np.array([[1, 2], [3, 4]]), np.ones((2, 3)))
+    assert np.array_equal(s.table(3, 4), np.ones(3))
+
+    with pytest.raises(ValueError):
+        s.rate.set_array(np.arange(5), np.arange(4))
+
+
+def test_set_values_recalc(setvaluesmodel):
+
+    s = setvaluesmodel
+    s.total()
+
+    saved = mx.get_recalc()
+    mx.set_recalc(True)
+    try:
+        s.rate.set_values({0: 1, 1: 1})
+    finally:
+        mx.set_recalc(saved)
+
+    assert () in s.total
+    assert s.total() == 2
+
+
+def test_set_values_none(setvaluesmodel):
+
+    s = setvaluesmodel
+    with pytest.raises(NoneReturnedError):
+        s.rate.set_values({1: 1, 2: None})
+
+    assert not len(s.rate)
+
+    s.rate.allow_none = True
+    s.rate.set_values({2: None})
+    assert s.rate[2] is None
+
+
+def test_set_values_nodes(setvaluesmodel, tmp_path):
+
+    s = setvaluesmodel
+    m = s.model
+    graph = m._impl.tracegraph
+    s.rate.set_array(np.arange(5), np.arange(5))
+    assert s.rate.node(1)._impl in graph
+    assert not s.rate.node(1).succs
+
+    assert s.total() == 10
+    assert s.rate.node(1).succs == [s.total.node()]
+    assert len(graph.nodes) == 6
+
+    s.rate.clear_at(1)
+    assert 1 not in s.rate
+    assert not len(s.total)
+
+    s.rate[1] = 2
+    s.rate.set_values({t: 2 for t in range(5)})
+    assert s.total() == 10
+    assert s.rate.is_input(1)
+
+    m.backup(tmp_path / "model.mx")
+    m2 = mx.restore_model(tmp_path / "model.mx", name="Restored")
+    s2 = m2.spaces[s.name]
+    assert all(s2.rate.is_input(t) for t in range(5))
+    s2.rate[0] = 12
+    assert s2.total() == 20
+    m2._impl._check_sanity()
+    m2.close()
+
+    s.rate.clear_all()
+    assert not len(s.rate) and not len(s.total)
+    assert not list(graph.nodes)
+
+
+@pytest.mark.parametrize("method", ["set_values", "set_array"])
+def test_set_values_speed(setvaluesmodel, method):
+    """Bulk input assignment is 10x faster than the per-key loop"""
+
+    s = setvaluesmodel
+    index = np.arange(50000)
+    values = index * 2
+    mapping = dict(zip(index.tolist(), values.tolist()))
+
+    def loop():
+        for key, value in mapping.items():
+            s.rate[key] = value
+
+    def bulk():
+        if method == "set_values":
+            s.rate.set_values(mapping)
+        else:
+            s.rate.set_array(index, values)
+
+    def get_time(func):
+        result = []
+        for _ in range(3):
+            s.rate.clear_all()
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            result.append(time.perf_counter() - start)
+        return min(result)
+
+    assert get_time(loop) / get_time(bulk) >= 10
+    assert dict(s.rate) == mapping
@@ -68,3 +68,31 @@ def test_lambda_as_param():
     f = Formula(lambdadef2)
     assert f.func(1) == 3
     assert f.source == lambdadef2_extracted
+
+
+@pytest.mark.parametrize(
+    "func, args, kwargs, key",
+    [
+        (lambda x, y: None, (1, 2), {}, (1, 2)),
+        (lambda x, y: None, [1, 2], {}, (1, 2)),
+        (lambda x, y: None, (1,), {"y": 2}, (1, 2)),
+        (lambda x, y=2: None, (1,), {}, (1, 2)),
+        (lambda: None, (), {}, ()),
+        (lambda x, *args: None, (1, 2, 3), {}, (1, (2, 3))),
+        (lambda x, *, y=2: None, (1,), {}, (1, 2))
+    ]
+)
+def test_get_key(func, args, kwargs, key):
+    formula = Formula(func)
+    assert formula.get_key(args, kwargs) == key
+    assert type(formula.get_key(args, kwargs)) is tuple
+
+
+def test_get_key_error():
+    formula = Formula(lambda x, y=2: None)
+
+    with pytest.raises(TypeError):
+        formula.get_key((1, 2, 3), {})
+
+    with pytest.raises(TypeError):
+        formula.get_key((1,), {"z": 3})
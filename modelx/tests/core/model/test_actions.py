@@ -1,4 +1,8 @@
+import pathlib
+import numpy as np
 import modelx as mx
+import pytest
+from modelx.core.model import ValueSpiller
 
 
 def test_action():
@@ -51,3 +55,257 @@ def test_action():
 
 
 
+
+
+def test_action_max_memory():
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def arr(t):
+        return np.full(100, t)    # 800 bytes
+
+    @mx.defcells
+    def cumsum(t):
+        return (cumsum(t-1) if t > 0 else 0) + arr(t)
+
+    s.np = np
+    targets = [s.cumsum.node(9)]
+
+    actions = m.generate_actions(targets, step_size=None, max_memory=2500)
+
+    # Estimate the peak size from the actions
+    size, peak = 0, 0
+    for action, nodes in actions:
+        if action == "calc":
+            size += 800 * len(nodes)
+            peak = max(peak, size)
+        elif action == "clear":
+            size -= 800 * len(nodes)
+
+    assert peak <= 2500
+    assert len(actions) > 3
+
+    m.execute_actions(actions)
+    assert np.array_equal(s.cumsum(9), np.full(100, 45))
+    assert not dict(s.arr)
+    assert list(s.cumsum) == [9]
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_action_step_size_none():
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def fibo(x):
+        return fibo(x - 1) + fibo(x - 2) if x > 1 else x
+
+    actions = m.generate_actions([fibo.node(10)], step_size=None)
+    assert [a for a, _ in actions] == ["calc", "paste", "clear"]
+    assert len(actions[0][1]) == 11
+    assert actions[1][1] == [fibo.node(10)]
+
+    m._impl._check_sanity()
+    m.close()
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_action_empty_paste(spill):
+
+    m = mx.new_model()
+    m.new_space()
+
+    @mx.defcells
+    def foo(x):
+        return x
+
+    m.execute_actions([['calc', []], ['paste', []], ['clear', []]],
+                      spill=spill)
+    m.execute_actions(
+        [['calc', [foo.node(1)]], ['paste', []], ['clear', [foo.node(1)]]],
+        spill=spill)
+    assert not len(foo)
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_action_spill(tmp_path):
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def arr(t):
+        return np.full(100, t)
+
+    @mx.defcells
+    def total(t):
+        return {"sum": arr(t).sum()}
+
+    @mx.defcells
+    def result(t):
+        return (result(t-1) if t > 0 else 0) + arr(t)[0] + total(t)["sum"]
+
+    s.np = np
+    actions = m.generate_actions([s.result.node(9)], step_size=2)
+    m.execute_actions(actions, spill=True, spill_dir=str(tmp_path))
+
+    assert s.result(9) == sum(101 * t for t in range(10))
+    assert s.result.is_input(9)
+    assert not dict(s.arr) and not dict(s.total)
+    assert list(s.result) == [9]
+    assert not list(tmp_path.iterdir())     # Temporary directory removed
+    assert m._impl.spiller is None
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_action_spill_reload(tmp_path, monkeypatch):
+    """Spilled values are loaded only while used"""
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def arr(t):
+        return np.full(100, t)
+
+    @mx.defcells
+    def total(t):
+        return arr(0).sum() + t
+
+    s.np = np
+    actions = [
+        ['calc', [arr.node(0)]], ['paste', [arr.node(0)]], ['clear', []],
+        ['calc', [total.node(1)]], ['paste', [total.node(1)]], ['clear', []],
+        ['calc', [total.node(2)]], ['paste', [total.node(2)]],
+        ['clear', [arr.node(0)]]
+    ]
+
+    loaded = []
+    load = ValueSpiller.load
+
+    def load_value(self, node):
+        loaded.append(pathlib.Path(self.paths[node]).exists())
+        return load(self, node)
+
+    monkeypatch.setattr(ValueSpiller, "load", load_value)
+    m.execute_actions(actions, spill=True, spill_dir=str(tmp_path))
+
+    assert loaded == [True, True]   # Loaded again from the file
+    assert s.total(1) == 1 and s.total(2) == 2
+    assert not dict(s.arr)
+    assert not list(tmp_path.iterdir())
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_action_spill_discard(tmp_path):
+    """Files of spilled values are deleted after their last use"""
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def foo(t):
+        return np.full(100, t)
+
+    @mx.defcells
+    def bar(t):
+        return foo(1)[0] + len(list(pathlib.Path(spill_dir).glob("*/*")))
+
+    s.np = np
+    s.pathlib = pathlib
+    s.spill_dir = str(tmp_path)
+    actions = [
+        ['calc', [foo.node(0), foo.node(1)]],
+        ['paste', [foo.node(0), foo.node(1)]], ['clear', []],
+        ['calc', [foo.node(2)]], ['paste', [foo.node(2)]],
+        ['clear', [foo.node(0)]],
+        ['calc', [bar.node(0)]], ['paste', [bar.node(0)]],
+        ['clear', [foo.node(1)]]
+    ]
+    m.execute_actions(actions, spill=True, spill_dir=str(tmp_path))
+
+    assert s.bar(0) == 2
+
+    m._impl._check_sanity()
+    m.close()
+
+
+@pytest.fixture
+def itemspacemodel():
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda policy_id: None)
+
+    @mx.defcells
+    def premium(t):
+        return policy_id * rate
+
+    @mx.defcells
+    def total(t):
+        return premium(t) + (total(t-1) if t > 0 else 0)
+
+    s.rate = 10
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_write_read_actions(itemspacemodel, tmp_path):
+
+    m = itemspacemodel
+    s = m.Projection
+    actions = m.generate_actions([s[1].total.node(5)], step_size=3)
+
+    m.write_actions(actions, tmp_path / "actions")
+    assert m.read_actions(tmp_path / "actions") == actions
+
+    s.clear_all()
+    actions = m.read_actions(tmp_path / "actions")
+    m.execute_actions(actions)
+    assert s[1].total(5) == 60
+    assert s[1].total.is_input(5)
+
+
+def test_read_actions_invalid(itemspacemodel, tmp_path):
+
+    m = itemspacemodel
+    s = m.Projection
+    actions = m.generate_actions([s[1].total.node(5)], step_size=3)
+    m.write_actions(actions, tmp_path / "actions")
+
+    del s.premium
+    with pytest.raises(ValueError, match="premium not found"):
+        m.read_actions(tmp_path / "actions")
+
+    s.total.formula = lambda x: x
+    with pytest.raises(ValueError, match=r"changed from \(t\) to \(x\)"):
+        m.read_actions(tmp_path / "actions")
+
+
+def test_retarget_actions(itemspacemodel):
+
+    m = itemspacemodel
+    s = m.Projection
+    actions = m.generate_actions([s[1].total.node(5)], step_size=3)
+
+    for i in range(2, 5):
+        retargeted = m.retarget_actions(actions, s[1], s[i])
+        assert len(retargeted) == len(actions)
+        m.execute_actions(retargeted)
+        assert s[i].total(5) == 60 * i
+        assert list(s[i].total) == [5]
+        assert not dict(s[i].premium)
+
+    with pytest.raises(ValueError):
+        m.retarget_actions(actions, s[1], s)
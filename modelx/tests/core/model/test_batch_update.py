@@ -0,0 +1,96 @@
+import modelx as mx
+from modelx.core.model import TraceManager
+import pytest
+
+
+@pytest.fixture(params=["compact", "networkx"])
+def batchmodel(request):
+
+    saved = TraceManager.graph_backend
+    TraceManager.graph_backend = request.param
+    m = mx.new_model()
+    TraceManager.graph_backend = saved
+    s = m.new_space("Space1", formula=lambda i: None)
+
+    @mx.defcells
+    def rate(t):
+        return 0.01
+
+    @mx.defcells
+    def pv(t):
+        return 100 / (1 + rate(t)) + (pv(t-1) if t > 0 else 0)
+
+    @mx.defcells
+    def total():
+        return pv(9)
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_batch_update(batchmodel):
+
+    m = batchmodel
+    s = m.Space1
+    s.total()
+
+    with m.batch_update():
+        for t in range(10):
+            s.rate[t] = 0
+        assert len(s.pv) == 10     # Not cleared yet
+        assert s.rate(5) == 0
+
+    assert not len(s.pv)
+    assert not len(s.total)
+    assert all(s.rate.is_input(t) for t in range(10))
+    assert not list(m._impl.tracegraph.predecessors(s.rate.node(0)._impl))
+    assert s.total() == 1000
+
+
+def test_batch_update_calculated_to_input(batchmodel):
+
+    m = batchmodel
+    s = m.Space1
+    s.total()
+
+    with m.batch_update():
+        s.pv[5] = 0
+        s.rate[7] = 0
+
+    assert s.pv.is_input(5)
+    assert set(s.pv) == {0, 1, 2, 3, 4, 5}
+    assert s.total() == pytest.approx(100 / 1.01 * 3 + 100)
+
+
+@pytest.mark.parametrize("recalc", [True, False])
+def test_batch_update_recalc(batchmodel, recalc):
+
+    m = batchmodel
+    s = m.Space1
+
+    calls = []
+
+    @mx.defcells(space=s)
+    def other():
+        calls.append(1)
+        return rate(0) + rate(1)
+
+    s.calls = calls
+    s.other()
+    s.total()
+    saved = mx.get_recalc()
+    mx.set_recalc(recalc)
+    try:
+        with m.batch_update():
+            with m.batch_update():
+                s.rate[0] = 0
+            assert () in s.other    # Cleared by the outermost
+            s.rate[1] = 0
+    finally:
+        mx.set_recalc(saved)
+
+    assert (() in s.total) == recalc
+    assert (() in s.other) == recalc
+    assert len(calls) == (2 if recalc else 1)
+    assert s.other() == 0
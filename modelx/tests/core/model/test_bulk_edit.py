@@ -0,0 +1,121 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def bulkmodel():
+    """
+        Model1-Base--x
+              |
+              +-Sub1(Base)
+              |
+              +-Sub2(Sub1)
+    """
+    m = mx.new_model()
+    base = m.new_space("Base")
+    base.x = 1
+    sub1 = m.new_space("Sub1", bases=base)
+    m.new_space("Sub2", bases=sub1)
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_bulk_edit(bulkmodel):
+
+    m = bulkmodel
+    base, sub1, sub2 = m.Base, m.Sub1, m.Sub2
+
+    with m.bulk_edit():
+        for i in range(5):
+            base.new_cells("foo%d" % i, formula="lambda t: t * x + %d" % i)
+        base.y = 2
+        assert "foo0" in base.cells
+        assert "foo0" not in sub2.cells     # Not inherited yet
+
+    for s in (sub1, sub2):
+        assert list(s.cells) == list(base.cells)
+        assert s.y == 2
+        assert s.foo3(2) == 5
+
+    m._impl._check_sanity()
+
+
+def test_bulk_edit_order(bulkmodel):
+
+    m = bulkmodel
+    m.Sub1.new_cells("bar", formula=lambda: 0)
+
+    with m.bulk_edit():
+        m.Base.new_cells("foo", formula=lambda: 1)
+
+    assert list(m.Sub1.cells) == ["foo", "bar"]
+    assert list(m.Sub2.cells) == ["foo", "bar"]
+    assert m.Sub2.foo() == 1
+
+
+def test_bulk_edit_nested(bulkmodel):
+
+    m = bulkmodel
+
+    with m.bulk_edit():
+        with m.bulk_edit():
+            m.Base.new_cells("foo", formula=lambda: 1)
+        assert "foo" not in m.Sub1.cells    # Updated by the outer block
+
+    assert m.Sub1.foo() == 1
+
+
+def test_bulk_edit_override(bulkmodel):
+    """Cells of the same name is defined in a pending sub space"""
+
+    m = bulkmodel
+
+    with m.bulk_edit():
+        m.Base.new_cells("foo", formula=lambda: 1)
+        m.Sub1.new_cells("foo", formula=lambda: 2)
+
+    assert m.Base.foo() == 1
+    assert m.Sub1.foo() == 2
+    assert m.Sub2.foo() == 2
+    assert m.Sub1.foo._is_defined()
+
+
+@pytest.mark.parametrize("edit", ["formula", "delete", "rename"])
+def test_bulk_edit_updated_before_edit(bulkmodel, edit):
+
+    m = bulkmodel
+
+    with m.bulk_edit():
+        foo = m.Base.new_cells("foo", formula=lambda: 1)
+        if edit == "formula":
+            foo.formula = lambda: 3
+        elif edit == "delete":
+            del m.Base.foo
+        elif edit == "rename":
+            foo.rename("bar")
+
+    if edit == "formula":
+        assert m.Sub2.foo() == 3
+    elif edit == "delete":
+        assert "foo" not in m.Sub2.cells
+    elif edit == "rename":
+        assert "foo" not in m.Sub2.cells
+        assert m.Sub2.bar() == 1
+
+
+def test_bulk_edit_error(bulkmodel):
+
+    m = bulkmodel
+
+    with pytest.raises(ZeroDivisionError):
+        with m.bulk_edit():
+            m.Base.new_cells("foo", formula=lambda: 1)
+            1 / 0
+
+    assert m.Sub2.foo() == 1
+
+    # Not in bulk edit after the error
+    m.Base.new_cells("bar", formula=lambda: 2)
+    assert m.Sub2.bar() == 2
@@ -0,0 +1,89 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def frozenmodel():
+    """
+        Model1-Space1[i]--foo, bar
+                  |
+                  +-Child--baz
+                  |
+                  +-x
+    """
+    m = mx.new_model()
+    s = m.new_space("Space1", formula=lambda i: None)
+    s.x = 2
+
+    @mx.defcells
+    def foo(t):
+        return t * x + i
+
+    @mx.defcells
+    def bar(t):
+        return foo(t) + Child.baz()
+
+    s.new_space("Child").new_cells("baz", formula=lambda: 1)
+    m.freeze()
+
+    yield m
+    m.unfreeze()
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_freeze(frozenmodel):
+
+    m = frozenmodel
+    s = m.Space1
+    assert m.frozen
+
+    assert s[1].bar(3) == 8
+    s[1].foo[3] = 10
+    assert s[1].bar(3) == 11
+    s[1].foo.clear_at(3)
+    assert s[1].bar(3) == 8
+    assert s[2].bar(3) == 9
+
+    m.clear_all()
+    assert s[1].bar(3) == 8
+
+
+@pytest.mark.parametrize("edit", [
+    lambda m: m.new_space(),
+    lambda m: m.Space1.new_cells(),
+    lambda m: m.Space1.new_space(),
+    lambda m: m.Space1.foo.rename("qux"),
+    lambda m: setattr(m.Space1.foo, "formula", lambda t: t),
+    lambda m: setattr(m.Space1, "x", 3),
+    lambda m: setattr(m.Space1, "y", 3),
+    lambda m: delattr(m.Space1, "x"),
+    lambda m: delattr(m.Space1, "foo"),
+    lambda m: setattr(m, "z", 3),
+    lambda m: setattr(m.Space1, "formula", lambda j: None),
+    lambda m: m.Space1.add_bases(m.Space1.Child),
+    lambda m: delattr(m, "Space1")
+])
+def test_freeze_edit(frozenmodel, edit):
+
+    m = frozenmodel
+    with pytest.raises(RuntimeError):
+        edit(m)
+
+    assert m.Space1[1].bar(3) == 8
+
+
+def test_unfreeze(frozenmodel):
+
+    m = frozenmodel
+    s = m.Space1
+    assert s[1].bar(3) == 8
+
+    m.unfreeze()
+    assert not m.frozen
+    s.x = 3
+    s.foo.formula = lambda t: t * x * 2 + i
+    assert s[1].bar(3) == 20
+
+    m.freeze()
+    assert s[1].bar(3) == 20
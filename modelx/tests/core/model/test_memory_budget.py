@@ -0,0 +1,157 @@
+import sys
+import warnings
+import time
+import modelx as mx
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def budgetmodel():
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def arr(i):
+        return np.full(1000, i, dtype=np.float64)    # 8000 bytes
+
+    @mx.defcells
+    def total(i):
+        return arr(i).sum() + factor
+
+    s.factor = 1
+    s.np = np
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_memory_budget(budgetmodel):
+
+    m = budgetmodel
+    s = m.spaces["Space1"]
+    assert m.get_memory_stats() is None
+
+    m.set_memory_budget(50000)
+    for i in range(10):
+        assert s.total(i) == 1000 * i + 1
+
+    stats = m.get_memory_stats()
+    assert stats["used"] <= 50000
+    assert stats["evicted"] > 0
+    assert stats["evicted_bytes"] >= 8000 * 4
+
+    # Dependents are cleared together
+    for i in range(10):
+        assert (i in s.arr) == (i in s.total)
+
+    # Evicted values are recalculated
+    assert s.total(0) == 1
+
+    m.set_memory_budget(None)
+    assert m.get_memory_stats() is None
+
+
+def test_memory_budget_lru(budgetmodel):
+
+    m = budgetmodel
+    s = m.spaces["Space1"]
+
+    @mx.defcells(space=s)
+    def usearr(i):
+        return arr(0)[0] + arr(i)[0]
+
+    m.set_memory_budget(8000 * 3 + sys.getsizeof(1.0) * 3)
+    for i in range(1, 10):
+        usearr(i)
+
+    assert 0 in s.arr   # Recently used by usearr
+    assert 1 not in s.arr
+
+
+def test_memory_budget_input(budgetmodel):
+
+    m = budgetmodel
+    s = m.spaces["Space1"]
+
+    m.set_memory_budget(10000)
+    s.arr[100] = np.zeros(10000)
+    for i in range(5):
+        s.arr(i)
+
+    assert 100 in s.arr
+    assert m.get_memory_stats()["used"] <= 10000
+
+
+def test_memory_budget_untracked(budgetmodel):
+
+    m = budgetmodel
+    s = m.spaces["Space1"]
+    m.set_memory_budget(50000)
+    s.total(100)    # Tracked
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # Untracked values not all cleared
+        with mx.untracked():
+            for i in range(10):
+                assert s.total(i) == 1000 * i + 1
+
+    stats = m.get_memory_stats()
+    assert stats["used"] <= 50000
+    assert stats["evicted"] > 0
+
+    # Untracked values are evicted in LRU order
+    assert 9 in s.arr and 9 in s.total
+    assert 0 not in s.arr
+    assert 100 not in s.arr and 100 not in s.total
+    assert m._impl.untracked_nodes == set(m._impl.tracegraph.nodes)
+
+    with pytest.warns(UserWarning):
+        s.factor = 2
+    assert not m._impl.untracked_nodes
+    assert s.total(9) == 9002
+
+
+def test_memory_budget_chain():
+    """Values used by formulas in progress are not evicted"""
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def foo(t):
+        return np.full(100, t) + (foo(t - 1) if t > 0 else 0)
+
+    s.np = np
+    m.set_memory_budget(1000)
+    assert foo(100)[0] == 5050
+    assert m.get_memory_stats()["used"] <= 1000    # Evicted after the call
+    assert foo(100)[0] == 5050
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_memory_budget_deep_chain():
+    """Values in use are not scanned repeatedly in deep recursion"""
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def foo(t):
+        return t + (foo(t - 1) if t > 0 else 0)
+
+    m.set_memory_budget(1000)
+    start = time.perf_counter()
+    assert foo(2000) == 2001000
+    assert time.perf_counter() - start < 5
+
+    stats = m.get_memory_stats()
+    assert stats["used"] <= stats["maxbytes"]
+    assert stats["evicted"]
+    assert foo(2000) == 2001000
+
+    m._impl._check_sanity()
+    m.close()
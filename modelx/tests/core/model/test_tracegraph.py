@@ -0,0 +1,163 @@
+import modelx as mx
+from modelx.core.model import TraceManager
+import pytest
+
+
+class Obj:
+    pass
+
+
+@pytest.fixture(params=["compact", "networkx"])
+def graph_backend(request):
+    saved = TraceManager.graph_backend
+    TraceManager.graph_backend = request.param
+    yield request.param
+    TraceManager.graph_backend = saved
+
+
+@pytest.fixture
+def tracegraph(graph_backend):
+    """
+    a1 -> b1 -> c1
+    a2 -> b1
+    a2 -> b2 -> c1
+    """
+    graph, _ = TraceManager.graph_backends[graph_backend]
+    g = graph()
+    a, b, c = Obj(), Obj(), Obj()
+
+    g.add_edge((a, (1,)), (b, (1,)))
+    g.add_edge((b, (1,)), (c, (1,)))
+    g.add_edge((a, (2,)), (b, (1,)))
+    g.add_edge((a, (2,)), (b, (2,)))
+    g.add_edge((b, (2,)), (c, (1,)))
+    g.add_node((c, (2,)))
+
+    return g, a, b, c
+
+
+def test_graph_ops(tracegraph):
+
+    g, a, b, c = tracegraph
+
+    assert len(g) == 6
+    assert (c, (2,)) in g
+    assert set(g.successors((a, (2,)))) == {(b, (1,)), (b, (2,))}
+    assert set(g.predecessors((b, (1,)))) == {(a, (1,)), (a, (2,))}
+    assert g.get_nodes_with(b) == {(b, (1,)), (b, (2,))}
+    assert g.get_startnodes_from((a, (2,))) == [(c, (1,))]
+
+    sub = g.subgraph([(a, (1,)), (b, (1,)), (c, (1,)), (b, (2,))])
+    assert set(sub.edges) == {
+        ((a, (1,)), (b, (1,))), ((b, (1,)), (c, (1,))), ((b, (2,)), (c, (1,)))}
+    assert sub.topological_sort() == [(a, (1,)), (b, (2,)), (b, (1,)), (c, (1,))]
+
+
+def test_networkx_interface(tracegraph):
+
+    g, a, b, c = tracegraph
+
+    assert len(g.nodes) == len(g.nodes()) == g.number_of_nodes() == 6
+    assert list(g.nodes) == list(g.nodes()) == list(g)
+    assert (c, (2,)) in g.nodes
+    assert len(g.edges) == len(g.edges()) == g.number_of_edges() == 5
+    assert set(g.edges()) == set(g.edges)
+    assert ((a, (1,)), (b, (1,))) in g.edges
+    assert set(g.edges([(a, (2,)), (c, (1,))])) == {
+        ((a, (2,)), (b, (1,))), ((a, (2,)), (b, (2,)))}
+    assert set(g.edges((a, (1,)))) == {((a, (1,)), (b, (1,)))}
+
+    preds = g.predecessors((c, (1,)))
+    assert set(preds) == {(b, (1,)), (b, (2,))}
+    assert not list(preds)      # Iterators
+    assert not list(g.successors((c, (1,))))
+
+
+def test_remove_with_descs(tracegraph):
+
+    g, a, b, c = tracegraph
+
+    assert g.remove_with_descs((a, (1,))) == {(a, (1,)), (b, (1,)), (c, (1,))}
+    assert set(g) == {(a, (2,)), (b, (2,)), (c, (2,))}
+    assert set(g.edges) == {((a, (2,)), (b, (2,)))}
+
+    assert g.clear_obj(a) == {(a, (2,)), (b, (2,))}
+    assert set(g) == {(c, (2,))}
+    assert g.remove_with_descs((a, (1,))) == set()
+
+
+def test_model_graph(graph_backend):
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def fibo(x):
+        return fibo(x - 1) + fibo(x - 2) if x > 1 else x
+
+    actions = m.generate_actions([fibo.node(10)], step_size=3)
+    assert actions[0] == ['calc', [fibo.node(1), fibo.node(0), fibo.node(2)]]
+
+    assert fibo(10) == 55
+    assert len(m.tracegraph) == 11
+    assert set(fibo.preds(5)) == {fibo.node(4), fibo.node(3)}
+
+    fibo[3] = 3
+    assert len(m.tracegraph) == 4
+    assert fibo(10) == 76
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_compact_obj_index():
+
+    from modelx.core.tracegraph import CompactTraceGraph
+
+    g = CompactTraceGraph()
+    a, b = Obj(), Obj()
+
+    for i in range(10):
+        g.add_edge((a, (i,)), (b, (i,)))
+
+    assert g.get_nodes_with(a) == set((a, (i,)) for i in range(10))
+
+    g.remove_with_descs((a, (0,)))
+    assert g.get_nodes_with(b) == set((b, (i,)) for i in range(1, 10))
+
+    mapping = {node: (id(node[0]), node[1]) for node in g}
+    g2 = g.relabel(mapping).relabel({v: k for k, v in mapping.items()})
+    assert g2.get_nodes_with(a) == g.get_nodes_with(a)
+
+    assert g.clear_obj(a) == g2.clear_obj(a)
+    assert not g and not g2
+    assert not g._objids and not g2._objids
+
+
+def test_add_nodes(graph_backend):
+
+    graph, _ = TraceManager.graph_backends[graph_backend]
+    g = graph()
+    a, b = Obj(), Obj()
+
+    g.add_nodes_from([(a, (i,)) for i in range(5)] * 2)
+    g.add_edge((a, (0,)), (b, (0,)))
+    g.remove_with_descs((a, (1,)))
+    g.remove_with_descs((a, (0,)))
+    b.input_keys = {(i,) for i in range(1, 4)}
+    g.add_inputs(b, sorted(b.input_keys))
+
+    assert set(g) == {(a, (2,)), (a, (3,)), (a, (4,)),
+                      (b, (1,)), (b, (2,)), (b, (3,))}
+    assert len(g) == 6
+    assert g.get_nodes_with(b) == {(b, (1,)), (b, (2,)), (b, (3,))}
+    assert not list(g.successors((b, (2,))))
+    g.add_edge((a, (2,)), (b, (1,)))
+    assert g.remove_with_descs((a, (2,))) == {(a, (2,)), (b, (1,))}
+
+    # Keys are removed from input_keys by the cells
+    b.input_keys.remove((1,))
+    assert g.remove_with_descs((b, (2,))) == {(b, (2,))}
+    b.input_keys.remove((2,))
+    assert set(g) == {(a, (3,)), (a, (4,)), (b, (3,))}
+    assert g.clear_obj(b) == {(b, (3,))}
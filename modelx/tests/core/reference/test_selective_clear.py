@@ -0,0 +1,89 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def refmodel():
+    """
+        Model1-Space1--foo, bar, baz, qux
+                  |
+                  +-x, y
+    """
+    m = mx.new_model()
+    s = m.new_space("Space1")
+    s.x = 1
+    s.y = 2
+
+    @mx.defcells
+    def foo(t):
+        return x * t
+
+    @mx.defcells
+    def bar(t):
+        return sum(y for _ in range(t))    # y in nested code
+
+    @mx.defcells
+    def baz(t):
+        return foo(t) + 1
+
+    @mx.defcells
+    def qux(t):
+        return _space.x * t
+
+    for c in (s.foo, s.bar, s.baz, s.qux):
+        c(3)
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_add_unrelated_ref(refmodel):
+
+    s = refmodel.Space1
+    s.z = 3
+
+    assert 3 in s.foo and 3 in s.bar and 3 in s.baz
+    assert 3 not in s.qux   # Cleared as _space can refer to any name
+
+
+def test_change_referred_ref(refmodel):
+
+    s = refmodel.Space1
+    s.x = 10
+
+    assert 3 not in s.foo
+    assert 3 not in s.baz   # Depending on foo
+    assert 3 in s.bar
+    assert s.baz(3) == 31
+
+
+def test_change_ref_in_nested_code(refmodel):
+
+    s = refmodel.Space1
+    s.y = 5
+
+    assert 3 not in s.bar
+    assert 3 in s.foo
+    assert s.bar(3) == 15
+
+
+def test_shadow_builtin(refmodel):
+
+    s = refmodel.Space1
+    s.sum = lambda gen: 0
+
+    assert 3 not in s.bar
+    assert s.bar(3) == 0
+    assert 3 in s.foo
+
+
+def test_del_referred_ref(refmodel):
+
+    s = refmodel.Space1
+    del s.y
+
+    assert 3 not in s.bar
+    assert 3 in s.foo
+    s.y = 3
+    assert s.bar(3) == 9
@@ -0,0 +1,76 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def itemmodel():
+    """
+        Model1-Projection[i]--foo
+                 |
+                 +-Child--bar
+    """
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda i: None)
+    s.new_cells("foo", formula=lambda t: t + i + rate)
+    child = s.new_space("Child")
+    child.new_cells("bar", formula=lambda: rate * 2)
+    m.rate = 1
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_del_itemspace_releases(itemmodel):
+
+    m = itemmodel
+    s = m.Projection
+    global_refs = m._impl._global_refs
+    num_observers = len(global_refs.observers)
+
+    for i in range(10):
+        assert s[i].foo(1) == i + 2
+        assert s[i].Child.bar() == 2
+
+    assert len(s._impl._dynamic_subs) == 10
+    s.clear_at(3)
+    assert len(s._impl._dynamic_subs) == 9
+    assert [k for k, in s._impl.param_spaces] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+    s.clear_all()
+    assert not s._impl._dynamic_subs
+    assert not s.Child._impl._dynamic_subs
+    assert len(global_refs.observers) == num_observers
+    assert len(s._impl.own_refs.observers) == 1
+
+
+def test_itemspace_after_delete(itemmodel):
+
+    m = itemmodel
+    s = m.Projection
+    names = set(s[i]._impl.name for i in range(5))
+    s.clear_at(2)
+    names.add(s[5]._impl.name)
+    assert len(names) == 6
+
+    m.rate = 2
+    assert s[2].foo(1) == 5
+    assert s[5].Child.bar() == 4
+
+
+def test_del_itemspace_restored(itemmodel, tmp_path):
+    """ItemSpaces of a restored model are deleted"""
+    m = itemmodel
+    assert m.Projection[1].foo(1) == 3
+    m.backup(tmp_path / "model.mx")
+    m2 = mx.restore_model(tmp_path / "model.mx", name="Restored")
+
+    s = m2.Projection
+    del s[1]
+    assert not s._impl.param_spaces
+    assert s[1].foo(1) == 3
+    m2.rate = 2
+    assert s[1].foo(1) == 4
+
+    m2._impl._check_sanity()
+    m2.close()
@@ -0,0 +1,105 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def lazymodel():
+    """
+        Model1-Projection[i]--c0, ..., c9, total
+                 |
+                 +-Child--d0, d1, scaled
+                 |
+                 +-Other--e0
+    """
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda i: None)
+    for k in range(10):
+        s.new_cells("c%d" % k, formula="lambda t: t * %d + i" % k)
+
+    s.new_cells("total", formula=lambda: c1(1) + Child.scaled(1))
+    child = s.new_space("Child")
+    child.new_cells("d0", formula=lambda t: t)
+    child.new_cells("d1", formula=lambda t: t + 1)
+    child.new_cells("scaled", formula=lambda t: Parent.c2(t) * 10)
+    child.Parent = s
+    other = s.new_space("Other")
+    other.new_cells("e0", formula=lambda: 0)
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_lazy_members(lazymodel):
+
+    s = lazymodel.Projection
+    item = s[1]._impl
+
+    assert not item._cells and not item._named_spaces
+
+    assert s[1].total() == 2 + 30
+    assert set(item._cells) == {"total", "c1", "c2"}    # c2 by Child.scaled
+    assert set(item._named_spaces) == {"Child"}
+    assert set(item._named_spaces["Child"]._cells) == {"scaled"}
+
+    # Values are kept while members are created
+    assert 1 in s[1].c1
+    assert hasattr(s[1], "c5")
+    assert s[1].c5 in s[1].cells.values()
+    assert 1 in s[1].c1
+
+
+def test_lazy_members_list(lazymodel):
+
+    s = lazymodel.Projection
+    item = s[2]
+
+    assert item.Child.d1(1) == 2
+    assert list(item.cells) == list(s.cells)
+    assert list(item.spaces) == list(s.spaces)
+    assert list(item.Child.cells) == list(s.Child.cells)
+    assert "e0" in dir(item.Other)
+
+
+def test_lazy_members_refs(lazymodel):
+    """Relative references to members in ItemSpaces"""
+    m = lazymodel
+    s = m.Projection
+    s.Other.Target = s.Child.d1
+
+    item = s[3]
+    assert item.Other.Target is item.Child.d1
+    assert item.Other.Target(1) == 2
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        "lambda t: eval('c3(t)')",
+        "lambda t: globals()['c3'](t)",
+        "lambda t: getattr(_space, 'c3')(t)",
+    ]
+)
+def test_lazy_members_dynamic_lookup(lazymodel, formula):
+    """Members looked up dynamically by formulas are created"""
+    s = lazymodel.Projection
+    s.new_cells("dyn", formula=formula)
+
+    item = s[4]
+    assert item.dyn(1) == 3 + 4
+    assert set(item._impl._cells) == set(s.cells)
+
+
+def test_lazy_members_dynamic_space_formula():
+    """Members looked up dynamically by the space formula are created"""
+    m = mx.new_model()
+    s = m.new_space(
+        "Projection", formula=lambda i: {"refs": {"x": eval("c0")(i)}})
+    s.new_cells("c0", formula=lambda t: 2 * t)
+    s.new_cells("c1", formula=lambda t: x + t)
+
+    assert s[3].c1(1) == 7
+    assert set(s[3]._impl._cells) == {"c0", "c1"}
+
+    m._impl._check_sanity()
+    m.close()
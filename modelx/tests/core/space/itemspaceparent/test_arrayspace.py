@@ -0,0 +1,79 @@
+import pickle
+import modelx as mx
+from modelx.core.node import ArrayArg
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def arraymodel():
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda policy_id, scen=0: None)
+
+    @mx.defcells
+    def premium():
+        return 100 * policy_id + scen
+
+    @mx.defcells
+    def cashflow(t):
+        return np.where(policy_id > 2, premium() * (t + 1) * rate, 0)
+
+    s.np = np
+    s.rate = 1
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_arrayspace(arraymodel):
+
+    s = arraymodel.Projection
+    ids = np.arange(1, 6)
+    arr = s.arrayspace(ids)
+
+    for t in range(3):
+        assert arr.cashflow(t).tolist() == [s[i].cashflow(t) for i in ids]
+
+    assert arr.cashflow(2)[3] == s[4].cashflow(2)
+    assert s.arrayspace(list(range(1, 6))) is arr
+    assert s.arrayspace(pd.Series(ids), scen=0) is arr
+    assert s.arrayspace(ids, scen=[1] * 5) is not arr
+    assert s.arrayspace(ids, scen=[1] * 5).premium().tolist() == [
+        101, 201, 301, 401, 501]
+
+
+def test_arrayspace_readonly(arraymodel):
+
+    s = arraymodel.Projection
+    ids = np.arange(1, 6)
+    arr = s.arrayspace(ids)
+
+    ids[0] = 10     # Not affecting arr
+    assert arr.premium()[0] == 100
+    with pytest.raises(ValueError):
+        arr.policy_id[0] = 10
+
+
+def test_arrayspace_clear(arraymodel):
+
+    s = arraymodel.Projection
+    ids = np.arange(1, 6)
+    assert s.arrayspace(ids).cashflow(1).tolist() == [0, 0, 600, 800, 1000]
+
+    s.rate = 2
+    assert s.arrayspace(ids).cashflow(1).tolist() == [0, 0, 1200, 1600, 2000]
+
+    s.clear_at(ids)
+    assert not s.itemspaces
+
+
+def test_pickle_arrayarg():
+
+    arg = ArrayArg(np.array([1.0, np.nan]))
+    unpickled = pickle.loads(pickle.dumps(arg))
+
+    assert unpickled == arg and hash(unpickled) == hash(arg)
+    assert not unpickled.value.flags.writeable
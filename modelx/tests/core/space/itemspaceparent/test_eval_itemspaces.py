@@ -0,0 +1,67 @@
+import multiprocessing
+import modelx as mx
+from modelx.core import parallel
+from modelx.core.errors import FormulaError
+import pytest
+
+
+@pytest.fixture
+def parallelmodel():
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda policy_id: None)
+
+    @mx.defcells
+    def premium():
+        return 100 * policy_id
+
+    @mx.defcells
+    def cashflow(t):
+        if policy_id < 0:
+            raise ValueError("negative policy_id")
+        return premium() * (t + 1)
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_eval_itemspaces(parallelmodel, chunksize):
+
+    s = parallelmodel.Projection
+    ids = list(range(10, 0, -1))
+
+    result = s.eval_itemspaces(
+        ids, ["premium", ("cashflow", (2,))],
+        processes=2, chunksize=chunksize)
+
+    assert result == [[100 * i, 300 * i] for i in ids]
+    assert not s.itemspaces     # Not evaluated in this process
+
+
+def test_eval_itemspaces_error(parallelmodel):
+
+    s = parallelmodel.Projection
+
+    with pytest.raises(FormulaError) as errinfo:
+        s.eval_itemspaces([1, -1, 2], [("cashflow", (0,))], processes=2)
+
+    assert "(-1,)" in str(errinfo.value)
+    assert "negative policy_id" in str(errinfo.value)
+
+
+def test_eval_itemspaces_spawn(parallelmodel, monkeypatch):
+    """Workers read the model written to a temporary folder"""
+
+    monkeypatch.setattr(parallel, "get_mp_context",
+                        lambda: multiprocessing.get_context("spawn"))
+
+    s = parallelmodel.Projection
+    ids = [3, 1, 2]
+
+    result = s.eval_itemspaces(
+        ids, ["premium", ("cashflow", (2,))], processes=2)
+
+    assert result == [[100 * i, 300 * i] for i in ids]
+    assert not s.itemspaces
@@ -0,0 +1,109 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def lrumodel():
+    """
+        Model1-Projection[i]--foo
+               |
+               +-Total--total
+    """
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda i: None)
+
+    @mx.defcells(space=s)
+    def foo(t):
+        return t * i
+
+    t = m.new_space("Total")
+    t.Projection = s
+
+    @mx.defcells(space=t)
+    def total(n):
+        return sum(Projection[i].foo(1) for i in range(n))
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_max_itemspaces(lrumodel):
+
+    s = lrumodel.Projection
+    s.max_itemspaces = 3
+
+    for i in range(5):
+        assert s[i].foo(2) == 2 * i
+
+    assert list(s.itemspaces) == [2, 3, 4]
+
+    s[2]    # Recently used
+    s[5]
+    assert list(s.itemspaces) == [4, 2, 5]
+
+    s.max_itemspaces = None
+    for i in range(5):
+        s[i]
+    assert len(s.itemspaces) == 6
+
+
+def test_set_property(lrumodel):
+
+    s = lrumodel.Projection
+    for i in range(5):
+        s[i]
+
+    s.set_property("max_itemspaces", 2)
+    assert s.max_itemspaces == 2
+    assert list(s.itemspaces) == [3, 4]
+
+    with pytest.raises(ValueError):
+        s.set_property("max_itemspaces", 0)
+
+
+def test_max_itemspaces_clear_dependents(lrumodel):
+
+    m = lrumodel
+    s = m.Projection
+    t = m.Total
+
+    @mx.defcells(space=t)
+    def first():
+        return Projection[0].foo(3)
+
+    assert t.first() == 0
+    s.max_itemspaces = 1
+    s[1]
+    assert list(s.itemspaces) == [1]
+    assert not len(t.first)
+
+
+def test_max_itemspaces_in_formula(lrumodel):
+    """ItemSpaces used by formulas being calculated are not deleted"""
+    m = lrumodel
+    s = m.Projection
+    s.max_itemspaces = 2
+
+    assert m.Total.total(5) == 10
+    assert list(s.itemspaces) == [3, 4]     # Deleted after the calculation
+    assert not len(m.Total.total)
+
+    s[10]
+    assert list(s.itemspaces) == [4, 10]
+
+
+def test_max_itemspaces_nested(lrumodel):
+    """The cap is enforced when the outermost formula finishes"""
+    m = lrumodel
+    s = m.Projection
+    t = m.Total
+    s.max_itemspaces = 2
+
+    @mx.defcells(space=t)
+    def nested(n):
+        return sum(total(k) for k in range(n))
+
+    assert t.nested(8) == sum(k * (k - 1) // 2 for k in range(8))
+    assert len(s.itemspaces) <= 2
+    assert not len(t.nested)
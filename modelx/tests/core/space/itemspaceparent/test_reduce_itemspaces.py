@@ -0,0 +1,103 @@
+import modelx as mx
+from modelx.core.errors import FormulaError
+from modelx.core.cells import DynamicCellsImpl
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def reducemodel():
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda policy_id: None)
+
+    @mx.defcells
+    def premium():
+        return 100 * policy_id
+
+    @mx.defcells
+    def cashflow(t):
+        if policy_id < 0:
+            raise ValueError("negative policy_id")
+        return premium() * (t + 1)
+
+    @mx.defcells
+    def cashflows():
+        return np.array([cashflow(t) for t in range(3)])
+
+    s.np = np
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+@pytest.mark.parametrize("chunksize", [1, 3, 100])
+def test_reduce_itemspaces(reducemodel, chunksize):
+
+    s = reducemodel.Projection
+    stats = []
+    ids = (i for i in range(1, 11))     # Generator
+
+    result = s.reduce_itemspaces(
+        ids, ["premium", ("cashflow", (2,)), "cashflows"],
+        chunksize=chunksize, stats=stats)
+
+    assert result[0] == 5500
+    assert result[1] == 16500
+    assert list(result[2]) == [5500, 11000, 16500]
+    assert not s.itemspaces
+
+    assert len(stats) == -(-10 // chunksize)
+    assert sum(st["itemspaces"] for st in stats) == 10
+    assert [st["chunk"] for st in stats] == list(range(len(stats)))
+    assert all(st["seconds"] >= 0 for st in stats)
+
+
+def test_reduce_itemspaces_reducers(reducemodel):
+
+    s = reducemodel.Projection
+
+    result = s.reduce_itemspaces(
+        range(1, 5), ["premium", "cashflows", "premium"],
+        reducer=["concat", "concat", max], chunksize=3)
+
+    assert result[0].tolist() == [100, 200, 300, 400]
+    assert result[1].shape == (4, 3)
+    assert result[1][3].tolist() == [400, 800, 1200]
+    assert result[2] == 400
+    assert not s.itemspaces
+
+
+def test_reduce_itemspaces_lazy_members(reducemodel, monkeypatch):
+    """Only the target cells and their precedents are created"""
+
+    s = reducemodel.Projection
+    for i in range(10):
+        s.new_cells("unused%d" % i, formula=lambda: 0)
+
+    created = []
+    init = DynamicCellsImpl.__init__
+
+    def init_cells(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        created.append(self.name)
+
+    monkeypatch.setattr(DynamicCellsImpl, "__init__", init_cells)
+
+    result = s.reduce_itemspaces(range(1, 5), [("cashflow", (2,))])
+    assert result == [3000]
+    assert sorted(created) == ["cashflow"] * 4 + ["premium"] * 4
+
+
+def test_reduce_itemspaces_error(reducemodel):
+
+    s = reducemodel.Projection
+
+    with pytest.raises(FormulaError):
+        s.reduce_itemspaces([1, 2, -1, 3], [("cashflow", (1,))], chunksize=2)
+
+    assert not s.itemspaces
+
+    with pytest.raises(ValueError):
+        s.reduce_itemspaces([1, 2], ["premium"], reducer="mean")
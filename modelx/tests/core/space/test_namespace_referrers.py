@@ -0,0 +1,170 @@
+import sys
+import modelx as mx
+from modelx.core.base import LazyEvalDict
+from modelx.core.cells import CellsImpl
+import pytest
+
+
+@pytest.fixture
+def refmodel():
+    """
+        Model1-Space1--foo, bar
+                  |
+                  +-x, y
+    """
+    m = mx.new_model()
+    s = m.new_space("Space1")
+    s.x = 1
+    s.y = 2
+    s.new_cells("foo", formula=lambda t: x * t)
+    s.new_cells("bar", formula=lambda t: y * t)
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def get_referrers(space, name):
+    return [r for r in space._impl._get_referrers([name])
+            if isinstance(r, CellsImpl)]
+
+
+def test_referrers_by_name(refmodel):
+
+    s = refmodel.Space1
+    foo, bar = s.foo._impl, s.bar._impl
+
+    assert get_referrers(s, "x") == [foo]
+    assert get_referrers(s, "y") == [bar]
+    assert get_referrers(s, "z") == []
+
+    s.new_cells("baz", formula=lambda t: x + y)
+    assert set(get_referrers(s, "x")) == {foo, s.baz._impl}
+
+
+def test_referrers_change_formula(refmodel):
+
+    s = refmodel.Space1
+    foo = s.foo._impl
+    s.foo.formula = lambda t: y * t
+
+    assert get_referrers(s, "x") == []
+    assert foo in get_referrers(s, "y")
+
+    s.foo(3)
+    s.x = 10
+    assert 3 in s.foo
+    s.y = 10
+    assert 3 not in s.foo
+
+
+def test_referrers_del_cells(refmodel):
+
+    s = refmodel.Space1
+    foo = s.foo._impl
+    del s.foo
+
+    assert get_referrers(s, "x") == []
+    assert all(r is not foo for r in s._impl._referrers.values())
+
+
+def test_referrers_dynamic_lookup(refmodel):
+
+    s = refmodel.Space1
+    s.new_cells("qux", formula=lambda t: _space.x * t)
+
+    assert s.qux._impl in get_referrers(s, "z")
+    s.qux(3)
+    s.z = 3
+    assert 3 not in s.qux
+
+
+def test_new_cells_order_in_sub():
+
+    m = mx.new_model()
+    base = m.new_space("Base")
+    sub = m.new_space("Sub")
+    sub.new_cells("b")
+    sub.add_bases(base)
+    base.new_cells("a")
+    base.new_cells("c")
+
+    assert list(sub.cells) == ["a", "c", "b"]
+    assert list(sub._impl.namespace) == list(sub._impl.namespace.interfaces)
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_refresh_deep_observers():
+    """Refresh flags are propagated without recursion"""
+
+    objs = [LazyEvalDict("d%d" % i) for i in range(10000)]
+    for obj, observer in zip(objs, objs[1:]):
+        obj.append_observer(observer)
+    for obj in objs:
+        obj.fresh
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(1000)
+    try:
+        objs[0].set_refresh()
+    finally:
+        sys.setrecursionlimit(limit)
+    assert not any(obj.is_fresh for obj in objs)
+
+
+
+def test_refresh_once():
+    """Observers of stale objects are not flagged again"""
+
+    class Observer(LazyEvalDict):
+
+        count = 0
+
+        def set_refresh(self, skip_self=False):
+            self.count += 1
+            LazyEvalDict.set_refresh(self, skip_self)
+
+    objs = [LazyEvalDict("d%d" % i) for i in range(10)]
+    for obj, observer in zip(objs, objs[1:]):
+        obj.append_observer(observer)
+    last = Observer("last")
+    objs[-1].append_observer(last)
+    last.fresh
+    last.count = 0
+
+    objs[0].set_refresh()
+    objs[0].set_refresh()
+    objs[5].set_refresh()
+    objs[3].set_refresh(skip_self=True)
+    assert last.count == 1
+    assert not any(obj.is_fresh for obj in objs)
+
+    last.fresh
+    assert all(obj.is_fresh for obj in objs)
+    objs[3].set_refresh(skip_self=True)
+    assert objs[3].is_fresh and not objs[4].is_fresh
+    objs[3].set_refresh()
+    assert last.count == 2
+
+
+def test_new_cells_in_subs():
+
+    m = mx.new_model()
+    base = m.new_space("Base")
+    sub = m.new_space("Sub", bases=base)
+    sub.new_cells("b", formula=lambda: a() + 1)
+    base.new_cells("a", formula=lambda: 1)
+    base.new_cells("c", formula=lambda: a() + 2)
+
+    with m.bulk_edit():
+        base.new_cells("d", formula=lambda: c() + 3)
+
+    assert list(sub.cells) == ["a", "c", "d", "b"]
+    assert list(sub._impl.namespace) == list(sub._impl.namespace.interfaces)
+    assert sub.b() == 2
+    assert sub.d() == 6
+
+    m._impl._check_sanity()
+    m.close()
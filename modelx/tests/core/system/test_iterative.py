@@ -0,0 +1,151 @@
+import modelx as mx
+from modelx.core.errors import DeepReferenceError, FormulaError
+from modelx.core.node import get_node_repr
+from modelx.testing.testutil import SuppressFormulaError
+import pytest
+
+
+@pytest.fixture
+def iterative():
+    saved = mx.use_iterative_eval()
+    mx.use_iterative_eval(True)
+    yield
+    mx.use_iterative_eval(saved)
+
+
+def make_chain_model():
+
+    m, s = mx.new_model(), mx.new_space("Chain")
+
+    @mx.defcells
+    def foo(x):
+        return foo(x - 1) + bar(x) if x > 0 else 0
+
+    @mx.defcells
+    def bar(x):
+        return baz(x) * _space.n
+
+    @mx.defcells
+    def baz(x):
+        return x
+
+    s.n = 2
+
+    return m, s
+
+
+def test_use_iterative_eval(iterative):
+    assert mx.use_iterative_eval()
+    assert mx.get_recursion() > 65000
+
+
+def test_deep_chain(iterative):
+
+    m, s = mx.new_model(), mx.new_space()
+
+    @mx.defcells
+    def foo(x):
+        return foo(x - 1) + 1 if x > 0 else 0
+
+    assert foo(100000) == 100000
+    assert len(m._impl.tracegraph) == 100001
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_mutual_recursion(iterative):
+
+    m, s = mx.new_model(), mx.new_space()
+
+    @mx.defcells
+    def even(x):
+        return True if x == 0 else odd(x - 1)
+
+    @mx.defcells
+    def odd(x):
+        return False if x == 0 else even(x - 1)
+
+    assert even(70001) is False
+    assert odd(70001) is True
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def _edge_reprs(graph):
+
+    def to_repr(node):
+        if isinstance(node, tuple):
+            node_repr = get_node_repr(node)
+        else:
+            node_repr = node.evalrepr
+        return node_repr.split(".", 1)[1]   # Remove model name
+
+    return set((to_repr(x), to_repr(y)) for x, y in graph.edges)
+
+
+def test_same_graphs():
+
+    graphs = []
+    for use in [False, True]:
+        saved = mx.use_iterative_eval()
+        mx.use_iterative_eval(use)
+        try:
+            m, s = make_chain_model()
+            assert s.foo(500) == 500 * 501
+            graphs.append((_edge_reprs(m._impl.tracegraph),
+                           _edge_reprs(m._impl.refgraph)))
+            m._impl._check_sanity()
+            m.close()
+        finally:
+            mx.use_iterative_eval(saved)
+
+    assert graphs[0] == graphs[1]
+    assert graphs[0][1]
+
+
+def test_error(iterative):
+
+    m, s = mx.new_model(), mx.new_space("ErrorSpace")
+
+    @mx.defcells
+    def foo(x):
+        if x > 0:
+            return foo(x - 1) + 1
+        else:
+            raise ValueError
+
+    with pytest.raises(FormulaError):
+        foo(300)
+
+    trace = mx.get_traceback()
+    assert [node[0].obj for node in trace] == [foo] * 301
+    assert [node[0].args for node in trace] == [(x,) for x in range(300, -1, -1)]
+    assert trace[-1][1] == 5
+
+    assert not m._impl.tracegraph
+
+    # Values are calculated after the error is fixed
+    foo.formula = lambda x: foo(x - 1) + 1 if x > 0 else 0
+    assert foo(300) == 300
+
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_circular_reference(iterative):
+
+    m, s = mx.new_model(), mx.new_space()
+
+    @mx.defcells
+    def foo(x):
+        return foo(x - 1) if x > 0 else foo(200)
+
+    with SuppressFormulaError():
+        with pytest.raises(DeepReferenceError):
+            foo(200)
+
+    assert not m._impl.tracegraph
+    m._impl._check_sanity()
+    m.close()
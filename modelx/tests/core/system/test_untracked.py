@@ -0,0 +1,97 @@
+import modelx as mx
+import pytest
+
+
+@pytest.fixture
+def untrackedmodel():
+
+    m = mx.new_model()
+    s = m.new_space("Space1", formula=lambda i: None)
+
+    @mx.defcells
+    def foo(x):
+        return x * _space.n
+
+    @mx.defcells
+    def bar(x):
+        return foo(x) + baz(x)
+
+    @mx.defcells
+    def baz(x):
+        return x
+
+    s.n = 1
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def test_untracked(untrackedmodel):
+
+    m = untrackedmodel
+    s = m.Space1
+
+    with mx.untracked():
+        assert s.bar(1) == 2
+        assert s[1].bar(2) == 4
+
+    assert not m._impl.tracegraph.edges
+    assert not m._impl.refgraph.edges
+    assert m._impl.untracked_nodes
+
+    # Tracked after exit
+    assert s.bar(3) == 6
+    assert m._impl.tracegraph.edges
+
+
+@pytest.mark.parametrize("change", ["input", "ref", "formula", "clear"])
+def test_untracked_invalidation(untrackedmodel, change):
+
+    m = untrackedmodel
+    s = m.Space1
+
+    with mx.untracked():
+        assert s.bar(1) == 2
+        assert s[1].bar(2) == 4
+
+    with pytest.warns(UserWarning):
+        if change == "input":
+            s.baz[1] = 2
+        elif change == "ref":
+            s.n = 2
+        elif change == "formula":
+            s.baz.formula = lambda x: 2 * x
+        else:
+            s.baz.clear_at(1)
+
+    assert not m._impl.untracked_nodes
+    assert 1 not in s.bar
+    assert not s.itemspaces
+    assert s.bar(1) == {"input": 3, "ref": 3, "formula": 3, "clear": 2}[change]
+
+
+def test_untracked_input_kept(untrackedmodel):
+
+    m = untrackedmodel
+    s = m.Space1
+    s.baz[1] = 10
+    s.baz[2] = 20
+
+    with mx.untracked():
+        assert s.bar(1) == 11
+
+    with pytest.warns(UserWarning):
+        s.baz[1] = 30
+
+    assert s.baz(2) == 20
+    assert 1 not in s.bar
+    assert s.bar(1) == 31
+
+
+def test_untracked_in_stacktrace():
+
+    with mx.trace_stack():
+        with pytest.raises(RuntimeError):
+            with mx.untracked():
+                pass
@@ -36,6 +36,13 @@ def test_get_next_skip_existing(simplenamer):
     assert simplenamer.get_next(existing_names) == "Cells14"
 
 
+def test_get_next_skip_many():
+    autonamer = AutoNamer("Cells")
+    existing_names = set("Cells%d" % i for i in range(1, 10001))
+
+    assert autonamer.get_next(existing_names) == "Cells10001"
+
+
 def test_get_next_with_prefix():
     existing_names = ["model_BAK1", "model_BAK2", "model_BAK3"]
 
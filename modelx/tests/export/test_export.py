@@ -0,0 +1,174 @@
+import sys
+import subprocess
+import importlib
+import itertools
+import types
+import modelx as mx
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 9), reason="Python 3.9 or newer is required")
+
+
+@pytest.fixture
+def exportmodel():
+    """
+        Model1-Base--foo, bar, baz
+               |   |
+               |   +-Child--qux
+               |
+               +-Param[i]--val
+               |   |
+               |   +-Child--double
+               |
+               +-Other--fibo
+    """
+    m = mx.new_model()
+    base = m.new_space("Base")
+    child = base.new_space("Child")
+    param = m.new_space("Param", formula=lambda i: {"refs": {"scale": i * 10}})
+    pchild = param.new_space("Child")
+    other = m.new_space("Other")
+
+    @mx.defcells(space=base)
+    def foo(x, y=2):
+        return x * y + rate + len(Child.qux[x])
+
+    @mx.defcells(space=base)
+    def bar(x):
+        bar[x] = math.sqrt(foo[x, 3]) + globalval   # Assignment in formula
+
+    base.new_cells("baz", formula=lambda: sum(foo(i) for i in range(3)))
+
+    @mx.defcells(space=child)
+    def qux(x):
+        return "a" * x
+
+    @mx.defcells(space=param)
+    def val(t):
+        return scale + i + t + Base.foo(t)
+
+    @mx.defcells(space=pchild)
+    def double():
+        return 2 * Parent.val(i) + i
+
+    @mx.defcells(space=other)
+    def fibo(n):
+        return fibo(n - 1) + fibo(n - 2) if n > 1 else n
+
+    import math
+    base.math = math
+    base.rate = 0.5
+    param.Base = base
+    m.globalval = 3
+    other.Param = param
+    pchild.Parent = param
+    fibo[1] = 10    # Input
+
+    yield m
+    m._impl._check_sanity()
+    m.close()
+
+
+def get_values(model):
+    return {
+        "foo": [model.Base.foo(x) for x in range(5)],
+        "foo2": [model.Base.foo(x, 4) for x in range(5)],
+        "bar": [model.Base.bar(x) for x in range(5)],
+        "baz": model.Base.baz(),
+        "qux": model.Base.Child.qux(3),
+        "val": [model.Param[i].val(t) for i, t in
+                itertools.product(range(3), range(3))],
+        "val2": model.Param(2).val(1),
+        "double": [model.Param[i].Child.double() for i in range(3)],
+        "fibo": model.Other.fibo(20),
+        "ref": model.Other.Param[1].Child.double()
+    }
+
+
+def test_export(exportmodel, tmp_path):
+
+    m = exportmodel
+    m.export(tmp_path / "exported")
+
+    sys.path.insert(0, str(tmp_path))
+    try:
+        pkg = importlib.import_module("exported")
+        assert get_values(pkg.mx_model) == get_values(m)
+    finally:
+        sys.path.remove(str(tmp_path))
+        for name in list(sys.modules):
+            if name.split(".")[0] == "exported":
+                del sys.modules[name]
+
+
+def test_export_without_modelx(exportmodel, tmp_path):
+
+    m = exportmodel
+    m.export(tmp_path / "exported")
+
+    code = "\n".join([
+        "import sys",
+        "sys.path.insert(0, %r)" % str(tmp_path),
+        "from exported import mx_model",
+        "print(mx_model.Other.fibo(20), mx_model.Param[1].val(2))",
+        "print('modelx' in sys.modules)"
+    ])
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        cwd=str(tmp_path), check=True)
+
+    assert result.stdout.split() == [
+        str(m.Other.fibo(20)), str(m.Param[1].val(2)), "False"]
+
+
+def test_export_error(exportmodel, tmp_path):
+
+    m = exportmodel
+    m.Base.gen = (i for i in range(3))
+
+    with pytest.raises(ValueError):
+        m.export(tmp_path / "exported")
+
+    with pytest.raises(ValueError):
+        m.export(tmp_path / "not-identifier")
+
+
+def test_export_name_collision(exportmodel, tmp_path):
+    """Subscriptions of objects named the same as cells are not replaced"""
+
+    m = exportmodel
+    s = m.new_space("Collision")
+    s.rates = [0.1, 0.2]
+    s.data = types.SimpleNamespace(foo=[1, 2, 3])
+    s.Base = m.Base
+
+    @mx.defcells(space=s)
+    def local_rate(t):
+        rate = rates
+        return rate[t]
+
+    @mx.defcells(space=s)
+    def param_rate(rate):
+        return rate[1]
+
+    @mx.defcells(space=s)
+    def attr_foo(x):
+        return data.foo[x] + Base.foo[x, 1]
+
+    m.Other.new_cells("rate", formula=lambda t: 0)
+
+    m.export(tmp_path / "exported")
+
+    sys.path.insert(0, str(tmp_path))
+    try:
+        pkg = importlib.import_module("exported")
+        exported = pkg.mx_model.Collision
+        assert exported.local_rate(1) == s.local_rate(1) == 0.2
+        assert exported.param_rate((3, 4)) == s.param_rate((3, 4)) == 4
+        assert exported.attr_foo(2) == s.attr_foo(2)
+    finally:
+        sys.path.remove(str(tmp_path))
+        for name in list(sys.modules):
+            if name.split(".")[0] == "exported":
+                del sys.modules[name]
@@ -44,3 +44,257 @@ def test_space_items(benchmark):
             s[i]
 
     benchmark(run)
+
+
+@pytest.mark.skip()
+@pytest.mark.parametrize("tracked", [True, False])
+def test_untracked_calls(benchmark, tracked):
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def foo(t):
+        return foo(t - 1) + 1 if t > 0 else 0
+
+    @mx.defcells
+    def bar(t, u):
+        return foo(t) + foo(u)
+
+    def run():
+        if tracked:
+            for x in range(100):
+                for y in range(100):
+                    bar(x, y)
+        else:
+            with mx.untracked():
+                for x in range(100):
+                    for y in range(100):
+                        bar(x, y)
+
+    def setup():
+        m.clear_all()
+
+    benchmark.pedantic(run, setup=setup, rounds=10)
+    m.close()
+
+
+@pytest.mark.skip()
+def test_get_calcsteps(benchmark):
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def foo(t):
+        return foo(t - 1) + bar(t) if t > 0 else 0
+
+    @mx.defcells
+    def bar(t):
+        return t
+
+    foo(5000)
+    nodes = list(m._impl.tracegraph)
+    targets = [foo.node(5000)._impl]
+
+    def run():
+        return m._impl.get_calcsteps(targets, nodes, 1000)
+
+    benchmark(run)
+    m.close()
+
+
+@pytest.mark.skip()
+@pytest.mark.parametrize("method", ["setitem", "set_values", "set_array"])
+def test_set_inputs(benchmark, method):
+
+    import numpy as np
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def foo(x):
+        return x
+
+    index = np.arange(1000000)
+    values = np.arange(1000000) * 2
+    mapping = dict(zip(index.tolist(), values.tolist()))
+
+    def run():
+        if method == "setitem":
+            for x, v in mapping.items():
+                foo[x] = v
+        elif method == "set_values":
+            foo.set_values(mapping)
+        else:
+            foo.set_array(index, values)
+
+    benchmark.pedantic(run, setup=foo.clear_all, rounds=3)
+    assert foo[999999] == 1999998
+    m.close()
+
+
+@pytest.mark.skip()
+def test_new_itemspace(benchmark):
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda i: None)
+    for k in range(300):
+        s.new_cells("c%d" % k, formula="lambda t: t * %d" % k)
+    child = s.new_space("Child")
+    for k in range(50):
+        child.new_cells("d%d" % k, formula="lambda t: t")
+
+    @mx.defcells(space=s)
+    def total():
+        return sum(c1(t) + Child.d1(t) for t in range(10))
+
+    def run():
+        for i in range(100):
+            s[i].total()
+
+    benchmark.pedantic(run, setup=s.clear_all, rounds=5)
+    m.close()
+
+
+@pytest.mark.skip()
+def test_itemspace_lifecycle(benchmark):
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda i: None)
+    s.new_cells("foo", formula=lambda t: t + i)
+
+    def run():
+        for i in range(100000):
+            s[i].foo(1)
+        s.clear_all()
+
+    benchmark.pedantic(run, rounds=3)
+    m.close()
+
+
+@pytest.mark.skip()
+def test_reduce_itemspaces(benchmark):
+
+    m = mx.new_model()
+    s = m.new_space("Projection", formula=lambda policy_id: None)
+    s.new_cells("premium", formula=lambda: 100 * policy_id)
+    s.new_cells("cashflow", formula=lambda t: premium() * (t + 1))
+    s.new_cells("pv", formula=lambda: sum(cashflow(t) for t in range(100)))
+
+    def run():
+        return s.reduce_itemspaces(range(100000), ["pv"], chunksize=1000)
+
+    result = benchmark.pedantic(run, rounds=1)
+    assert result == [sum(100 * i for i in range(100000)) * 5050]
+    m.close()
+
+
+@pytest.mark.skip()
+def test_compute_range(benchmark):
+
+    m = mx.new_model()
+    s = m.new_space()
+
+    @mx.defcells
+    def pols_if(t):
+        return 100 if t == 0 else pols_if(t - 1) - pols_death(t - 1)
+
+    @mx.defcells
+    def pols_death(t):
+        return pols_if(t) * 0.001
+
+    def run():
+        pols_if.compute_range(range(1200))
+
+    benchmark.pedantic(run, setup=s.clear_all, rounds=10)
+    m.close()
+
+
+@pytest.mark.skip()
+def test_new_cells_and_refs(benchmark):
+
+    def setup():
+        m = mx.new_model()
+        return (m.new_space(),), {}
+
+    def run(s):
+        for i in range(4000):
+            s.new_cells("c%d" % i, formula="lambda t: t")
+        for i in range(4000):
+            setattr(s, "r%d" % i, i)
+        s.model.close()
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+
+
+@pytest.mark.skip()
+def test_bulk_edit(benchmark):
+    """Build a model with 200 spaces and 20k cells"""
+
+    def setup():
+        return (mx.new_model(),), {}
+
+    def run(m):
+        with m.bulk_edit():
+            base = m.new_space("Base")
+            base.x = 0
+            for i in range(200):
+                s = m.new_space("Space%d" % i, bases=base)
+                s.x = i
+            for j in range(100):
+                base.new_cells("Cells%d" % j, formula="lambda t: t * x")
+        m.close()
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
+
+
+@pytest.mark.skip()
+@pytest.mark.parametrize("cached", [False, True])
+def test_read_model(benchmark, tmp_path, cached):
+    """Read a model with 400 spaces and 8k cells"""
+    from modelx.serialize import parsecache
+
+    m = mx.new_model()
+    for i in range(400):
+        s = m.new_space("Space%d" % i)
+        for j in range(20):
+            s.new_cells("Cells%d" % j, formula="lambda t: t * %d" % i)
+    m.write(tmp_path / "model")
+    m.close()
+
+    def setup():
+        if not cached:
+            parsecache.clear_memcache()
+        return (), {}
+
+    def run():
+        mx.read_model(tmp_path / "model").close()
+
+    mx.read_model(tmp_path / "model").close()
+    benchmark.pedantic(run, setup=setup, rounds=3)
+
+
+@pytest.mark.skip()
+@pytest.mark.parametrize("max_workers", [1, 2, 4])
+def test_parse_sources(benchmark, tmp_path, max_workers):
+    """Parse the sources of 400 spaces without the cache"""
+    from modelx.serialize import parsecache
+
+    m = mx.new_model()
+    for i in range(400):
+        s = m.new_space("Space%d" % i)
+        for j in range(20):
+            s.new_cells("Cells%d" % j, formula="lambda t: t * %d" % i)
+    m.write(tmp_path / "model")
+    m.close()
+
+    srcs = [p.read_text() for p in (tmp_path / "model").glob("*/__init__.py")]
+    parser = parsecache.SourceParser(cache_dir=False, max_workers=max_workers)
+
+    def setup():
+        parsecache.clear_memcache()
+        return (), {}
+
+    benchmark.pedantic(parser.parse_all, args=(srcs,), setup=setup, rounds=3)
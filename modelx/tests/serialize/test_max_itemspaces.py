@@ -0,0 +1,19 @@
+import modelx as mx
+
+
+def test_serialize_max_itemspaces(tmp_path):
+
+    m = mx.new_model()
+    A = m.new_space('A', formula=lambda i: None)
+    A.max_itemspaces = 10
+    B = m.new_space('B')
+
+    m.write(tmp_path / "model")
+    m2 = mx.read_model(tmp_path / "model")
+
+    assert m2.A.max_itemspaces == 10
+    assert m2.B.max_itemspaces is None
+    m._impl._check_sanity()
+    m2._impl._check_sanity()
+    m.close()
+    m2.close()
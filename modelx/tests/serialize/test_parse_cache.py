@@ -0,0 +1,191 @@
+import pickle
+import modelx as mx
+from modelx.serialize import parsecache
+from modelx.serialize.parsecache import SourceParser
+import pytest
+
+unpickled = []
+
+
+def _record_unpickled():
+    unpickled.append(True)
+
+
+class Malicious:
+
+    def __reduce__(self):
+        return (_record_unpickled, ())
+
+
+@pytest.fixture
+def cachemodel(tmp_path, monkeypatch):
+    """
+        CacheModel-Space0--foo, bar
+                  |   |
+                  |   +-Child--baz
+                  |
+                  +-Space1--foo, bar
+                  ...
+    """
+    m = mx.new_model("CacheModel")
+    for i in range(5):
+        s = m.new_space("Space%d" % i)
+        s.x = i
+        s.new_cells("foo", formula="lambda t: t * x + %d  # comment" % i)
+        s.new_cells("bar", formula="def bar(t):\n    return foo(t) + 1\n")
+        s.new_space("Child").new_cells("baz", formula=lambda: 1)
+
+    path_ = tmp_path / "model"
+    m.write(path_)
+    m.close()
+
+    monkeypatch.setattr(parsecache, "get_default_cache_dir",
+                        lambda: tmp_path / "usercache")
+
+    parsecache.clear_memcache()
+    yield path_
+    parsecache.clear_memcache()
+
+
+def check_model(m):
+    for i in range(5):
+        s = m.spaces["Space%d" % i]
+        assert s.bar(3) == 3 * i + i + 1
+        assert s.foo.formula.source == "lambda t: t * x + %d" % i
+        assert s.Child.baz() == 1
+    m._impl._check_sanity()
+
+
+def test_parse_cache(cachemodel, monkeypatch):
+
+    parsers = []
+    init = SourceParser.__init__
+
+    def init_parser(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        parsers.append(self)
+
+    monkeypatch.setattr(SourceParser, "__init__", init_parser)
+
+    for hits in (4, 11):    # Child spaces have the same source
+        m = mx.read_model(cachemodel)
+        assert parsers[-1].hits == hits
+        check_model(m)
+        m.close()
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_parse_cache_dir(cachemodel, tmp_path, monkeypatch, max_workers):
+
+    monkeypatch.setattr(parsecache, "PARALLEL_THRESHOLD", 2)
+    cache_dir = tmp_path / "cache"
+
+    m = mx.read_model(cachemodel, cache_dir=cache_dir,
+                      max_workers=max_workers)
+    check_model(m)
+    m.close()
+    assert len(list(cache_dir.glob("*.pickle"))) == 7
+
+    parsecache.clear_memcache()
+    parser = SourceParser(cache_dir=cache_dir)
+    srcs = [p.read_text() for p in sorted(cachemodel.glob("**/__init__.py"))]
+    result = parser.parse_all(srcs)
+    assert parser.hits == 11
+    assert [atok.text for atok in result] == srcs
+
+    # Broken cache files are ignored
+    for f in cache_dir.glob("*.pickle"):
+        f.write_bytes(b"broken")
+    parsecache.clear_memcache()
+
+    m = mx.read_model(cachemodel, cache_dir=cache_dir)
+    check_model(m)
+    m.close()
+
+
+def test_memcache_maxbytes(cachemodel, monkeypatch):
+
+    parser = SourceParser()
+    srcs = [p.read_text() for p in sorted(cachemodel.glob("**/__init__.py"))]
+    parser.parse_all(srcs)
+    memcache = parsecache._memcache
+    sizes = list(len(d) for d in memcache.data.values())
+    assert memcache.nbytes == sum(sizes)
+
+    # Old entries are evicted when a new entry is added
+    maxbytes = sum(sizes[-2:])
+    monkeypatch.setattr(parsecache, "MEMCACHE_MAXBYTES", maxbytes)
+    parser.parse("x = 1\n")
+    assert len(memcache.data) <= 2
+    assert 0 < memcache.nbytes <= maxbytes
+
+    # Data larger than the limit is not kept
+    monkeypatch.setattr(parsecache, "MEMCACHE_MAXBYTES", 0)
+    parsecache.clear_memcache()
+    parser.parse_all(srcs)
+    assert not memcache.data and memcache.nbytes == 0
+
+
+def test_parse_cache_default_dir(cachemodel, tmp_path):
+
+    cache_dir = tmp_path / "usercache"
+    m = mx.read_model(cachemodel)
+    m.close()
+    assert len(list(cache_dir.glob("*.pickle"))) == 7
+
+    parsecache.clear_memcache()
+    parser = SourceParser()
+    srcs = [p.read_text() for p in sorted(cachemodel.glob("**/__init__.py"))]
+    parser.parse_all(srcs)
+    assert parser.hits == 11
+
+    # Cached only in memory
+    for f in cache_dir.glob("*.pickle"):
+        f.unlink()
+    m = mx.read_model(cachemodel, cache_dir=False)
+    check_model(m)
+    m.close()
+    assert not list(cache_dir.glob("*.pickle"))
+
+
+def test_parse_cache_validated(cachemodel, tmp_path):
+    """Cache files failing the check are not unpickled"""
+    cache_dir = tmp_path / "cache"
+    srcs = [p.read_text() for p in sorted(cachemodel.glob("**/__init__.py"))]
+    SourceParser(cache_dir=cache_dir).parse_all(srcs)
+
+    payload = pickle.dumps(Malicious())
+    files = sorted(cache_dir.glob("*.pickle"))
+    for i, f in enumerate(files):
+        data = f.read_bytes()
+        header = data[:len(parsecache._FILE_HEADER)]
+        if i % 2:   # Wrong MAC
+            f.write_bytes(data[:len(header) + 32] + payload)
+        else:       # Unknown format
+            f.write_bytes(b"modelx-parsecache-0\n" + data[len(header):])
+
+    parsecache.clear_memcache()
+    parser = SourceParser(cache_dir=cache_dir)
+    result = parser.parse_all(srcs)
+    assert [atok.text for atok in result] == srcs
+    assert parser.hits == 4 and not unpickled
+
+    # Entries are signed with the secret of their directory
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    for f in cache_dir.glob("*.pickle"):
+        (other_dir / f.name).write_bytes(f.read_bytes())
+    parsecache.clear_memcache()
+    parser = SourceParser(cache_dir=other_dir)
+    parser.parse_all(srcs)
+    assert parser.hits == 4
+
+
+def test_parse_parallel(cachemodel, monkeypatch):
+
+    monkeypatch.setattr(parsecache, "PARALLEL_THRESHOLD", 2)
+    srcs = ["x = %d\n" % i for i in range(10)]
+    parser = SourceParser(cache_dir=False, max_workers=3)
+    result = parser.parse_all(srcs)
+    assert [atok.text for atok in result] == srcs
+    assert [atok.tree.body[0].value.value for atok in result] == list(range(10))